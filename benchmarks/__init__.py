@@ -0,0 +1,3 @@
+"""
+Performance benchmarks for Local Food Wastage Management System
+"""
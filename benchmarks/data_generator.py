@@ -0,0 +1,178 @@
+"""
+Synthetic data generator for Local Food Wastage Management System benchmarks
+
+Scales the cleaned sample CSVs to any number of rows per table while keeping
+the schema and the value distributions: category frequencies (types, food
+names, meal types, claim statuses, quantities) are taken from the samples,
+listings and claims pick their provider/food/receiver uniformly (which gives
+the sample's ~64% coverage and ~1.6 rows per referenced id), every listing
+carries its provider's city and type, and dates span the sample's ranges.
+Files are written in chunks so 10M-row tables never sit in memory.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.database.data_loader import TABLE_SPECS
+
+# The cleaned sample data the distributions are learned from
+SAMPLE_DATA_DIR = project_root / "notebooks" / "data" / "processed"
+
+# Rows generated and written per chunk
+GENERATOR_CHUNK_ROWS = 500000
+
+
+def parse_size(size):
+    """Parse a row count such as 10k, 1m or 2500"""
+    size = str(size).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(size[-1:], 1)
+    return int(float(size.rstrip('km')) * multiplier)
+
+
+def _frequencies(series):
+    """Values and their observed probabilities"""
+    counts = series.value_counts(normalize=True)
+    return counts.index.to_numpy(), counts.to_numpy()
+
+
+def _draw(rng, frequencies, size):
+    """Draw size values following (values, probabilities)"""
+    values, probabilities = frequencies
+    return rng.choice(values, size, p=probabilities)
+
+
+class SyntheticDataGenerator:
+    """Writes scaled copies of the processed CSVs"""
+
+    def __init__(self, sample_dir=None, seed=42):
+        self.sample_dir = Path(sample_dir) if sample_dir else SAMPLE_DATA_DIR
+        self.seed = seed
+        self.samples = {
+            table: pd.read_csv(self.sample_dir / spec['filename'])
+            for table, spec in TABLE_SPECS.items()
+        }
+
+    def generate(self, rows, output_dir):
+        """Write all four CSVs with `rows` rows each; returns the output directory"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        rng = np.random.default_rng(self.seed)
+
+        provider_cities, provider_types = self._write_providers(rng, rows, output_dir)
+        self._write_receivers(rng, rows, output_dir)
+        self._write_food_listings(rng, rows, provider_cities, provider_types, output_dir)
+        self._write_claims(rng, rows, output_dir)
+        return output_dir
+
+    def _chunks(self, rows):
+        """(start, size) of each chunk, ids starting at 1"""
+        for start in range(0, rows, GENERATOR_CHUNK_ROWS):
+            yield start + 1, min(GENERATOR_CHUNK_ROWS, rows - start)
+
+    def _write(self, df, path, first):
+        df.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+
+    def _cities(self, rng, sample_cities, rows, size):
+        """City names drawn from a pool that grows with the table, like the sample's
+
+        The sample has nearly one distinct city per row; beyond its size the
+        sample names are reused with a numeric suffix.
+        """
+        cities = sample_cities.unique()
+        pool_size = max(len(cities), int(rows * len(cities) / len(sample_cities)))
+        picks = rng.integers(0, pool_size, size)
+        names = cities[picks % len(cities)].astype(object)
+        rounds = picks // len(cities)
+        suffixed = rounds > 0
+        names[suffixed] = [f"{name} {n}" for name, n in zip(names[suffixed], rounds[suffixed])]
+        return names
+
+    def _write_providers(self, rng, rows, output_dir):
+        sample = self.samples['providers']
+        path = output_dir / TABLE_SPECS['providers']['filename']
+        types = _frequencies(sample['type'])
+        cities, provider_types = [], []
+        for first_id, size in self._chunks(rows):
+            chunk = pd.DataFrame({
+                'provider_id': np.arange(first_id, first_id + size),
+                'name': rng.choice(sample['name'].to_numpy(), size),
+                'type': _draw(rng, types, size),
+                'address': rng.choice(sample['address'].to_numpy(), size),
+                'city': self._cities(rng, sample['city'], rows, size),
+                'contact': rng.choice(sample['contact'].to_numpy(), size)
+            })
+            self._write(chunk, path, first_id == 1)
+            cities.append(chunk['city'].to_numpy())
+            provider_types.append(chunk['type'].to_numpy())
+        return np.concatenate(cities), np.concatenate(provider_types)
+
+    def _write_receivers(self, rng, rows, output_dir):
+        sample = self.samples['receivers']
+        path = output_dir / TABLE_SPECS['receivers']['filename']
+        types = _frequencies(sample['type'])
+        for first_id, size in self._chunks(rows):
+            chunk = pd.DataFrame({
+                'receiver_id': np.arange(first_id, first_id + size),
+                'name': rng.choice(sample['name'].to_numpy(), size),
+                'type': _draw(rng, types, size),
+                'city': self._cities(rng, sample['city'], rows, size),
+                'contact': rng.choice(sample['contact'].to_numpy(), size)
+            })
+            self._write(chunk, path, first_id == 1)
+
+    def _write_food_listings(self, rng, rows, provider_cities, provider_types, output_dir):
+        sample = self.samples['food_listings']
+        path = output_dir / TABLE_SPECS['food_listings']['filename']
+        expiry = pd.to_datetime(sample['expiry_date'])
+        expiry_days = (expiry.max() - expiry.min()).days + 1
+        columns = {column: _frequencies(sample[column]) for column in ['food_name', 'quantity', 'food_type', 'meal_type']}
+        for first_id, size in self._chunks(rows):
+            provider_index = rng.integers(0, len(provider_cities), size)
+            offsets = pd.to_timedelta(rng.integers(0, expiry_days, size), unit='D')
+            chunk = pd.DataFrame({
+                'food_id': np.arange(first_id, first_id + size),
+                'food_name': _draw(rng, columns['food_name'], size),
+                'quantity': _draw(rng, columns['quantity'], size),
+                'expiry_date': (expiry.min() + offsets).strftime('%Y-%m-%d'),
+                'provider_id': provider_index + 1,
+                'provider_type': provider_types[provider_index],
+                'location': provider_cities[provider_index],
+                'food_type': _draw(rng, columns['food_type'], size),
+                'meal_type': _draw(rng, columns['meal_type'], size)
+            })
+            self._write(chunk, path, first_id == 1)
+
+    def _write_claims(self, rng, rows, output_dir):
+        sample = self.samples['claims']
+        path = output_dir / TABLE_SPECS['claims']['filename']
+        timestamps = pd.to_datetime(sample['timestamp'])
+        span_minutes = int((timestamps.max() - timestamps.min()).total_seconds() // 60) + 1
+        statuses = _frequencies(sample['status'])
+        for first_id, size in self._chunks(rows):
+            offsets = pd.to_timedelta(rng.integers(0, span_minutes, size), unit='m')
+            chunk = pd.DataFrame({
+                'claim_id': np.arange(first_id, first_id + size),
+                'food_id': rng.integers(1, rows + 1, size),
+                'receiver_id': rng.integers(1, rows + 1, size),
+                'status': _draw(rng, statuses, size),
+                'timestamp': (timestamps.min() + offsets).strftime('%Y-%m-%d %H:%M:%S')
+            })
+            self._write(chunk, path, first_id == 1)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate scaled benchmark CSVs")
+    parser.add_argument('rows', help="rows per table, e.g. 10k, 1m")
+    parser.add_argument('output_dir')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    output = SyntheticDataGenerator(seed=args.seed).generate(parse_size(args.rows), args.output_dir)
+    print(f"✅ Generated {parse_size(args.rows):,} rows per table in {output}")
@@ -0,0 +1,250 @@
+"""
+Benchmark harness for Local Food Wastage Management System
+
+For every data size it generates synthetic CSVs (kept between runs), builds a
+fresh database, then times DataLoader.load_all_data, each FoodWastageAnalyzer
+query_N method and run_all_queries, reporting percentiles in milliseconds.
+Results can be saved as per-size baselines in benchmarks/baselines/, and later
+runs are compared against them so regressions stand out.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 10k 100k
+    python benchmarks/run_benchmarks.py --sizes 1m --save-baseline
+"""
+import io
+import json
+import platform
+import sqlite3
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from benchmarks.data_generator import SyntheticDataGenerator, parse_size
+from src.database.connection import DatabaseManager
+from src.database.create_tables import TableCreator
+from src.database.data_loader import DataLoader, TABLE_SPECS
+from src.database.pool import close_all_pools
+from src.analysis.sql_queries import FoodWastageAnalyzer
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_DIR = BENCHMARK_DIR / "baselines"
+WORK_DIR = BENCHMARK_DIR / "data"  # generated CSVs and databases (not committed)
+
+DEFAULT_SIZES = ['10k', '100k']
+PERCENTILES = [50, 90, 99]
+
+# A benchmark regresses when its p50 grows by more than the tolerance and
+# by more than the noise floor in milliseconds
+DEFAULT_TOLERANCE = 0.20
+NOISE_FLOOR_MS = 1.0
+
+
+def format_size(rows):
+    """Short label for a row count, e.g. 10k or 1m"""
+    if rows % 1000000 == 0:
+        return f"{rows // 1000000}m"
+    if rows % 1000 == 0:
+        return f"{rows // 1000}k"
+    return str(rows)
+
+
+def summarize(timings):
+    """Percentiles, mean, min and max of timings in milliseconds"""
+    values = np.array(timings) * 1000
+    stats = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    stats.update({
+        'mean': round(float(values.mean()), 3),
+        'min': round(float(values.min()), 3),
+        'max': round(float(values.max()), 3),
+        'runs': len(values)
+    })
+    return stats
+
+
+def quietly(func, *args, **kwargs):
+    """Call func with its progress printing suppressed"""
+    with redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def timed(func, repeats, warmup=1):
+    """Run func warmup + repeats times; return the timings of the measured runs"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+class BenchmarkRunner:
+    """Builds scaled databases and times loading and the analytical queries"""
+
+    def __init__(self, repeats=5, load_repeats=1, work_dir=None, use_summaries=None, seed=42):
+        self.repeats = repeats
+        self.load_repeats = load_repeats
+        self.work_dir = Path(work_dir) if work_dir else WORK_DIR
+        self.use_summaries = use_summaries
+        self.generator = SyntheticDataGenerator(seed=seed)
+
+    def prepare_data(self, rows):
+        """Generated CSVs for this size, created on first use"""
+        csv_dir = self.work_dir / f"csv_{format_size(rows)}"
+        if not all((csv_dir / spec['filename']).exists() for spec in TABLE_SPECS.values()):
+            print(f"🧪 Generating {rows:,} rows per table...")
+            self.generator.generate(rows, csv_dir)
+        return csv_dir
+
+    def build_database(self, rows, csv_dir):
+        """Create a fresh database and load it; returns (db, load timings)"""
+        db_path = self.work_dir / f"bench_{format_size(rows)}.db"
+        close_all_pools()
+        for suffix in ['', '-wal', '-shm']:
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+        db = DatabaseManager(db_path)
+        quietly(TableCreator(db).create_all_tables)
+        loader = DataLoader(db=db, processed_dir=csv_dir, progress_callback=lambda *args, **kwargs: None)
+
+        timings = []
+        for _ in range(self.load_repeats):
+            started = time.perf_counter()
+            if not quietly(loader.load_all_data, mode='replace'):
+                raise RuntimeError(f"Loading benchmark data from {csv_dir} failed")
+            timings.append(time.perf_counter() - started)
+        return db, timings
+
+    def run_size(self, rows):
+        """Benchmark one data size; returns a result dict"""
+        csv_dir = self.prepare_data(rows)
+        print(f"📥 Loading {rows:,} rows per table...")
+        db, load_timings = self.build_database(rows, csv_dir)
+
+        benchmarks = {'load_all_data': summarize(load_timings)}
+        analyzer = FoodWastageAnalyzer(use_cache=False, use_summaries=self.use_summaries, db=db)
+        query_names = sorted(
+            (name for name in dir(analyzer) if name.startswith('query_')),
+            key=lambda name: int(name.split('_')[1])
+        )
+        for name in query_names:
+            print(f"⏱️  {name}")
+            benchmarks[name] = summarize(timed(getattr(analyzer, name), self.repeats))
+        print("⏱️  run_all_queries")
+        benchmarks['run_all_queries'] = summarize(
+            timed(lambda: quietly(analyzer.run_all_queries, save_results=False), self.repeats)
+        )
+
+        result = {
+            'rows': rows,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'summaries': analyzer.summaries_available(),
+            'benchmarks': benchmarks
+        }
+        close_all_pools()
+        return result
+
+
+def baseline_path(rows):
+    """Baseline file for a data size"""
+    return BASELINE_DIR / f"{format_size(rows)}.json"
+
+
+def load_baseline(rows):
+    """Saved baseline for a data size, or None"""
+    path = baseline_path(rows)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(result):
+    """Store a result as the baseline for its data size"""
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = baseline_path(result['rows'])
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def compare(result, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return [(benchmark, current p50, baseline p50)] for every regression"""
+    regressions = []
+    for name, stats in result['benchmarks'].items():
+        previous = baseline['benchmarks'].get(name)
+        if previous is None:
+            continue
+        current, before = stats['p50'], previous['p50']
+        if current > before * (1 + tolerance) and current - before > NOISE_FLOOR_MS:
+            regressions.append((name, current, before))
+    return regressions
+
+
+def print_report(result, baseline=None):
+    """Print one data size's results, with the change against the baseline"""
+    print(f"\n📊 {result['rows']:,} rows per table (SQLite {result['sqlite']}, summaries {'on' if result['summaries'] else 'off'})")
+    print("=" * 92)
+    header = f"{'benchmark':<42}" + "".join(f"{f'p{p} ms':>11}" for p in PERCENTILES) + f"{'baseline':>11}{'change':>9}"
+    print(header)
+    print("-" * 92)
+    for name, stats in result['benchmarks'].items():
+        line = f"{name:<42}" + "".join(f"{stats[f'p{p}']:>11.2f}" for p in PERCENTILES)
+        previous = baseline['benchmarks'].get(name) if baseline else None
+        if previous:
+            change = (stats['p50'] - previous['p50']) / previous['p50'] * 100 if previous['p50'] else 0.0
+            line += f"{previous['p50']:>11.2f}{change:>+8.1f}%"
+        print(line)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark loading and the analytical queries at scale")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="rows per table, e.g. 10k 100k 1m 10m")
+    parser.add_argument('--repeats', type=int, default=5, help="timed runs per query")
+    parser.add_argument('--load-repeats', type=int, default=1, help="timed runs of load_all_data")
+    parser.add_argument('--no-summaries', action='store_true', help="query the base tables directly")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baselines")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="allowed p50 slowdown (0.2 = 20%%)")
+    parser.add_argument('--work-dir', default=None, help="where generated data and databases are kept")
+    args = parser.parse_args()
+
+    runner = BenchmarkRunner(
+        repeats=args.repeats,
+        load_repeats=args.load_repeats,
+        work_dir=args.work_dir,
+        use_summaries=False if args.no_summaries else None
+    )
+
+    regressed = False
+    for size in args.sizes:
+        rows = parse_size(size)
+        result = runner.run_size(rows)
+        baseline = load_baseline(rows)
+        print_report(result, baseline)
+
+        if args.save_baseline:
+            print(f"💾 Baseline saved: {save_baseline(result)}")
+        elif baseline:
+            regressions = compare(result, baseline, args.tolerance)
+            for name, current, before in regressions:
+                print(f"⚠️  Regression in {name}: {before:.2f} ms -> {current:.2f} ms")
+            if not regressions:
+                print("✅ No regressions against the baseline")
+            regressed = regressed or bool(regressions)
+        else:
+            print("ℹ️  No baseline for this size yet (run with --save-baseline)")
+
+    sys.exit(1 if regressed else 0)
@@ -17,6 +17,146 @@ DATABASE_DIR = PROJECT_ROOT / "database"
 DATABASE_NAME = "food_management.db"
 DATABASE_PATH = DATABASE_DIR / DATABASE_NAME
 
+# Log files
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+# Compressed database backups
+BACKUP_DIR = PROJECT_ROOT / "backups"
+
+# Connection pool settings (one pool per process and database file)
+DATABASE_POOL = {
+    'enabled': True,
+    'max_connections': 8,
+    'checkout_timeout': 10.0,        # seconds to wait for a free connection
+    'health_check_interval': 30.0,   # idle seconds before a connection is re-validated
+    'cached_statements': 256         # prepared statements kept per connection
+}
+
+# PRAGMA profiles applied per connection (busy_timeout first so the WAL switch can wait for locks).
+# WAL lets dashboard sessions keep reading while another session commits a claim.
+PRAGMA_PROFILES = {
+    'read-heavy': {
+        'busy_timeout': 5000,        # milliseconds to wait on a locked database
+        'auto_vacuum': 'INCREMENTAL',  # only takes effect on a new file, so it goes before journal_mode
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',     # durable at checkpoints, safe with WAL
+        'cache_size': -65536,        # negative = KiB, i.e. 64 MB page cache
+        'mmap_size': 268435456,      # 256 MB of memory-mapped reads
+        'temp_store': 'MEMORY'
+    },
+    'bulk-load': {
+        'busy_timeout': 30000,
+        'auto_vacuum': 'INCREMENTAL',
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',        # a failed load is simply re-run
+        'cache_size': -262144,       # 256 MB page cache for index builds
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY'
+    }
+}
+
+# Active profile for application connections and the one DataLoader switches to
+DATABASE_PRAGMA_PROFILE = os.environ.get('FOOD_DB_PRAGMA_PROFILE', 'read-heavy')
+BULK_LOAD_PRAGMA_PROFILE = 'bulk-load'
+
+# Result cache for FoodWastageAnalyzer queries (invalidated whenever the database changes)
+QUERY_CACHE = {
+    'enabled': True,
+    'max_entries': 64,
+    'max_megabytes': 64
+}
+
+# Trigger-maintained summary tables answering the heavier analytical queries
+SUMMARY_TABLES = {
+    'enabled': True                 # used by FoodWastageAnalyzer once installed
+}
+
+# Streamlit result caching (entries are also keyed by the database's data version)
+STREAMLIT_CACHE = {
+    'ttl_seconds': 300,             # upper bound on how long any result is reused
+    'max_entries': 256,             # per cached function
+    'fan_out_workers': 8            # threads running one page's independent queries at once (shared)
+}
+
+# Per-statement timing, row and DataFrame memory statistics (see src/database/instrumentation.py)
+INSTRUMENTATION = {
+    'enabled': True,
+    'max_statements': 500,          # distinct normalized statements tracked individually
+    'deep_memory': True             # count string contents when sizing fetched DataFrames
+}
+
+# Statements slower than the threshold are logged with their parameters, plan and caller
+SLOW_QUERY_LOG = {
+    'enabled': True,
+    'threshold_ms': 250,
+    'path': LOGS_DIR / "slow_queries.log",
+    'max_megabytes': 5,             # size at which the log rotates
+    'backup_count': 3,              # rotated files kept
+    'explain': True                 # capture EXPLAIN QUERY PLAN for each slow statement
+}
+
+# Online backups: copied a few pages at a time so readers and writers keep going
+BACKUP_SETTINGS = {
+    'scheduler_enabled': True,      # run scheduled backups in a background thread
+    'frequency': 'Daily',           # default schedule (one of the admin tab's choices)
+    'retention_days': 30,           # backups older than this are deleted (the newest is always kept)
+    'pages_per_step': 1024,         # pages copied per backup step
+    'step_pause_seconds': 0.005,    # pause between steps so the copy yields to the app
+    'max_restarts': 3,              # source changes tolerated before finishing in one step
+    'compression_level': 1,         # gzip level (1 is ~3x faster than 6 for ~10% larger files)
+    'verify': True,                 # PRAGMA quick_check on the copy before compressing it
+    'check_interval_seconds': 60    # how often the scheduler checks whether a backup is due
+}
+
+# Expiry sweeper: marks expired listings unavailable and tracks the ones expiring soon
+EXPIRY_SWEEPER = {
+    'enabled': True,                # run the sweeper in a background thread
+    'interval_seconds': 60,         # time between sweeps
+    'soon_days': 2,                 # "expiring soon" window (matches the food listings page)
+    'horizon_days': 7,              # listings expiring within this many days are kept in memory
+    'reseed_seconds': 3600,         # full reload from the database (picks up edited dates)
+    'batch_size': 500               # listings marked unavailable per transaction
+}
+
+# Single-writer write queue: one worker commits session writes in small batches
+WRITE_QUEUE = {
+    'batch_size': 64,               # most writes per transaction
+    'max_wait_ms': 2,               # how long the worker waits for a batch to fill
+    'busy_retries': 5,              # batch retries when another process holds the lock
+    'retry_backoff_ms': 20,         # first backoff, doubled per attempt (with jitter)
+    'result_timeout': 30.0          # seconds a session waits for its write to commit
+}
+
+# Claim writes: BEGIN IMMEDIATE transactions retried when the write lock stays busy
+CLAIMS_SERVICE = {
+    'busy_retries': 5,              # extra attempts after busy_timeout runs out
+    'retry_backoff_ms': 20,         # first backoff, doubled per attempt (with jitter)
+    'idempotency_days': 7,          # how long idempotency keys are remembered
+    'purge_interval_seconds': 3600  # how often the expiry sweeper deletes older keys
+}
+
+# Food matching: score weights and how many listings each city offers as candidates
+MATCHING = {
+    'weights': {
+        'location': 0.35,           # receiver's city matches the listing's location
+        'food_type': 0.20,          # share of the receiver's claims of this food type
+        'meal_type': 0.15,          # share of the receiver's claims of this meal type
+        'quantity': 0.10,           # larger listings feed more people
+        'urgency': 0.20             # closer to expiry ranks higher
+    },
+    'horizon_days': 7,              # expiry this far out or later scores no urgency
+    'candidates_per_city': 200,     # soonest-expiring open listings considered per city
+    'recommendations': 5,           # listings returned per receiver
+    'batch_size': 5000              # receivers scored per matrix
+}
+
+# CSV ingestion: files above the threshold are streamed in chunks to bound memory
+INGESTION_SETTINGS = {
+    'chunk_size': 100000,           # rows per streamed chunk
+    'stream_threshold_mb': 256,     # stream automatically for files larger than this
+    'parallel_workers': 4           # processes parsing CSVs in load_all_data (1 = sequential)
+}
+
 # CSV file paths
 CSV_FILES = {
     'providers': RAW_DATA_DIR / "providers_data.csv",
@@ -0,0 +1,271 @@
+"""
+Food matching engine for Local Food Wastage Management System
+
+Ranks open food listings for receivers. Open listings are loaded once and
+indexed per city, ordered by expiry date, so every receiver in a city draws
+from the same short list of soonest-expiring candidates. Each receiver's
+food_type and meal_type preferences come from their claim history. Scores
+combine city match, those preferences, quantity and urgency (time to
+expiry), and are computed as receivers x candidates matrices over whole
+groups of cities at once, so thousands of receivers take one pass and no
+per-receiver SQL.
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+from config.settings import MATCHING
+
+FOOD_TYPES = ['Vegetarian', 'Non-Vegetarian', 'Vegan']
+MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner', 'Snacks']
+
+# Available, not expired (expiry_date after as_of), and neither reserved (pending) nor already collected
+OPEN_LISTINGS_QUERY = """
+SELECT
+    f.food_id,
+    f.food_name,
+    f.quantity,
+    f.expiry_date,
+    f.location,
+    f.food_type,
+    f.meal_type,
+    f.provider_id,
+    p.name as provider_name,
+    p.contact as provider_contact
+FROM food_listings f
+LEFT JOIN providers p ON f.provider_id = p.provider_id
+WHERE f.is_available = 1
+  AND f.expiry_date > ?
+  AND NOT EXISTS (
+      SELECT 1 FROM claims c
+      WHERE c.food_id = f.food_id AND c.status IN ('Pending', 'Completed')
+  )
+ORDER BY f.expiry_date, f.food_id
+"""
+
+PREFERENCES_QUERY = """
+SELECT c.receiver_id, f.food_type, f.meal_type, COUNT(*) as claims
+FROM claims c
+JOIN food_listings f ON c.food_id = f.food_id
+WHERE c.status != 'Cancelled'
+GROUP BY c.receiver_id, f.food_type, f.meal_type
+"""
+
+RECOMMENDATION_COLUMNS = [
+    'receiver_id', 'rank', 'food_id', 'food_name', 'quantity', 'expiry_date', 'days_to_expiry',
+    'location', 'food_type', 'meal_type', 'provider_name', 'provider_contact', 'city_match', 'score'
+]
+
+
+def city_keys(cities):
+    """City keys shared by receivers and listing locations (trimmed, lower case)"""
+    return cities.fillna('').astype(str).str.strip().str.lower()
+
+
+class FoodMatchingEngine:
+    """Batch recommendations of open food listings for receivers"""
+
+    def __init__(self, db=None, weights=None, horizon_days=None, candidates_per_city=None):
+        self.db = db or DatabaseManager()
+        self.weights = dict(MATCHING['weights'], **(weights or {}))
+        self.horizon_days = horizon_days or MATCHING['horizon_days']
+        self.candidates_per_city = candidates_per_city or MATCHING['candidates_per_city']
+        self.as_of = None
+        self.listings = pd.DataFrame()
+        self.receivers = pd.DataFrame()
+        self.city_inventory = {}  # city key -> (bucket width, row in that bucket's matrix)
+        self.city_buckets = {}
+        self.fallback_candidates = np.array([], dtype=np.int64)
+
+    def load(self, as_of=None):
+        """Read open listings, receivers and claim preferences and build the city index
+
+        as_of (a date, default today) decides which listings have expired.
+        Returns self, or None if the data could not be read.
+        """
+        self.as_of = pd.Timestamp(as_of or date.today()).normalize()
+
+        listings = self.db.fetch_dataframe(OPEN_LISTINGS_QUERY, (self.as_of.strftime('%Y-%m-%d'),))
+        receivers = self.db.fetch_dataframe("SELECT receiver_id, name, type, city FROM receivers")
+        preferences = self.db.fetch_dataframe(PREFERENCES_QUERY)
+        if listings is None or receivers is None or preferences is None:
+            print("❌ Could not load matching data")
+            return None
+
+        self.listings = self._listing_features(listings.reset_index(drop=True))
+        self.receivers = self._receiver_preferences(receivers, preferences)
+        self._build_city_index()
+        return self
+
+    def _listing_features(self, listings):
+        """Per-listing scores that do not depend on the receiver"""
+        expiry = pd.to_datetime(listings['expiry_date'], format='%Y-%m-%d', errors='coerce')
+        listings['days_to_expiry'] = (expiry - self.as_of).dt.days
+        # Sooner expiry ranks higher: 1.0 tomorrow, 0.0 at or beyond the horizon
+        listings['urgency'] = (1 - (listings['days_to_expiry'] - 1) / self.horizon_days).clip(0, 1).fillna(0)
+        quantity = listings['quantity'].astype(float)
+        listings['quantity_score'] = np.log1p(quantity) / np.log1p(quantity.max()) if len(listings) else quantity
+        listings['city_key'] = city_keys(listings['location'])
+        listings['food_type_code'] = pd.Categorical(listings['food_type'], categories=FOOD_TYPES).codes
+        listings['meal_type_code'] = pd.Categorical(listings['meal_type'], categories=MEAL_TYPES).codes
+        return listings
+
+    def _receiver_preferences(self, receivers, preferences):
+        """Receivers with food_type and meal_type preference shares (1.0 = most claimed)"""
+        receivers = receivers.set_index('receiver_id')
+        receivers['city_key'] = city_keys(receivers['city'])
+
+        for column, categories in [('food_type', FOOD_TYPES), ('meal_type', MEAL_TYPES)]:
+            counts = preferences.pivot_table(
+                index='receiver_id', columns=column, values='claims', aggfunc='sum', fill_value=0
+            ).reindex(index=receivers.index, columns=categories, fill_value=0)
+            # One pseudo-claim per category, so receivers without history prefer nothing in particular
+            counts = counts + 1
+            shares = counts.div(counts.max(axis=1), axis=0)
+            receivers[[f"{column}:{category}" for category in categories]] = shares.to_numpy()
+        return receivers
+
+    def _build_city_index(self):
+        """Per city, the listing rows of its soonest-expiring candidates
+
+        Listings arrive ordered by expiry, so each city's first rows are the
+        front of its expiry priority queue. Cities are grouped into buckets
+        by candidate count (powers of two) and stored as padded row matrices
+        (-1 = no listing), so receivers of many small cities are scored
+        together instead of one city at a time.
+        """
+        top = self.listings.groupby('city_key', sort=False).head(self.candidates_per_city)
+        # Receivers in cities without stock are offered the soonest-expiring listings anywhere
+        self.fallback_candidates = self.listings.index.to_numpy()[:self.candidates_per_city]
+        self.city_buckets = {}
+        self.city_inventory = {}
+        if top.empty:
+            return
+
+        codes, cities = pd.factorize(top['city_key'])
+        order = np.argsort(codes, kind='stable')  # grouped by city, still in expiry order
+        rows, codes = top.index.to_numpy()[order], codes[order]
+        counts = np.bincount(codes)
+        slot = np.arange(len(rows)) - (np.cumsum(counts) - counts)[codes]
+        widths = 1 << np.ceil(np.log2(counts)).astype(np.int64)
+        positions = np.zeros(len(counts), dtype=np.int64)
+
+        for width in np.unique(widths):
+            members = np.flatnonzero(widths == width)
+            positions[members] = np.arange(len(members))
+            matrix = np.full((len(members), width), -1, dtype=np.int64)
+            in_bucket = widths[codes] == width
+            matrix[positions[codes[in_bucket]], slot[in_bucket]] = rows[in_bucket]
+            self.city_buckets[int(width)] = matrix
+        self.city_inventory = dict(zip(cities, zip(widths.tolist(), positions.tolist())))
+
+        w = self.weights
+        self._food_codes = self.listings['food_type_code'].clip(lower=0).to_numpy()
+        self._meal_codes = self.listings['meal_type_code'].clip(lower=0).to_numpy()
+        self._listing_scores = (
+            w['quantity'] * self.listings['quantity_score'].to_numpy()
+            + w['urgency'] * self.listings['urgency'].to_numpy()
+        )
+
+    def _rank(self, food_shares, meal_shares, candidates, city_match, limit):
+        """Top `limit` candidate rows and scores for a batch of receivers
+
+        candidates is a receivers x width matrix of listing rows (-1 pads).
+        """
+        valid = candidates >= 0
+        rows = np.where(valid, candidates, 0)
+        w = self.weights
+        scores = (
+            w['food_type'] * np.take_along_axis(food_shares, self._food_codes[rows], axis=1)
+            + w['meal_type'] * np.take_along_axis(meal_shares, self._meal_codes[rows], axis=1)
+            + self._listing_scores[rows]
+            + w['location'] * float(city_match)
+        )
+        scores[~valid] = -np.inf
+
+        take = min(limit, candidates.shape[1])
+        top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        return np.take_along_axis(rows, np.take_along_axis(top, order, axis=1), axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def recommend(self, receiver_ids=None, limit=None):
+        """Top listings for each receiver (all receivers by default), in one batched pass
+
+        Returns a DataFrame with RECOMMENDATION_COLUMNS, ranked from 1 per
+        receiver; empty when nothing is open or no receivers match.
+        """
+        if self.as_of is None:
+            self.load()
+        limit = limit or MATCHING['recommendations']
+        receivers = self.receivers if receiver_ids is None else self.receivers.loc[
+            self.receivers.index.intersection(pd.Index(receiver_ids))
+        ]
+        if receivers.empty or self.listings.empty:
+            return pd.DataFrame(columns=RECOMMENDATION_COLUMNS)
+
+        receiver_ids = receivers.index.to_numpy()
+        food_shares = receivers[[f"food_type:{category}" for category in FOOD_TYPES]].to_numpy()
+        meal_shares = receivers[[f"meal_type:{category}" for category in MEAL_TYPES]].to_numpy()
+        located = receivers['city_key'].map(self.city_inventory)
+        widths = located.map(lambda entry: entry[0] if isinstance(entry, tuple) else 0).to_numpy()
+        positions = located.map(lambda entry: entry[1] if isinstance(entry, tuple) else 0).to_numpy()
+
+        batch_size = MATCHING['batch_size']
+        parts = []
+        for width in np.unique(widths):
+            members = np.flatnonzero(widths == width)
+            # Bounded batches keep the score matrix small however many receivers share a bucket
+            for start in range(0, len(members), batch_size):
+                batch = members[start:start + batch_size]
+                if width:
+                    candidates = self.city_buckets[width][positions[batch]]
+                else:
+                    candidates = np.broadcast_to(self.fallback_candidates, (len(batch), len(self.fallback_candidates)))
+                rows, scores = self._rank(food_shares[batch], meal_shares[batch], candidates, bool(width), limit)
+                keep = np.isfinite(scores)
+                parts.append((
+                    np.repeat(receiver_ids[batch], rows.shape[1])[keep.ravel()],
+                    np.tile(np.arange(1, rows.shape[1] + 1), len(batch))[keep.ravel()],
+                    rows[keep],
+                    scores[keep],
+                    np.full(keep.sum(), bool(width))
+                ))
+
+        receiver_column, rank, rows, scores, city_match = (np.concatenate(column) for column in zip(*parts))
+        recommendations = self.listings.iloc[rows].reset_index(drop=True)
+        recommendations['receiver_id'] = receiver_column
+        recommendations['rank'] = rank
+        recommendations['city_match'] = city_match
+        recommendations['score'] = scores.round(4)
+        return recommendations.sort_values(['receiver_id', 'rank'], ignore_index=True)[RECOMMENDATION_COLUMNS]
+
+    def recommend_for_receiver(self, receiver_id, limit=None):
+        """Top listings for one receiver"""
+        return self.recommend([receiver_id], limit)
+
+    def inventory_summary(self):
+        """Open listings, quantity and soonest expiry per location"""
+        if self.listings.empty:
+            return pd.DataFrame(columns=['location', 'open_listings', 'total_quantity', 'soonest_expiry'])
+        return self.listings.groupby('location', as_index=False).agg(
+            open_listings=('food_id', 'count'),
+            total_quantity=('quantity', 'sum'),
+            soonest_expiry=('expiry_date', 'min')
+        ).sort_values('open_listings', ascending=False)
+
+if __name__ == "__main__":
+    engine = FoodMatchingEngine().load()
+    if engine:
+        recommendations = engine.recommend()
+        print(f"🎯 {len(engine.listings):,} open listings, {len(engine.receivers):,} receivers, "
+              f"{len(recommendations):,} recommendations")
+        print(recommendations.head(10).to_string(index=False))
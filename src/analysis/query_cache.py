@@ -0,0 +1,139 @@
+"""
+Result cache for FoodWastageAnalyzer queries
+Entries are dropped automatically whenever the database changes
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+
+class DataVersionWatcher:
+    """Detects commits to a database file through PRAGMA data_version
+
+    data_version only moves when a *different* connection commits, so the
+    watcher keeps its own connection that never writes anything.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Return the current data version of the database file"""
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache of query DataFrames bounded by entry count and size"""
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (DataFrame, size in bytes)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _sync_version(self, version):
+        """Forget everything cached against an older data version"""
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached DataFrame for key, or None"""
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, version):
+        """Store a DataFrame computed against the given data version"""
+        size = int(value.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._sync_version(version)
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and current usage"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'data_version': self._version
+            }
+
+
+# One cache and watcher per database file, shared by every analyzer in the process
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_cache(db_path, max_entries=64, max_bytes=64 * 1024 * 1024):
+    """Get (or lazily create) the shared (cache, watcher) pair for a database file"""
+    key = str(db_path)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = (QueryResultCache(max_entries, max_bytes), DataVersionWatcher(db_path))
+        return _caches[key]
+
+
+def cached_query(method):
+    """Memoize an analyzer query method by name and arguments
+
+    The owning object provides ``cache`` (or None to bypass caching) and
+    ``version_watcher``. Callers always receive their own copy of the result.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, 'cache', None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        # Read the version before running the query so a concurrent write
+        # can only make the stored entry look older, never fresher
+        version = self.version_watcher.current()
+        result = cache.get(key, version)
+        if result is None:
+            result = method(self, *args, **kwargs)
+            if result is None:
+                return None
+            cache.put(key, result, version)
+        return result.copy()
+
+    return wrapper
@@ -11,39 +11,69 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
 from src.database.connection import DatabaseManager
+from src.database.summary_tables import SummaryTableManager
+from src.analysis.query_cache import cached_query, get_query_cache
+from config.settings import QUERY_CACHE, SUMMARY_TABLES
+
+# Query 15 rows in output order: (category, metric name, value column, percentage column)
+SYSTEM_METRICS = [
+    ('Claims Performance', 'Successful Claims', 'successful_claims', 'successful_claims_percentage'),
+    ('Claims Performance', 'Total Claims Made', 'total_claims', None),
+    ('Distribution Efficiency', 'Food Successfully Distributed', 'food_distributed', 'food_distributed_percentage'),
+    ('Food Availability', 'Total Food Items Listed', 'total_food_items', None),
+    ('Food Availability', 'Total Quantity Available', 'total_quantity', None),
+    ('System Overview', 'Total Active Providers', 'active_providers', None),
+    ('System Overview', 'Total Active Receivers', 'active_receivers', None)
+]
 
 class FoodWastageAnalyzer:
     """Handles all SQL queries and analysis for food wastage management"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, use_cache=None, use_summaries=None, db=None):
+        self.db = db or DatabaseManager()
+        self.summaries = None
+        if SUMMARY_TABLES['enabled'] if use_summaries is None else use_summaries:
+            self.summaries = SummaryTableManager(self.db)
+        self.cache = None
+        self.version_watcher = None
+        if QUERY_CACHE['enabled'] if use_cache is None else use_cache:
+            # Shared per database file, so results survive across analyzer instances
+            self.cache, self.version_watcher = get_query_cache(
+                self.db.db_path,
+                max_entries=QUERY_CACHE['max_entries'],
+                max_bytes=QUERY_CACHE['max_megabytes'] * 1024 * 1024
+            )
+            
+    def summaries_available(self):
+        """Check whether queries can be answered from the summary tables"""
+        return self.summaries is not None and self.summaries.is_installed()
         
     # ==============================================================
     # FOOD PROVIDERS & RECEIVERS ANALYSIS (Queries 1-4)
     # ==============================================================
     
+    @cached_query
     def query_1_providers_receivers_by_city(self):
         """Query 1: How many food providers and receivers are there in each city?"""
+        # One grouped pass over both tables; a FULL OUTER JOIN of the per-city
+        # counts has no index to use and grows quadratically with the cities
         query = """
         SELECT 
-            COALESCE(p.city, r.city) as city,
-            COALESCE(provider_count, 0) as providers,
-            COALESCE(receiver_count, 0) as receivers,
-            COALESCE(provider_count, 0) + COALESCE(receiver_count, 0) as total_entities
+            city,
+            SUM(is_provider) as providers,
+            SUM(1 - is_provider) as receivers,
+            COUNT(*) as total_entities
         FROM (
-            SELECT city, COUNT(*) as provider_count 
-            FROM providers 
-            GROUP BY city
-        ) p
-        FULL OUTER JOIN (
-            SELECT city, COUNT(*) as receiver_count 
-            FROM receivers 
-            GROUP BY city
-        ) r ON p.city = r.city
+            SELECT city, 1 as is_provider FROM providers
+            UNION ALL
+            SELECT city, 0 as is_provider FROM receivers
+        )
+        GROUP BY city
         ORDER BY total_entities DESC, city
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_2_top_provider_types(self):
         """Query 2: Which type of food provider contributes the most food?"""
         query = """
@@ -63,6 +93,7 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_3_provider_contacts_by_city(self):
         """Query 3: What is the contact information of food providers in a specific city?"""
         query = """
@@ -80,8 +111,11 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_4_top_food_claimers(self):
         """Query 4: Which receivers have claimed the most food?"""
+        if self.summaries_available():
+            return self.summaries.fetch('query_4_top_food_claimers')
         query = """
         SELECT 
             r.receiver_id,
@@ -112,6 +146,7 @@ class FoodWastageAnalyzer:
     # FOOD LISTINGS & AVAILABILITY ANALYSIS (Queries 5-7)
     # ==============================================================
     
+    @cached_query
     def query_5_total_food_available(self):
         """Query 5: What is the total quantity of food available from all providers?"""
         query = """
@@ -129,6 +164,7 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_6_food_listings_by_city(self):
         """Query 6: Which city has the highest number of food listings?"""
         query = """
@@ -149,8 +185,11 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_7_common_food_types(self):
         """Query 7: What are the most commonly available food types?"""
+        if self.summaries_available():
+            return self.summaries.fetch('query_7_common_food_types')
         query = """
         SELECT 
             food_type,
@@ -175,6 +214,7 @@ class FoodWastageAnalyzer:
     # CLAIMS & DISTRIBUTION ANALYSIS (Queries 8-10)
     # ==============================================================
     
+    @cached_query
     def query_8_claims_per_food_item(self):
         """Query 8: How many food claims have been made for each food item?"""
         query = """
@@ -203,8 +243,11 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_9_successful_providers(self):
         """Query 9: Which provider has had the highest number of successful food claims?"""
+        if self.summaries_available():
+            return self.summaries.fetch('query_9_successful_providers')
         query = """
         SELECT 
             p.provider_id,
@@ -232,6 +275,7 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_10_claim_status_distribution(self):
         """Query 10: What percentage of food claims are completed vs. pending vs. canceled?"""
         query = """
@@ -283,6 +327,7 @@ class FoodWastageAnalyzer:
     # ANALYSIS & INSIGHTS (Queries 11-15)
     # ==============================================================
     
+    @cached_query
     def query_11_avg_food_per_receiver(self):
         """Query 11: What is the average quantity of food claimed per receiver?"""
         query = """
@@ -311,6 +356,7 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_12_meal_type_popularity(self):
         """Query 12: Which meal type is claimed the most?"""
         query = """
@@ -342,8 +388,11 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_13_provider_food_donations(self):
         """Query 13: What is the total quantity of food donated by each provider?"""
+        if self.summaries_available():
+            return self.summaries.fetch('query_13_provider_food_donations')
         query = """
         SELECT 
             p.provider_id,
@@ -371,8 +420,11 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_14_geographic_food_distribution(self):
         """Query 14: Geographic analysis of food distribution patterns"""
+        if self.summaries_available():
+            return self.summaries.fetch('query_14_geographic_food_distribution')
         query = """
         SELECT 
             f.location as city,
@@ -402,83 +454,95 @@ class FoodWastageAnalyzer:
         """
         return self.db.fetch_dataframe(query)
     
+    @cached_query
     def query_15_comprehensive_system_metrics(self):
-        """Query 15: Comprehensive system performance metrics"""
-        query = """
-        SELECT 
-            'System Overview' as metric_category,
-            'Total Active Providers' as metric_name,
-            COUNT(DISTINCT p.provider_id) as metric_value,
-            NULL as percentage
-        FROM providers p
-        INNER JOIN food_listings f ON p.provider_id = f.provider_id
-        
-        UNION ALL
+        """Query 15: Comprehensive system performance metrics
         
-        SELECT 
-            'System Overview' as metric_category,
-            'Total Active Receivers' as metric_name,
-            COUNT(DISTINCT r.receiver_id) as metric_value,
-            NULL as percentage
-        FROM receivers r
-        INNER JOIN claims c ON r.receiver_id = c.receiver_id
-        
-        UNION ALL
-        
-        SELECT 
-            'Food Availability' as metric_category,
-            'Total Food Items Listed' as metric_name,
-            COUNT(*) as metric_value,
-            NULL as percentage
-        FROM food_listings
-        
-        UNION ALL
-        
-        SELECT 
-            'Food Availability' as metric_category,
-            'Total Quantity Available' as metric_name,
-            SUM(quantity) as metric_value,
-            NULL as percentage
-        FROM food_listings
-        
-        UNION ALL
-        
-        SELECT 
-            'Claims Performance' as metric_category,
-            'Total Claims Made' as metric_name,
-            COUNT(*) as metric_value,
-            NULL as percentage
-        FROM claims
-        
-        UNION ALL
-        
-        SELECT 
-            'Claims Performance' as metric_category,
-            'Successful Claims' as metric_name,
-            COUNT(*) as metric_value,
-            ROUND(COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims), 2) as percentage
-        FROM claims 
-        WHERE status = 'Completed'
-        
-        UNION ALL
-        
-        SELECT 
-            'Distribution Efficiency' as metric_category,
-            'Food Successfully Distributed' as metric_name,
-            SUM(f.quantity) as metric_value,
-            ROUND(SUM(f.quantity) * 100.0 / (SELECT SUM(quantity) FROM food_listings), 2) as percentage
-        FROM claims c
-        INNER JOIN food_listings f ON c.food_id = f.food_id
-        WHERE c.status = 'Completed'
-        
-        ORDER BY metric_category, metric_name
+        All KPIs are computed by one statement and unpivoted into the usual
+        one-row-per-metric layout. With summary tables installed the per-entity
+        figures come from their maintained counters and only the claim status
+        totals touch a base table.
         """
-        return self.db.fetch_dataframe(query)
+        if self.summaries_available():
+            query = """
+            SELECT 
+                (SELECT COUNT(*) FROM summary_provider WHERE total_food_items_listed > 0) as active_providers,
+                (SELECT COUNT(*) FROM summary_receiver WHERE total_claims > 0) as active_receivers,
+                l.total_food_items,
+                l.total_quantity,
+                c.total_claims,
+                c.successful_claims,
+                ROUND(c.successful_claims * 100.0 / c.total_claims, 2) as successful_claims_percentage,
+                d.food_distributed,
+                ROUND(d.food_distributed * 100.0 / l.total_quantity, 2) as food_distributed_percentage
+            FROM (
+                SELECT COALESCE(SUM(number_of_listings), 0) as total_food_items, SUM(total_quantity) as total_quantity
+                FROM summary_food_type
+            ) l, (
+                SELECT CASE WHEN SUM(completed_claims) > 0 THEN SUM(food_distributed) END as food_distributed
+                FROM summary_city
+            ) d, (
+                SELECT 
+                    COUNT(*) as total_claims,
+                    COUNT(CASE WHEN status = 'Completed' THEN 1 END) as successful_claims
+                FROM claims
+            ) c
+            """
+        else:
+            query = """
+            SELECT 
+                (
+                    SELECT COUNT(*) FROM (SELECT DISTINCT provider_id FROM food_listings) d
+                    INNER JOIN providers p ON p.provider_id = d.provider_id
+                ) as active_providers,
+                (
+                    SELECT COUNT(*) FROM (SELECT DISTINCT receiver_id FROM claims) d
+                    INNER JOIN receivers r ON r.receiver_id = d.receiver_id
+                ) as active_receivers,
+                l.total_food_items,
+                l.total_quantity,
+                c.total_claims,
+                c.successful_claims,
+                ROUND(c.successful_claims * 100.0 / c.total_claims, 2) as successful_claims_percentage,
+                c.food_distributed,
+                ROUND(c.food_distributed * 100.0 / l.total_quantity, 2) as food_distributed_percentage
+            FROM (
+                SELECT COUNT(*) as total_food_items, SUM(quantity) as total_quantity
+                FROM food_listings
+            ) l, (
+                SELECT 
+                    COUNT(*) as total_claims,
+                    COUNT(CASE WHEN status = 'Completed' THEN 1 END) as successful_claims,
+                    SUM(CASE WHEN status = 'Completed' THEN (
+                        SELECT f.quantity FROM food_listings f WHERE f.food_id = claims.food_id
+                    ) END) as food_distributed
+                FROM claims
+            ) c
+            """
+        result = self.db.execute_query(query)
+        if not result:
+            return None
+            
+        totals = result[0]
+        rows = [
+            (category, name, totals[value_column], totals[percentage_column] if percentage_column else None)
+            for category, name, value_column, percentage_column in SYSTEM_METRICS
+        ]
+        return pd.DataFrame(rows, columns=['metric_category', 'metric_name', 'metric_value', 'percentage'])
     
     # ==============================================================
     # UTILITY METHODS
     # ==============================================================
     
+    def clear_cache(self):
+        """Drop all cached query results"""
+        if self.cache is not None:
+            self.cache.clear()
+            
+    def get_cache_stats(self):
+        """Get result cache statistics (None when caching is disabled)"""
+        return self.cache.stats() if self.cache is not None else None
+    
     def run_all_queries(self, save_results=True):
         """Run all 15 queries and optionally save results"""
         print("🔍 Running all 15 analytical queries...")
@@ -0,0 +1,301 @@
+"""
+Online database backups for Local Food Wastage Management System
+
+BackupManager copies the live database with SQLite's backup API a few pages
+at a time, so sessions keep reading and committing while a multi-GB file is
+copied, checks the copy, gzips it into BACKUP_DIR and deletes backups older
+than the retention period. Backups run in a background thread, either from
+the admin page or on the schedule chosen there.
+"""
+import gzip
+import json
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import BACKUP_DIR, BACKUP_SETTINGS
+from src.database.connection import DatabaseManager
+from src.database.pool import read_only_uri
+
+# Schedule choices offered on the admin page, in hours
+BACKUP_FREQUENCIES = {
+    'Every 6 hours': 6,
+    'Daily': 24,
+    'Weekly': 24 * 7,
+    'Monthly': 24 * 30
+}
+
+SCHEDULE_FILE = "schedule.json"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+class _TooManyRestarts(Exception):
+    """Raised from the progress callback to abandon a stepwise copy"""
+
+
+def format_age(seconds):
+    """Human-readable age, e.g. '5 minutes ago'"""
+    for unit, size in [('day', 86400), ('hour', 3600), ('minute', 60)]:
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return "just now"
+
+
+class BackupManager:
+    """Creates, lists and expires compressed online backups of one database"""
+
+    def __init__(self, db=None, backup_dir=None):
+        self.db = db or DatabaseManager()
+        self.backup_dir = Path(backup_dir) if backup_dir else BACKUP_DIR
+        self.stem = Path(self.db.db_path).stem
+        self.status = {'running': False, 'phase': None, 'copied_pages': 0, 'total_pages': 0,
+                       'started': None, 'last_result': None, 'last_error': None}
+        self._lock = threading.Lock()
+        self._scheduler = None
+        self._stop = threading.Event()
+
+    # Settings chosen on the admin page
+
+    def load_settings(self):
+        """Schedule and retention, from the admin page's saved choice or the defaults"""
+        settings = {'frequency': BACKUP_SETTINGS['frequency'], 'retention_days': BACKUP_SETTINGS['retention_days']}
+        path = self.backup_dir / SCHEDULE_FILE
+        if path.exists():
+            try:
+                with open(path) as f:
+                    settings.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error reading backup settings: {e}")
+        return settings
+
+    def save_settings(self, frequency, retention_days):
+        """Store the schedule and retention; returns True on success"""
+        if frequency not in BACKUP_FREQUENCIES:
+            print(f"❌ Unknown backup frequency: {frequency}")
+            return False
+        try:
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.backup_dir / SCHEDULE_FILE, 'w') as f:
+                json.dump({'frequency': frequency, 'retention_days': int(retention_days)}, f)
+            return True
+        except OSError as e:
+            print(f"Error saving backup settings: {e}")
+            return False
+
+    # Backups on disk
+
+    def list_backups(self):
+        """Backups of this database, newest first"""
+        backups = []
+        for path in self.backup_dir.glob(f"{self.stem}_*.db.gz"):
+            try:
+                created = datetime.strptime(path.name[len(self.stem) + 1:-len(".db.gz")], TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            backups.append({'name': path.name, 'path': path, 'created': created, 'bytes': path.stat().st_size})
+        return sorted(backups, key=lambda backup: backup['created'], reverse=True)
+
+    def last_backup(self):
+        """Newest backup, or None"""
+        backups = self.list_backups()
+        return backups[0] if backups else None
+
+    def apply_retention(self, retention_days=None):
+        """Delete backups older than the retention period (never the newest); returns the names deleted"""
+        if retention_days is None:
+            retention_days = self.load_settings()['retention_days']
+        now = datetime.now()
+        deleted = []
+        for backup in self.list_backups()[1:]:
+            if (now - backup['created']).total_seconds() > retention_days * 86400:
+                try:
+                    backup['path'].unlink()
+                    deleted.append(backup['name'])
+                except OSError as e:
+                    print(f"Error deleting backup {backup['name']}: {e}")
+        return deleted
+
+    # Taking a backup
+
+    def _copy(self, source, target, pages_per_step):
+        """Copy source into target with the backup API; returns how many times the copy restarted"""
+        state = {'remaining': None, 'restarts': 0, 'steps': 0}
+
+        def progress(status, remaining, total):
+            # Another connection writing to the source makes the next step start over,
+            # which reports the same (or, if the file grew, a larger) remaining count
+            if state['remaining'] is not None and remaining >= state['remaining']:
+                state['restarts'] += 1
+            state['steps'] += 1
+            # Also cap the steps, in case restarts land between our callbacks unseen
+            max_steps = (BACKUP_SETTINGS['max_restarts'] + 1) * -(-total // pages_per_step)
+            if state['restarts'] > BACKUP_SETTINGS['max_restarts'] or state['steps'] > max_steps:
+                raise _TooManyRestarts()
+            state['remaining'] = remaining
+            self.status['copied_pages'] = total - remaining
+            self.status['total_pages'] = total
+            time.sleep(BACKUP_SETTINGS['step_pause_seconds'])
+
+        try:
+            source.backup(target, pages=pages_per_step, progress=progress)
+        except _TooManyRestarts:
+            # Under steady writes a stepwise copy may never finish; one step holds
+            # only a read transaction in WAL mode, so sessions are still not blocked
+            source.backup(target, pages=-1)
+            self.status['copied_pages'] = self.status['total_pages']
+        return state['restarts']
+
+    def _compress(self, path, output):
+        """Gzip path into output via a partial file, so a crash never leaves a truncated backup"""
+        partial = output.with_name(output.name + ".partial")
+        with open(path, 'rb') as raw, gzip.open(partial, 'wb', compresslevel=BACKUP_SETTINGS['compression_level']) as packed:
+            shutil.copyfileobj(raw, packed, 1024 * 1024)
+        partial.replace(output)
+
+    def backup(self):
+        """Take a compressed backup now, in this thread
+
+        Returns a dict describing the backup (name, path, bytes, timings) or
+        None on failure; progress is visible in self.status meanwhile.
+        """
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        created = datetime.now()
+        output = self.backup_dir / f"{self.stem}_{created.strftime(TIMESTAMP_FORMAT)}.db.gz"
+        copy_path = self.backup_dir / f".{output.stem}.copy"
+        started = time.perf_counter()
+
+        self.status.update({'phase': 'copying', 'copied_pages': 0, 'total_pages': 0, 'started': time.time()})
+        try:
+            # A dedicated read-only connection: a long copy should not hold a pool slot
+            source = sqlite3.connect(read_only_uri(self.db.db_path), uri=True)
+            target = sqlite3.connect(copy_path)
+            try:
+                restarts = self._copy(source, target, BACKUP_SETTINGS['pages_per_step'])
+                copied = time.perf_counter()
+                if BACKUP_SETTINGS['verify']:
+                    self.status['phase'] = 'verifying'
+                    check = target.execute("PRAGMA quick_check").fetchone()[0]
+                    if check != 'ok':
+                        raise sqlite3.DatabaseError(f"backup copy failed quick_check: {check}")
+                # A self-contained file, whatever journal mode the source uses
+                target.execute("PRAGMA journal_mode = DELETE")
+            finally:
+                target.close()
+                source.close()
+            verified = time.perf_counter()
+
+            self.status['phase'] = 'compressing'
+            self._compress(copy_path, output)
+            finished = time.perf_counter()
+
+            return {
+                'name': output.name,
+                'path': output,
+                'created': created,
+                'bytes': output.stat().st_size,
+                'database_bytes': copy_path.stat().st_size,
+                'restarts': restarts,
+                'copy_seconds': round(copied - started, 3),
+                'verify_seconds': round(verified - copied, 3),
+                'compress_seconds': round(finished - verified, 3),
+                'total_seconds': round(finished - started, 3)
+            }
+        except (sqlite3.Error, OSError) as e:
+            print(f"❌ Backup failed: {e}")
+            self.status['last_error'] = str(e)
+            output.with_name(output.name + ".partial").unlink(missing_ok=True)
+            return None
+        finally:
+            for suffix in ['', '-journal', '-wal', '-shm']:
+                Path(f"{copy_path}{suffix}").unlink(missing_ok=True)
+            self.status['phase'] = None
+
+    def run_backup(self):
+        """Backup followed by retention, unless a backup is already running; returns the backup or None"""
+        with self._lock:
+            if self.status['running']:
+                return None
+            self.status.update({'running': True, 'last_error': None})
+        try:
+            result = self.backup()
+            if result:
+                result['deleted'] = self.apply_retention()
+                self.status['last_result'] = result
+            return result
+        finally:
+            self.status['running'] = False
+
+    def start_backup(self):
+        """Run a backup in a background thread; returns False if one is already running"""
+        if self.status['running']:
+            return False
+        threading.Thread(target=self.run_backup, name="database-backup", daemon=True).start()
+        return True
+
+    # Schedule
+
+    def backup_due(self):
+        """Whether the newest backup is older than the chosen frequency"""
+        last = self.last_backup()
+        if last is None:
+            return True
+        hours = BACKUP_FREQUENCIES.get(self.load_settings()['frequency'], 24)
+        return (datetime.now() - last['created']).total_seconds() >= hours * 3600
+
+    def _schedule_loop(self):
+        while not self._stop.wait(BACKUP_SETTINGS['check_interval_seconds']):
+            try:
+                if self.backup_due():
+                    self.run_backup()
+            except Exception as e:
+                print(f"Error in backup scheduler: {e}")
+
+    def start_scheduler(self):
+        """Start the background thread taking backups on schedule (once per manager)"""
+        with self._lock:
+            if self._scheduler is None or not self._scheduler.is_alive():
+                self._stop.clear()
+                self._scheduler = threading.Thread(target=self._schedule_loop, name="backup-scheduler", daemon=True)
+                self._scheduler.start()
+
+    def stop_scheduler(self):
+        """Stop the scheduler thread"""
+        self._stop.set()
+
+
+_backup_managers = {}
+_backup_managers_lock = threading.Lock()
+
+
+def get_backup_manager(db=None):
+    """Get (or lazily create) the process-wide backup manager for a database, with its scheduler running"""
+    db = db or DatabaseManager()
+    key = str(db.db_path)
+    with _backup_managers_lock:
+        manager = _backup_managers.get(key)
+        if manager is None:
+            manager = _backup_managers[key] = BackupManager(db)
+            if BACKUP_SETTINGS['scheduler_enabled']:
+                manager.start_scheduler()
+        return manager
+
+if __name__ == "__main__":
+    manager = BackupManager()
+    print("💾 Backing up database...")
+    result = manager.run_backup()
+    if result:
+        print(f"✅ {result['name']}: {result['database_bytes'] / 1024 / 1024:.1f} MB -> "
+              f"{result['bytes'] / 1024 / 1024:.1f} MB in {result['total_seconds']:.1f}s")
+        for name in result['deleted']:
+            print(f"🗑️  Expired {name}")
+    else:
+        print("❌ Backup failed!")
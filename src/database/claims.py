@@ -0,0 +1,295 @@
+"""
+Claim submission and transitions for Local Food Wastage Management System
+
+ClaimsService is the one write path for claims. Each operation runs in a
+BEGIN IMMEDIATE transaction, so concurrent submissions for the same listing
+are serialized by SQLite's write lock rather than racing between a read and a
+write. food_listings carries a version, bumped by a trigger whenever quantity,
+availability or expiry changes, so a claim made from a page can insist that
+the listing is still the one that was shown. Idempotency keys are recorded in
+the same transaction as the change, so a retried or double-clicked request
+returns the original outcome instead of claiming twice. Given a WriteQueue,
+operations are group-committed by its worker instead of each taking the
+write lock.
+
+A claim reserves the whole listing: submitting marks it unavailable,
+cancelling puts it back (if it has not expired), completing keeps it taken.
+"""
+import json
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import CLAIMS_SERVICE, WRITE_QUEUE
+from src.database.connection import DatabaseManager
+
+ACTIVE_STATUSES = ('Pending', 'Completed')
+
+# operation -> (status required, status set)
+TRANSITIONS = {
+    'complete': ('Pending', 'Completed'),
+    'cancel': ('Pending', 'Cancelled')
+}
+
+
+class ClaimRejected(Exception):
+    """A claim operation the current data does not allow (nothing is written)"""
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class ClaimsService:
+    """Transactional, idempotent claim submission, completion and cancellation"""
+
+    def __init__(self, db=None, sweeper=None, writer=None):
+        self.db = db or DatabaseManager()
+        self.sweeper = sweeper  # optional ExpirySweeper told about listings taken or relisted
+        self.writer = writer    # optional WriteQueue; writes then go through its single connection
+
+    def is_installed(self):
+        """Check whether the listing version column and idempotency table exist"""
+        columns = self.db.get_table_info('food_listings') or []
+        return any(column[1] == 'version' for column in columns) and self.db.table_exists('claim_requests')
+
+    def install(self):
+        """Add the listing version column, its trigger and the idempotency table"""
+        columns = self.db.get_table_info('food_listings') or []
+        with self.db.transaction("IMMEDIATE") as conn:
+            if not any(column[1] == 'version' for column in columns):
+                conn.execute("ALTER TABLE food_listings ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            # Any change a claimant could care about invalidates versions read earlier
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS food_listings_version
+            AFTER UPDATE OF quantity, is_available, expiry_date ON food_listings
+            WHEN NEW.version = OLD.version
+            BEGIN
+                UPDATE food_listings SET version = OLD.version + 1 WHERE food_id = NEW.food_id;
+            END
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS claim_requests (
+                idempotency_key TEXT PRIMARY KEY,
+                operation TEXT NOT NULL,
+                request TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+            """)
+        return True
+
+    def uninstall(self):
+        """Drop the idempotency table and the version trigger (the column goes with food_listings)"""
+        self.db.execute_query("DROP TRIGGER IF EXISTS food_listings_version")
+        self.db.drop_table('claim_requests')
+
+    def listing_version(self, food_id):
+        """Current version of a listing (None if it does not exist), for expected_version"""
+        result = self.db.execute_query("SELECT version FROM food_listings WHERE food_id = ?", (food_id,))
+        return result[0]['version'] if result else None
+
+    # Operations
+
+    def submit_claim(self, food_id, receiver_id, idempotency_key=None, expected_version=None):
+        """Claim a whole listing for a receiver; creates a Pending claim
+
+        expected_version, when given, must match the listing's current
+        version (as read by the page the claim was made from). Returns a
+        result dict: success, claim_id, food_id, receiver_id, status,
+        listing_version, replayed, or success False with an error.
+        """
+        food_id, receiver_id = int(food_id), int(receiver_id)
+        request = {'food_id': food_id, 'receiver_id': receiver_id, 'expected_version': expected_version}
+
+        def work(conn):
+            listing = conn.execute(
+                "SELECT is_available, expiry_date, version FROM food_listings WHERE food_id = ?", (food_id,)
+            ).fetchone()
+            if listing is None:
+                raise ClaimRejected(f"Food listing #{food_id} does not exist")
+            if conn.execute("SELECT 1 FROM receivers WHERE receiver_id = ?", (receiver_id,)).fetchone() is None:
+                raise ClaimRejected(f"Receiver #{receiver_id} does not exist")
+            if expected_version is not None and listing['version'] != expected_version:
+                raise ClaimRejected(f"Food listing #{food_id} changed since it was viewed; please reload")
+            if not listing['is_available'] or listing['expiry_date'] <= date.today().isoformat():
+                raise ClaimRejected(f"Food listing #{food_id} is no longer available")
+            if conn.execute(
+                "SELECT 1 FROM claims WHERE food_id = ? AND status IN (?, ?)", (food_id, *ACTIVE_STATUSES)
+            ).fetchone():
+                raise ClaimRejected(f"Food listing #{food_id} has already been claimed")
+
+            # Version guard: a no-op if anything changed the listing after the read above
+            updated = conn.execute(
+                "UPDATE food_listings SET is_available = 0, version = version + 1 WHERE food_id = ? AND version = ?",
+                (food_id, listing['version'])
+            )
+            if updated.rowcount != 1:
+                raise ClaimRejected(f"Food listing #{food_id} changed while claiming; please retry")
+            now = _now()
+            cursor = conn.execute(
+                "INSERT INTO claims (food_id, receiver_id, status, timestamp, updated_at) VALUES (?, ?, 'Pending', ?, ?)",
+                (food_id, receiver_id, now, now)
+            )
+            return {
+                'claim_id': cursor.lastrowid,
+                'food_id': food_id,
+                'receiver_id': receiver_id,
+                'status': 'Pending',
+                'listing_version': listing['version'] + 1
+            }
+
+        result = self._run('submit', idempotency_key, request, work)
+        if result['success'] and not result['replayed'] and self.sweeper is not None:
+            self.sweeper.discard(food_id)
+        return result
+
+    def complete_claim(self, claim_id, idempotency_key=None):
+        """Mark a Pending claim Completed (the food was collected)"""
+        return self._transition('complete', claim_id, idempotency_key)
+
+    def cancel_claim(self, claim_id, idempotency_key=None):
+        """Cancel a Pending claim and put its listing back if it has not expired"""
+        result = self._transition('cancel', claim_id, idempotency_key)
+        if result['success'] and not result['replayed'] and result.get('relisted') and self.sweeper is not None:
+            self.sweeper.add(result['food_id'], result['expiry_date'])
+        return result
+
+    def _transition(self, operation, claim_id, idempotency_key):
+        required, status = TRANSITIONS[operation]
+        claim_id = int(claim_id)
+
+        def work(conn):
+            claim = conn.execute(
+                "SELECT food_id, receiver_id, status FROM claims WHERE claim_id = ?", (claim_id,)
+            ).fetchone()
+            if claim is None:
+                raise ClaimRejected(f"Claim #{claim_id} does not exist")
+            if claim['status'] != required:
+                raise ClaimRejected(f"Claim #{claim_id} is {claim['status']}; only {required} claims can be {status.lower()}")
+            conn.execute(
+                "UPDATE claims SET status = ?, updated_at = ? WHERE claim_id = ? AND status = ?",
+                (status, _now(), claim_id, required)
+            )
+
+            outcome = {'claim_id': claim_id, 'food_id': claim['food_id'], 'receiver_id': claim['receiver_id'], 'status': status}
+            if operation == 'cancel':
+                relisted = conn.execute("""
+                    UPDATE food_listings SET is_available = 1
+                    WHERE food_id = ? AND is_available = 0 AND expiry_date > ?
+                      AND NOT EXISTS (SELECT 1 FROM claims WHERE food_id = ? AND status IN (?, ?))
+                """, (claim['food_id'], date.today().isoformat(), claim['food_id'], *ACTIVE_STATUSES)).rowcount
+                listing = conn.execute(
+                    "SELECT expiry_date, version FROM food_listings WHERE food_id = ?", (claim['food_id'],)
+                ).fetchone()
+                outcome.update({
+                    'relisted': bool(relisted),
+                    'expiry_date': listing['expiry_date'] if listing else None,
+                    'listing_version': listing['version'] if listing else None
+                })
+            return outcome
+
+        return self._run(operation, idempotency_key, {'claim_id': claim_id}, work)
+
+    # Transactions, idempotency and retries
+
+    def _apply(self, conn, operation, idempotency_key, request_json, work):
+        """Replay the idempotency key's outcome, or run work(conn) and record it (inside a transaction)"""
+        if idempotency_key is not None:
+            previous = conn.execute(
+                "SELECT operation, request, outcome FROM claim_requests WHERE idempotency_key = ?",
+                (idempotency_key,)
+            ).fetchone()
+            if previous is not None:
+                if previous['operation'] != operation or previous['request'] != request_json:
+                    raise ClaimRejected("This idempotency key was already used for a different request")
+                return dict(json.loads(previous['outcome']), success=True, replayed=True)
+
+        outcome = work(conn)
+        if idempotency_key is not None:
+            conn.execute(
+                "INSERT INTO claim_requests (idempotency_key, operation, request, outcome) VALUES (?, ?, ?, ?)",
+                (idempotency_key, operation, request_json, json.dumps(outcome))
+            )
+        return dict(outcome, success=True, replayed=False)
+
+    def _run(self, operation, idempotency_key, request, work):
+        """Run work(conn) in a write transaction, replaying or recording the idempotency key
+
+        With a writer (WriteQueue) the work joins its next group commit;
+        otherwise it runs in its own BEGIN IMMEDIATE transaction, retried
+        with backoff while the database is busy.
+        """
+        request_json = json.dumps(request, sort_keys=True)
+        apply = lambda conn: self._apply(conn, operation, idempotency_key, request_json, work)
+
+        with self.db.instrumentation.track(f"claims.{operation}", 'transaction', request, self.db.db_path) as event:
+            if self.writer is not None:
+                try:
+                    result = self.writer.submit(apply, f"claims.{operation}").result(WRITE_QUEUE['result_timeout'])
+                    event.rows = 1
+                    return result
+                except ClaimRejected as e:
+                    # Rolled back with its savepoint; rejections are not recorded
+                    return {'success': False, 'replayed': False, 'error': str(e)}
+                except (sqlite3.Error, TimeoutError) as e:
+                    event.error = str(e) or "timed out waiting for the write queue"
+                    print(f"Error in claim {operation}: {event.error}")
+                    return {'success': False, 'replayed': False, 'error': event.error}
+
+            retries = CLAIMS_SERVICE['busy_retries']
+            for attempt in range(retries + 1):
+                try:
+                    with self.db.transaction("IMMEDIATE") as conn:
+                        result = apply(conn)
+                    event.rows = 1
+                    return result
+                except ClaimRejected as e:
+                    # Rolled back; rejections are not recorded, so a retry re-checks the data
+                    return {'success': False, 'replayed': False, 'error': str(e)}
+                except sqlite3.OperationalError as e:
+                    if not _is_busy(e) or attempt == retries:
+                        event.error = str(e)
+                        print(f"Error in claim {operation}: {e}")
+                        return {'success': False, 'replayed': False, 'error': str(e)}
+                    # busy_timeout already waited; back off with jitter before queueing again
+                    time.sleep(CLAIMS_SERVICE['retry_backoff_ms'] / 1000 * (2 ** attempt) * random.uniform(0.5, 1.5))
+                except sqlite3.Error as e:
+                    event.error = str(e)
+                    print(f"Error in claim {operation}: {e}")
+                    return {'success': False, 'replayed': False, 'error': str(e)}
+
+    def purge_requests(self, older_than_days=None):
+        """Forget idempotency keys older than the retention; returns how many were deleted"""
+        if not self.db.table_exists('claim_requests'):
+            return 0
+        days = older_than_days if older_than_days is not None else CLAIMS_SERVICE['idempotency_days']
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            if self.writer is not None:
+                return self.writer.execute(
+                    "DELETE FROM claim_requests WHERE created_at < ?", (cutoff,)
+                ).result(WRITE_QUEUE['result_timeout'])['rowcount']
+            with self.db.transaction("IMMEDIATE") as conn:
+                return conn.execute("DELETE FROM claim_requests WHERE created_at < ?", (cutoff,)).rowcount
+        except (sqlite3.Error, TimeoutError) as e:
+            print(f"Error purging claim requests: {e}")
+            return 0
+
+if __name__ == "__main__":
+    service = ClaimsService()
+    print("Installing claim service tables...")
+    if service.install():
+        print("✅ Listing versions and idempotency keys ready")
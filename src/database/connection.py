@@ -5,89 +5,231 @@ import sqlite3
 import pandas as pd
 from pathlib import Path
 import sys
+import time
+from contextlib import contextmanager
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
-from config.settings import DATABASE_PATH, DATABASE_DIR
+from config.settings import (
+    DATABASE_PATH, DATABASE_POOL, PRAGMA_PROFILES, DATABASE_PRAGMA_PROFILE
+)
+from src.database.pool import get_pool, apply_pragmas, read_only_uri
+from src.database.instrumentation import get_instrumentation
+from src.database.slow_query_log import get_slow_query_log
 
 class DatabaseManager:
     """Handles all database operations"""
     
-    def __init__(self):
-        self.db_path = DATABASE_PATH
+    def __init__(self, db_path=None, use_pool=None, pragma_profile=None, read_only=False):
+        self.db_path = Path(db_path) if db_path else DATABASE_PATH
+        self.read_only = read_only  # connections refuse writes (a separate pool when pooled)
+        self.use_pool = DATABASE_POOL['enabled'] if use_pool is None else use_pool
+        self.pragma_profile = pragma_profile or DATABASE_PRAGMA_PROFILE
         self.ensure_database_directory()
+        self.instrumentation = get_instrumentation()
+        self.slow_query_log = get_slow_query_log()  # registers itself on the instrumentation
+        self.pool = None
+        if self.use_pool:
+            self.pool = get_pool(
+                self.db_path,
+                max_connections=DATABASE_POOL['max_connections'],
+                checkout_timeout=DATABASE_POOL['checkout_timeout'],
+                health_check_interval=DATABASE_POOL['health_check_interval'],
+                cached_statements=DATABASE_POOL['cached_statements'],
+                pragmas=PRAGMA_PROFILES[self.pragma_profile],
+                read_only=read_only
+            )
         
     def ensure_database_directory(self):
         """Create database directory if it doesn't exist"""
-        DATABASE_DIR.mkdir(parents=True, exist_ok=True)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
     def get_connection(self):
-        """Get database connection"""
+        """Get database connection (pooled connections return to the pool on close)"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            started = time.perf_counter()
+            pragmas = PRAGMA_PROFILES[self.pragma_profile]
+            if self.pool is not None:
+                conn = self.pool.acquire(pragmas)
+            elif self.read_only:
+                conn = sqlite3.connect(read_only_uri(self.db_path), uri=True)
+                apply_pragmas(conn, pragmas)
+            else:
+                conn = sqlite3.connect(self.db_path)
+                apply_pragmas(conn, pragmas)
             conn.row_factory = sqlite3.Row  # Enable column access by name
+            self.instrumentation.record_connection('open', (time.perf_counter() - started) * 1000)
             return conn
         except sqlite3.Error as e:
             print(f"Error connecting to database: {e}")
             return None
             
-    def execute_query(self, query, params=None):
-        """Execute a single query"""
+    def close_connection(self, conn):
+        """Close (or return to the pool) a connection, recording the cost"""
+        started = time.perf_counter()
+        conn.close()
+        self.instrumentation.record_connection('close', (time.perf_counter() - started) * 1000)
+            
+    @contextmanager
+    def use_pragma_profile(self, profile):
+        """Temporarily switch the PRAGMA profile used for new checkouts"""
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Unknown PRAGMA profile: {profile}")
+        previous = self.pragma_profile
+        self.pragma_profile = profile
+        try:
+            yield self
+        finally:
+            self.pragma_profile = previous
+            
+    def get_pragma_values(self):
+        """Read back the effective PRAGMA values of the active profile"""
         conn = self.get_connection()
         if conn is None:
-            return None
+            return {}
             
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            conn.commit()
-            return cursor.fetchall()
+            return {
+                name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in PRAGMA_PROFILES[self.pragma_profile]
+            }
         except sqlite3.Error as e:
-            print(f"Error executing query: {e}")
-            return None
+            print(f"Error reading PRAGMA values: {e}")
+            return {}
         finally:
-            conn.close()
+            self.close_connection(conn)
             
-    def execute_many(self, query, data_list):
-        """Execute query with multiple parameter sets"""
+    @contextmanager
+    def transaction(self, mode="DEFERRED"):
+        """Run a block of statements as one transaction on a single connection"""
         conn = self.get_connection()
         if conn is None:
-            return False
+            raise sqlite3.OperationalError("Could not open database connection")
             
         try:
-            cursor = conn.cursor()
-            cursor.executemany(query, data_list)
+            conn.execute(f"BEGIN {mode}")
+            yield conn
             conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error executing batch query: {e}")
-            return False
+        except Exception:
+            conn.rollback()
+            raise
         finally:
-            conn.close()
+            self.close_connection(conn)
             
-    def fetch_dataframe(self, query, params=None):
-        """Fetch query results as pandas DataFrame"""
+    def get_query_stats(self):
+        """Per-statement timing histograms, rows and bytes (shared by the process)"""
+        return self.instrumentation.snapshot()
+        
+    def get_connection_stats(self):
+        """Connection open/close timings (shared by the process)"""
+        return self.instrumentation.connection_stats()
+            
+    def get_pool_stats(self):
+        """Get connection pool usage (None when pooling is disabled)"""
+        return self.pool.stats() if self.pool is not None else None
+            
+    def execute_query(self, query, params=None):
+        """Execute a single query"""
         conn = self.get_connection()
         if conn is None:
             return None
             
-        try:
-            if params:
-                df = pd.read_sql_query(query, conn, params=params)
-            else:
-                df = pd.read_sql_query(query, conn)
-            return df
-        except Exception as e:
-            print(f"Error fetching dataframe: {e}")
+        with self.instrumentation.track(query, 'execute_query', params, self.db_path) as event:
+            try:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                conn.commit()
+                result = cursor.fetchall()
+                event.rows = len(result) if result else max(cursor.rowcount, 0)
+                return result
+            except sqlite3.Error as e:
+                event.error = str(e)
+                print(f"Error executing query: {e}")
+                return None
+            finally:
+                event.stop()
+                self.close_connection(conn)
+            
+    def execute_many(self, query, data_list):
+        """Execute query with multiple parameter sets"""
+        conn = self.get_connection()
+        if conn is None:
+            return False
+            
+        with self.instrumentation.track(query, 'execute_many', data_list, self.db_path) as event:
+            try:
+                cursor = conn.cursor()
+                cursor.executemany(query, data_list)
+                conn.commit()
+                event.rows = max(cursor.rowcount, 0)
+                return True
+            except sqlite3.Error as e:
+                event.error = str(e)
+                print(f"Error executing batch query: {e}")
+                return False
+            finally:
+                event.stop()
+                self.close_connection(conn)
+            
+    def fetch_dataframe(self, query, params=None):
+        """Fetch query results as pandas DataFrame"""
+        conn = self.get_connection()
+        if conn is None:
             return None
-        finally:
-            conn.close()
             
+        with self.instrumentation.track(query, 'fetch_dataframe', params, self.db_path) as event:
+            try:
+                if params:
+                    df = pd.read_sql_query(query, conn, params=params)
+                else:
+                    df = pd.read_sql_query(query, conn)
+                self.instrumentation.measure_dataframe(event, df)
+                return df
+            except Exception as e:
+                event.error = str(e)
+                print(f"Error fetching dataframe: {e}")
+                return None
+            finally:
+                event.stop()
+                self.close_connection(conn)
+
+    def fetch_page(self, query, order_by, params=None, after=None, page_size=20, descending=False):
+        """Fetch one page of a SELECT with keyset (seek) pagination
+
+        ``order_by`` names output columns of ``query`` whose combined values
+        are unique and never NULL (end with the primary key). ``after`` is the
+        cursor returned for the previous page, or None for the first page.
+        Only the requested page is read and materialized, and pages stay
+        stable when rows are added elsewhere in the ordering.
+
+        Returns (DataFrame, next_cursor); next_cursor is None on the last page.
+        """
+        columns = ", ".join(order_by)
+        direction = "DESC" if descending else "ASC"
+        page_query = f"SELECT * FROM ({query}) AS page_source"
+        page_params = list(params or [])
+        if after is not None:
+            placeholders = ", ".join("?" for _ in order_by)
+            page_query += f" WHERE ({columns}) {'<' if descending else '>'} ({placeholders})"
+            page_params += list(after)
+        page_query += f" ORDER BY {', '.join(f'{column} {direction}' for column in order_by)} LIMIT ?"
+        # One extra row tells us whether another page follows
+        page_params.append(page_size + 1)
+
+        df = self.fetch_dataframe(page_query, page_params)
+        if df is None:
+            return None, None
+        if len(df) <= page_size:
+            return df, None
+        df = df.iloc[:page_size]
+        next_cursor = tuple(df[list(order_by)].tail(1).to_dict('records')[0].values())
+        return df, next_cursor
+
     def table_exists(self, table_name):
         """Check if table exists in database"""
         query = """
@@ -9,12 +9,16 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
 from src.database.connection import DatabaseManager
+from src.database.summary_tables import SummaryTableManager
+from src.database.table_stats import TableStatsService
+from src.database.search_index import SearchIndex
+from src.database.claims import ClaimsService
 
 class TableCreator:
     """Handles database table creation"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
         
     def create_providers_table(self):
         """Create providers table"""
@@ -94,7 +98,11 @@ class TableCreator:
             "CREATE INDEX IF NOT EXISTS idx_food_meal_type ON food_listings(meal_type)",
             "CREATE INDEX IF NOT EXISTS idx_food_expiry ON food_listings(expiry_date)",
             "CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(status)",
-            "CREATE INDEX IF NOT EXISTS idx_claims_timestamp ON claims(timestamp)"
+            "CREATE INDEX IF NOT EXISTS idx_claims_timestamp ON claims(timestamp)",
+            # Foreign keys every analytical join goes through
+            "CREATE INDEX IF NOT EXISTS idx_food_provider ON food_listings(provider_id)",
+            "CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(food_id)",
+            "CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(receiver_id)"
         ]
         
         for index_query in indexes:
@@ -123,6 +131,19 @@ class TableCreator:
             self.create_indexes()
             print("✅ Indexes created")
             
+            # Materialized aggregates behind the analytical queries
+            SummaryTableManager(self.db).install()
+            print("✅ Summary tables created")
+            
+            TableStatsService(self.db).install()
+            print("✅ Row counters created")
+            
+            if SearchIndex(self.db).install():
+                print("✅ Search indexes created")
+            
+            ClaimsService(self.db).install()
+            print("✅ Claim versions and idempotency keys created")
+            
             print("\n🎉 All tables created successfully!")
             return True
             
@@ -151,6 +172,10 @@ class TableCreator:
         tables = ['claims', 'food_listings', 'receivers', 'providers']  # Order matters due to foreign keys
         
         print("⚠️  Dropping all tables...")
+        SummaryTableManager(self.db).uninstall()
+        TableStatsService(self.db).uninstall()
+        SearchIndex(self.db).uninstall()
+        ClaimsService(self.db).uninstall()
         for table in tables:
             self.db.drop_table(table)
             print(f"🗑️  Dropped {table} table")
@@ -0,0 +1,251 @@
+"""
+Expiry sweeper for Local Food Wastage Management System
+
+Keeps an in-memory min-heap of the available listings expiring within the
+next few days, seeded by a range scan of idx_food_expiry. A background thread
+pops listings as their expiry date arrives and marks them unavailable in
+batched transactions, and publishes the "expiring soon" listings so pages can
+read them without querying food_listings. A listing counts as expired once
+expiry_date <= today, as on the food listings page. The same thread also
+deletes claim idempotency keys older than their retention and refreshes the
+summary tables dirtied by writes made outside the write queue.
+"""
+import heapq
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import CLAIMS_SERVICE, EXPIRY_SWEEPER, WRITE_QUEUE
+from src.database.claims import ClaimsService
+from src.database.connection import DatabaseManager
+from src.database.summary_tables import SummaryTableManager
+from src.database.write_queue import get_write_queue
+
+# Available listings up to the horizon, soonest first (a range scan of idx_food_expiry)
+UPCOMING_QUERY = """
+SELECT food_id, expiry_date
+FROM food_listings
+WHERE expiry_date <= ? AND is_available = 1 AND food_id > ?
+ORDER BY expiry_date
+"""
+
+# The expiry_date guard skips listings whose date was moved since they were queued
+EXPIRE_QUERY = """
+UPDATE food_listings SET is_available = 0
+WHERE food_id = ? AND is_available = 1 AND expiry_date <= ?
+"""
+
+
+class ExpirySweeper:
+    """Marks expired listings unavailable and tracks the ones expiring soon"""
+
+    def __init__(self, db=None, soon_days=None, horizon_days=None, batch_size=None, writer=None):
+        self.db = db or DatabaseManager()
+        self.writer = writer  # optional WriteQueue the expiry batches are committed through
+        self.claims = ClaimsService(self.db, writer=writer)
+        self.purged_at = None
+        self.summaries = SummaryTableManager(self.db)
+        self.soon_days = soon_days if soon_days is not None else EXPIRY_SWEEPER['soon_days']
+        self.horizon_days = horizon_days if horizon_days is not None else EXPIRY_SWEEPER['horizon_days']
+        self.batch_size = batch_size or EXPIRY_SWEEPER['batch_size']
+        self.heap = []              # (expiry_date, food_id), expiry dates as ISO strings
+        self.queued = set()         # food_ids in the heap
+        self.removed = set()        # food_ids discarded but not yet popped
+        self.max_food_id = 0
+        self.horizon = None
+        self.seeded_at = None
+        self.expiring_soon = {}     # published: food_id -> expiry_date, replaced as a whole
+        self.status = {'last_sweep': None, 'last_expired': 0, 'total_expired': 0, 'last_error': None}
+        self._lock = threading.RLock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def seed(self, today=None):
+        """Rebuild the heap from the database: every available listing expiring by the horizon"""
+        today = today or date.today()
+        horizon = (today + timedelta(days=self.horizon_days)).isoformat()
+        rows = self.db.execute_query(UPCOMING_QUERY, (horizon, 0))
+        if rows is None:
+            return False
+
+        with self._lock:
+            # Rows arrive sorted, and a sorted list is already a valid heap
+            self.heap = [(row['expiry_date'], row['food_id']) for row in rows]
+            self.queued = {food_id for _, food_id in self.heap}
+            self.removed.clear()
+            max_row = self.db.execute_query("SELECT COALESCE(MAX(food_id), 0) as max_id FROM food_listings")
+            self.max_food_id = max_row[0]['max_id'] if max_row else 0
+            self.horizon = horizon
+            self.seeded_at = time.monotonic()
+        return True
+
+    def refresh(self):
+        """Queue listings added since the last seed or refresh (ids above the highest seen)"""
+        rows = self.db.execute_query(UPCOMING_QUERY, (self.horizon, self.max_food_id))
+        if not rows:
+            return 0
+        with self._lock:
+            for row in rows:
+                self.add(row['food_id'], row['expiry_date'])
+            self.max_food_id = max(self.max_food_id, max(row['food_id'] for row in rows))
+        return len(rows)
+
+    def add(self, food_id, expiry_date):
+        """Queue one listing (e.g. right after it is created); ignored beyond the horizon"""
+        expiry_date = str(expiry_date)[:10]
+        with self._lock:
+            if self.horizon is not None and expiry_date > self.horizon:
+                return
+            self.removed.discard(food_id)
+            if food_id not in self.queued:
+                self.queued.add(food_id)
+                heapq.heappush(self.heap, (expiry_date, food_id))
+
+    def discard(self, food_id):
+        """Forget a listing that stopped being available (claimed or withdrawn)"""
+        with self._lock:
+            if food_id in self.queued:
+                self.removed.add(food_id)
+                self.expiring_soon.pop(food_id, None)
+
+    def _due(self, limit):
+        """Heap entries with expiry_date <= limit, visiting only those entries and their children"""
+        due, stack = [], [0] if self.heap else []
+        while stack:
+            index = stack.pop()
+            expiry_date, food_id = self.heap[index]
+            if expiry_date > limit:
+                continue
+            if food_id not in self.removed:
+                due.append((expiry_date, food_id))
+            stack.extend(child for child in (2 * index + 1, 2 * index + 2) if child < len(self.heap))
+        return due
+
+    def sweep(self, today=None):
+        """Expire every queued listing whose date has come and republish the expiring-soon set
+
+        Returns the number of due listings written (those changed since they
+        were queued are left alone), or None on failure.
+        """
+        today = (today or date.today()).isoformat()
+        with self._lock:
+            expired = []
+            while self.heap and self.heap[0][0] <= today:
+                expiry_date, food_id = heapq.heappop(self.heap)
+                self.queued.discard(food_id)
+                if food_id in self.removed:
+                    self.removed.discard(food_id)
+                else:
+                    expired.append(food_id)
+
+        marked = 0
+        for start in range(0, len(expired), self.batch_size):
+            # One transaction per batch keeps each write lock short
+            batch = expired[start:start + self.batch_size]
+            written = self._expire(batch, today)
+            if written is None:
+                with self._lock:
+                    for food_id in expired[start:]:
+                        self.add(food_id, today)  # retried on the next sweep
+                self.status['last_error'] = "could not mark expired listings"
+                return None
+            marked += written
+
+        soon = (date.fromisoformat(today) + timedelta(days=self.soon_days)).isoformat()
+        with self._lock:
+            self.expiring_soon = {food_id: expiry_date for expiry_date, food_id in self._due(soon)}
+        self.status.update({'last_sweep': time.time(), 'last_expired': marked, 'last_error': None})
+        self.status['total_expired'] += marked
+        return marked
+
+    def _expire(self, food_ids, today):
+        """Mark one batch expired; returns the rows actually changed, or None on failure"""
+        data_list = [(food_id, today) for food_id in food_ids]
+        try:
+            if self.writer is not None:
+                return self.writer.execute_many(EXPIRE_QUERY, data_list).result(WRITE_QUEUE['result_timeout'])
+            with self.db.transaction() as conn:
+                return conn.executemany(EXPIRE_QUERY, data_list).rowcount
+        except (sqlite3.Error, TimeoutError) as e:
+            print(f"Error marking expired listings: {e}")
+            return None
+
+    def purge_claim_requests(self):
+        """Delete expired claim idempotency keys, at most once per purge interval"""
+        if self.purged_at is not None and time.monotonic() - self.purged_at < CLAIMS_SERVICE['purge_interval_seconds']:
+            return 0
+        self.purged_at = time.monotonic()
+        return self.claims.purge_requests()
+
+    def tick(self):
+        """One scheduler step: reseed when stale (or on a new day), pick up new listings, sweep"""
+        today = date.today()
+        stale = (
+            self.seeded_at is None
+            or time.monotonic() - self.seeded_at >= EXPIRY_SWEEPER['reseed_seconds']
+            or self.horizon < (today + timedelta(days=self.soon_days)).isoformat()
+        )
+        if stale:
+            self.seed(today)
+        else:
+            self.refresh()
+        self.purge_claim_requests()
+        if self.summaries.is_installed():
+            self.summaries.refresh()
+        return self.sweep(today)
+
+    def _loop(self):
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                self.status['last_error'] = str(e)
+                print(f"Error in expiry sweeper: {e}")
+            if self._stop.wait(EXPIRY_SWEEPER['interval_seconds']):
+                break
+
+    def start(self):
+        """Run tick() every interval in a background thread (once per sweeper)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="expiry-sweeper", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+
+
+_sweepers = {}
+_sweepers_lock = threading.Lock()
+
+
+def get_expiry_sweeper(db=None):
+    """Get (or lazily create and start) the process-wide expiry sweeper for a database"""
+    db = db or DatabaseManager()
+    key = str(db.db_path)
+    with _sweepers_lock:
+        sweeper = _sweepers.get(key)
+        if sweeper is None:
+            sweeper = _sweepers[key] = ExpirySweeper(db, writer=get_write_queue(db))
+            if EXPIRY_SWEEPER['enabled']:
+                sweeper.start()
+        return sweeper
+
+if __name__ == "__main__":
+    sweeper = ExpirySweeper()
+    sweeper.seed()
+    expired = sweeper.sweep()
+    if expired is not None:
+        print(f"✅ Marked {expired:,} expired listings unavailable")
+        print(f"⏰ {len(sweeper.expiring_soon):,} listings expire within {sweeper.soon_days} days")
+    else:
+        print("❌ Expiry sweep failed!")
@@ -0,0 +1,296 @@
+"""
+Index advisor for Local Food Wastage Management System
+
+Captures the SQL behind every FoodWastageAnalyzer query and the listing pages,
+reads each statement's EXPLAIN QUERY PLAN and proposes indexes: the automatic
+indexes SQLite otherwise rebuilds on every run of a query, plus composite and
+covering candidates for the hot join paths. Candidates are tried inside a
+transaction that is rolled back, so only indexes the planner actually picks
+are proposed.
+"""
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+from src.database.query_builder import provider_query, receiver_query, food_listing_query, claim_query
+
+# Index name prefix per table (matches the idx_food_* / idx_claims_* names in create_tables)
+TABLE_PREFIXES = {
+    'providers': 'providers',
+    'receivers': 'receivers',
+    'food_listings': 'food',
+    'claims': 'claims'
+}
+
+# Composite/covering candidates for the analytical join paths: (table, columns)
+CANDIDATE_INDEXES = [
+    ('claims', ['food_id', 'status']),
+    ('claims', ['receiver_id', 'status']),
+    ('food_listings', ['provider_id', 'quantity']),
+    ('food_listings', ['location', 'provider_id', 'quantity'])
+]
+
+# Listing-page queries checked alongside the analyzer
+LISTING_QUERIES = {
+    'providers_page': provider_query,
+    'receivers_page': receiver_query,
+    'food_listings_page': food_listing_query,
+    'claims_page': claim_query
+}
+
+_AUTOMATIC_INDEX = re.compile(r"^SEARCH (\w+) USING AUTOMATIC (?:PARTIAL )?COVERING INDEX \(([^)]*)\)")
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_INDEX_USE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+_NOT_ALIASES = {'WHERE', 'GROUP', 'ORDER', 'LEFT', 'INNER', 'CROSS', 'JOIN', 'ON', 'UNION', 'LIMIT', 'HAVING'}
+
+
+def index_name(table, columns):
+    """Conventional index name, e.g. idx_claims_food_id_status"""
+    return f"idx_{TABLE_PREFIXES.get(table, table)}_{'_'.join(columns)}"
+
+
+def table_aliases(sql, tables):
+    """Map every alias (and bare name) used for a base table in sql to the table"""
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(sql):
+        if table not in tables:
+            continue
+        aliases[table] = table
+        if alias and alias.upper() not in _NOT_ALIASES:
+            aliases[alias] = table
+    return aliases
+
+
+class _RecordingDatabaseManager(DatabaseManager):
+    """DatabaseManager that records the statements it is given instead of running them"""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.statements = []
+
+    def fetch_dataframe(self, query, params=None):
+        self.statements.append((query, params))
+        return None
+
+    def execute_query(self, query, params=None):
+        self.statements.append((query, params))
+        return None
+
+
+class IndexAdvisor:
+    """Proposes, applies and reports on indexes for the analytical workload"""
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def capture_workload(self):
+        """Return (name, sql, params) for every analyzer query and listing page"""
+        # Imported here: the analyzer module imports the database package
+        from src.analysis.sql_queries import FoodWastageAnalyzer
+
+        recorder = _RecordingDatabaseManager(self.db.db_path)
+        analyzer = FoodWastageAnalyzer(use_cache=False, use_summaries=False, db=recorder)
+        query_names = sorted(
+            (name for name in dir(analyzer) if name.startswith('query_')),
+            key=lambda name: int(name.split('_')[1])
+        )
+
+        workload = []
+        for name in query_names:
+            recorder.statements = []
+            try:
+                getattr(analyzer, name)()
+            except Exception:
+                pass  # Post-processing of the unrun result may fail; the SQL is recorded
+            workload.extend((name, sql, params) for sql, params in recorder.statements)
+        for name, factory in LISTING_QUERIES.items():
+            sql, params = factory().build()
+            workload.append((name, sql, params))
+        return workload
+
+    def explain(self, conn, sql, params=None):
+        """EXPLAIN QUERY PLAN details of one statement"""
+        return [row['detail'] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or [])]
+
+    def existing_indexes(self, conn):
+        """Map each base table to the column lists of its indexes"""
+        indexes = {}
+        for table in TABLE_PREFIXES:
+            columns = {}
+            for row in conn.execute("""
+                SELECT il.name as index_name, ii.name as column_name
+                FROM pragma_index_list(?) il
+                JOIN pragma_index_info(il.name) ii
+                ORDER BY il.name, ii.seqno
+            """, (table,)):
+                columns.setdefault(row['index_name'], []).append(row['column_name'])
+            indexes[table] = list(columns.values())
+        return indexes
+
+    def find_candidates(self, conn, workload):
+        """Automatic indexes seen in the plans plus the composite candidates
+
+        Candidates already served by an existing index (same leading columns)
+        are left out.
+        """
+        tables = set(TABLE_PREFIXES)
+        candidates = {}
+        for _, sql, params in workload:
+            aliases = table_aliases(sql, tables)
+            for detail in self.explain(conn, sql, params):
+                match = _AUTOMATIC_INDEX.match(detail)
+                if match and match.group(1) in aliases:
+                    columns = re.findall(r"(\w+)=\?", match.group(2))
+                    table = aliases[match.group(1)]
+                    candidates.setdefault(index_name(table, columns), (table, columns))
+        for table, columns in CANDIDATE_INDEXES:
+            candidates.setdefault(index_name(table, columns), (table, columns))
+
+        existing = self.existing_indexes(conn)
+        return {
+            name: (table, columns) for name, (table, columns) in candidates.items()
+            if not any(index[:len(columns)] == columns for index in existing[table])
+        }
+
+    def advise(self, workload=None):
+        """Propose the candidate indexes the planner would use; nothing is changed
+
+        Returns a list of dicts with name, table, columns, sql and used_by
+        (the workload entries whose plan picks the index).
+        """
+        workload = workload or self.capture_workload()
+        conn = self.db.get_connection()
+        if conn is None:
+            return []
+
+        try:
+            candidates = self.find_candidates(conn, workload)
+            if not candidates:
+                return []
+            used_by = {name: [] for name in candidates}
+            # Build every candidate at once so the planner chooses between them
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for name, (table, columns) in candidates.items():
+                    conn.execute(f"CREATE INDEX {name} ON {table}({', '.join(columns)})")
+                for query_name, sql, params in workload:
+                    for detail in self.explain(conn, sql, params):
+                        match = _INDEX_USE.search(detail)
+                        if match and match.group(1) in used_by and query_name not in used_by[match.group(1)]:
+                            used_by[match.group(1)].append(query_name)
+            finally:
+                conn.rollback()
+        except sqlite3.Error as e:
+            print(f"Error evaluating candidate indexes: {e}")
+            return []
+        finally:
+            conn.close()
+
+        # An index whose columns lead a longer used index is served by that one
+        used = {name: candidates[name] for name in used_by if used_by[name]}
+        for name, (table, columns) in list(used.items()):
+            for other, (other_table, other_columns) in used.items():
+                if other != name and other_table == table and other_columns[:len(columns)] == columns:
+                    used_by[other] += [query for query in used_by[name] if query not in used_by[other]]
+                    del used[name]
+                    break
+
+        return [
+            {
+                'name': name,
+                'table': table,
+                'columns': columns,
+                'sql': f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})",
+                'used_by': used_by[name]
+            }
+            for name, (table, columns) in used.items()
+        ]
+
+    def apply(self, proposals):
+        """Create the proposed indexes (safe to run repeatedly)"""
+        if not proposals:
+            return True
+        try:
+            with self.db.transaction("IMMEDIATE") as conn:
+                for proposal in proposals:
+                    conn.execute(proposal['sql'])
+            return True
+        except sqlite3.Error as e:
+            print(f"Error creating indexes: {e}")
+            return False
+
+    def snapshot(self, workload, timed=True):
+        """Plan (and best-of-three run time in ms) of every workload statement"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return []
+
+        try:
+            results = []
+            for name, sql, params in workload:
+                entry = {'query': name, 'plan': self.explain(conn, sql, params), 'ms': None}
+                if timed:
+                    timings = []
+                    for _ in range(3):
+                        started = time.perf_counter()
+                        conn.execute(sql, params or []).fetchall()
+                        timings.append((time.perf_counter() - started) * 1000)
+                    entry['ms'] = round(min(timings), 2)
+                results.append(entry)
+            return results
+        finally:
+            conn.close()
+
+    def run(self, apply=True, timed=True):
+        """Advise, optionally apply, and report every query's plan before and after
+
+        Returns (proposals, report); report has one dict per statement with
+        query, plan_before, plan_after, ms_before and ms_after.
+        """
+        workload = self.capture_workload()
+        before = self.snapshot(workload, timed)
+        proposals = self.advise(workload)
+        if apply and proposals:
+            self.apply(proposals)
+        after = self.snapshot(workload, timed) if apply else before
+
+        report = [
+            {
+                'query': old['query'],
+                'plan_before': old['plan'],
+                'plan_after': new['plan'],
+                'ms_before': old['ms'],
+                'ms_after': new['ms']
+            }
+            for old, new in zip(before, after)
+        ]
+        return proposals, report
+
+if __name__ == "__main__":
+    advisor = IndexAdvisor()
+
+    print("Analyzing query plans...")
+    print("="*40)
+    proposals, report = advisor.run()
+
+    if proposals:
+        for proposal in proposals:
+            print(f"➕ {proposal['name']} on {proposal['table']}({', '.join(proposal['columns'])})")
+            print(f"   used by: {', '.join(proposal['used_by'])}")
+    else:
+        print("✅ No missing indexes found")
+
+    for entry in report:
+        print(f"\n📊 {entry['query']}: {entry['ms_before']} ms -> {entry['ms_after']} ms")
+        if entry['plan_before'] != entry['plan_after']:
+            for line in entry['plan_before']:
+                print(f"   - {line}")
+            for line in entry['plan_after']:
+                print(f"   + {line}")
@@ -0,0 +1,287 @@
+"""
+Database introspection and maintenance for Local Food Wastage Management System
+
+Reports the storage picture of the database file (pages, free pages, per
+table and per index sizes from the dbstat virtual table, row counts and
+fragmentation) and runs the Optimize action: ANALYZE, PRAGMA optimize and an
+incremental VACUUM, timing each step and a set of probe queries before and
+after.
+"""
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+from src.database.table_stats import COUNTED_TABLES
+from src.database.index_advisor import LISTING_QUERIES
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+
+class DatabaseInspector:
+    """Storage statistics and maintenance for the database file"""
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def file_sizes(self):
+        """Bytes on disk of the database file and its WAL"""
+        path = Path(self.db.db_path)
+        wal = Path(f"{path}-wal")
+        return {
+            'file_bytes': path.stat().st_size if path.exists() else 0,
+            'wal_bytes': wal.stat().st_size if wal.exists() else 0
+        }
+
+    def _overview(self, conn):
+        pragma = lambda name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        page_size = pragma('page_size')
+        page_count = pragma('page_count')
+        freelist_count = pragma('freelist_count')
+        counts = {
+            row['type']: row['count'] for row in conn.execute(
+                "SELECT type, COUNT(*) as count FROM sqlite_master GROUP BY type"
+            )
+        }
+        overview = {
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'database_bytes': page_size * page_count,
+            'free_bytes': page_size * freelist_count,
+            'free_percentage': round(freelist_count * 100.0 / page_count, 2) if page_count else 0.0,
+            'auto_vacuum': AUTO_VACUUM_MODES.get(pragma('auto_vacuum'), 'unknown'),
+            'journal_mode': pragma('journal_mode'),
+            'tables': counts.get('table', 0),
+            'indexes': counts.get('index', 0),
+            'triggers': counts.get('trigger', 0),
+            'analyzed': conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            ).fetchone() is not None,
+            'sqlite_version': sqlite3.sqlite_version
+        }
+        overview.update(self.file_sizes())
+        return overview
+
+    def get_overview(self):
+        """Page counts, free space, vacuum/journal modes and object counts"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            return self._overview(conn)
+        except sqlite3.Error as e:
+            print(f"Error reading database overview: {e}")
+            return None
+        finally:
+            self.db.close_connection(conn)
+
+    def _row_counts(self, conn, tables):
+        """Row counts, from the maintained counters where available"""
+        counts = {}
+        if 'stat_counters' in tables:
+            counts = {
+                row['name']: row['value'] for row in conn.execute(
+                    f"SELECT name, value FROM stat_counters WHERE name IN ({', '.join('?' * len(COUNTED_TABLES))})",
+                    COUNTED_TABLES
+                )
+            }
+        for table, virtual in tables.items():
+            if table not in counts and not virtual:
+                counts[table] = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        return counts
+
+    def _object_stats(self, conn):
+        tables = {
+            row['name']: (row['sql'] or '').upper().startswith('CREATE VIRTUAL')
+            for row in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table'")
+        }
+        objects = {
+            row['name']: (row['type'], row['tbl_name'])
+            for row in conn.execute("SELECT name, type, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')")
+        }
+        row_counts = self._row_counts(conn, tables)
+
+        # Fragmentation: share of pages that do not directly follow the previous
+        # page of the same b-tree in tree order (as reported by sqlite3_analyzer)
+        stats = []
+        for row in conn.execute("""
+            SELECT
+                name,
+                COUNT(*) as pages,
+                SUM(pgsize) as bytes,
+                SUM(payload) as payload_bytes,
+                SUM(unused) as unused_bytes,
+                SUM(CASE WHEN previous_page IS NOT NULL AND pageno != previous_page + 1 THEN 1 ELSE 0 END) as out_of_order
+            FROM (
+                SELECT name, pageno, pgsize, payload, unused,
+                       LAG(pageno) OVER (PARTITION BY name ORDER BY path) as previous_page
+                FROM dbstat
+            )
+            GROUP BY name
+            ORDER BY bytes DESC
+        """):
+            object_type, table = objects.get(row['name'], ('internal', row['name']))
+            pages = row['pages']
+            stats.append({
+                'name': row['name'],
+                'type': object_type,
+                'table': table,
+                'rows': row_counts.get(row['name']) if object_type == 'table' else None,
+                'pages': pages,
+                'bytes': row['bytes'],
+                'payload_bytes': row['payload_bytes'],
+                'unused_bytes': row['unused_bytes'],
+                'fill_percentage': round(row['payload_bytes'] * 100.0 / row['bytes'], 2) if row['bytes'] else 0.0,
+                'fragmentation_percentage': round(row['out_of_order'] * 100.0 / (pages - 1), 2) if pages > 1 else 0.0
+            })
+        return stats
+
+    def get_object_stats(self):
+        """Size, rows, fill and fragmentation of every table and index (largest first)
+
+        Reads every page of the file through dbstat, so this costs about as
+        much as a full scan; returns an empty list when dbstat is unavailable.
+        """
+        conn = self.db.get_connection()
+        if conn is None:
+            return []
+
+        try:
+            return self._object_stats(conn)
+        except sqlite3.Error as e:
+            print(f"Error reading object statistics (is dbstat available?): {e}")
+            return []
+        finally:
+            self.db.close_connection(conn)
+
+    def get_stats(self):
+        """Overview and per-object statistics read on one connection"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            overview = self._overview(conn)
+            try:
+                objects = self._object_stats(conn)
+            except sqlite3.Error as e:
+                print(f"Error reading object statistics (is dbstat available?): {e}")
+                objects = []
+            return {'overview': overview, 'objects': objects}
+        except sqlite3.Error as e:
+            print(f"Error reading database statistics: {e}")
+            return None
+        finally:
+            self.db.close_connection(conn)
+
+    def time_probes(self, repeats=2):
+        """Best-of-N milliseconds for the first page of each listing query"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return {}
+
+        try:
+            timings = {}
+            for name, factory in LISTING_QUERIES.items():
+                sql, params = factory().paginate().build()
+                runs = []
+                for _ in range(repeats):
+                    started = time.perf_counter()
+                    conn.execute(sql, params).fetchall()
+                    runs.append((time.perf_counter() - started) * 1000)
+                timings[name] = round(min(runs), 2)
+            return timings
+        except sqlite3.Error as e:
+            print(f"Error timing probe queries: {e}")
+            return {}
+        finally:
+            self.db.close_connection(conn)
+
+    def optimize(self, probe=True):
+        """Run ANALYZE, PRAGMA optimize and an incremental VACUUM
+
+        Returns a dict with each step's duration (steps), the overview before
+        and after, and probe query timings before and after (if probe).
+        Incremental VACUUM only frees pages when auto_vacuum is incremental;
+        see enable_incremental_vacuum.
+        """
+        before = self.get_overview()
+        probes_before = self.time_probes() if probe else {}
+
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        steps = []
+        try:
+            def run_step(name, sql):
+                started = time.perf_counter()
+                # executescript steps each statement to completion; a single
+                # execute() step of incremental_vacuum frees just one page
+                conn.executescript(sql)
+                steps.append({'step': name, 'ms': round((time.perf_counter() - started) * 1000, 2)})
+
+            run_step('ANALYZE', "ANALYZE")
+            run_step('PRAGMA optimize', "PRAGMA optimize")
+            if before['auto_vacuum'] == 'incremental':
+                run_step('Incremental VACUUM', "PRAGMA incremental_vacuum")
+            else:
+                steps.append({'step': 'Incremental VACUUM', 'ms': None,
+                              'note': "skipped: auto_vacuum is not incremental"})
+            if before['journal_mode'] == 'wal':
+                # Freed pages only leave the file once the WAL is checkpointed
+                run_step('WAL checkpoint', "PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            print(f"Error optimizing database: {e}")
+            steps.append({'step': 'error', 'ms': None, 'note': str(e)})
+        finally:
+            self.db.close_connection(conn)
+
+        return {
+            'steps': steps,
+            'before': before,
+            'after': self.get_overview(),
+            'probes_before': probes_before,
+            'probes_after': self.time_probes() if probe else {}
+        }
+
+    def enable_incremental_vacuum(self):
+        """Switch auto_vacuum to incremental; rewrites the whole file with a full VACUUM
+
+        Returns the milliseconds taken, or None on failure.
+        """
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        try:
+            started = time.perf_counter()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return round((time.perf_counter() - started) * 1000, 2)
+        except sqlite3.Error as e:
+            print(f"Error enabling incremental vacuum: {e}")
+            return None
+        finally:
+            self.db.close_connection(conn)
+
+if __name__ == "__main__":
+    inspector = DatabaseInspector()
+
+    print("Database statistics")
+    print("="*40)
+    stats = inspector.get_stats()
+    if stats:
+        overview = stats['overview']
+        print(f"📁 Size: {overview['file_bytes'] / 1024 / 1024:.1f} MB (+ {overview['wal_bytes'] / 1024 / 1024:.1f} MB WAL)")
+        print(f"📄 Pages: {overview['page_count']:,} x {overview['page_size']} bytes, {overview['freelist_count']:,} free")
+        for item in stats['objects']:
+            rows = f"{item['rows']:,} rows" if item['rows'] is not None else ""
+            print(f"   {item['name']:<40} {item['bytes'] / 1024:>10.0f} KB  {item['fragmentation_percentage']:>6.1f}% fragmented  {rows}")
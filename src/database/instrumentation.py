@@ -0,0 +1,278 @@
+"""
+Query instrumentation for Local Food Wastage Management System
+
+DatabaseManager reports every statement it runs here: latency histograms per
+normalized SQL statement (literals replaced by ?), rows returned or written,
+DataFrame memory materialized, errors, and the cost of opening and closing
+connections. One registry is shared per process, so in the Streamlit server
+it covers every session. Hooks receive each statement as it completes, which
+is how other tools (e.g. a slow-query log) plug in.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+import sys
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import INSTRUMENTATION
+
+# Histogram bucket upper bounds in milliseconds (one more bucket catches the rest)
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Statements beyond max_statements are pooled under this key
+OTHER_STATEMENTS = "(other statements)"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Statement text with literals as ? and whitespace collapsed
+
+    Queries differing only in their values (or the length of an IN list)
+    share one entry.
+    """
+    statement = _STRING_LITERAL.sub("?", sql)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def dataframe_bytes(df, deep=True):
+    """Memory held by a DataFrame (deep counts the strings in object columns)"""
+    return int(df.memory_usage(index=True, deep=deep).sum())
+
+
+class LatencyHistogram:
+    """Log-scale latency buckets with count, total, min and max"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        """Add one measurement"""
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if self.min_ms is None or ms < self.min_ms:
+            self.min_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, capped at the max seen"""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS + [None], self.counts):
+            cumulative += count
+            if cumulative and cumulative >= rank:
+                return round(self.max_ms if bound is None else min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def buckets(self):
+        """[(label, count)] for every bucket, e.g. ('≤ 2.5 ms', 12)"""
+        labels = [f"≤ {bound:g} ms" for bound in BUCKET_BOUNDS_MS] + [f"> {BUCKET_BOUNDS_MS[-1]:g} ms"]
+        return list(zip(labels, self.counts))
+
+    def to_dict(self):
+        """Summary of the histogram in milliseconds"""
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'min_ms': round(self.min_ms, 3) if self.min_ms is not None else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3)
+        }
+
+
+class StatementStats:
+    """Everything recorded for one normalized statement"""
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.histogram = LatencyHistogram()
+        self.operations = set()
+        self.errors = 0
+        self.rows = 0
+        self.bytes = 0
+        self.last_error = None
+        self.last_seen = None
+
+    def to_dict(self):
+        calls = self.histogram.count
+        summary = {
+            'statement': self.statement,
+            'operations': ', '.join(sorted(self.operations)),
+            'calls': calls,
+            'errors': self.errors,
+            'rows_total': self.rows,
+            'avg_rows': round(self.rows / calls, 1) if calls else None,
+            'bytes_total': self.bytes,
+            'avg_bytes': int(self.bytes / calls) if calls else None,
+            'last_error': self.last_error,
+            'last_seen': self.last_seen
+        }
+        summary.update(self.histogram.to_dict())
+        return summary
+
+
+class QueryEvent:
+    """One statement execution, timed as a context manager; passed to hooks once it completes"""
+
+    __slots__ = (
+        'instrumentation', 'sql', 'operation', 'params', 'database',
+        'started', 'elapsed_ms', 'rows', 'bytes', 'error'
+    )
+
+    def __init__(self, instrumentation, sql, operation, params=None, database=None):
+        self.instrumentation = instrumentation
+        self.sql = sql
+        self.operation = operation
+        self.params = params
+        self.database = database
+        self.started = time.perf_counter()
+        self.elapsed_ms = None
+        self.rows = None
+        self.bytes = None
+        self.error = None
+
+    def stop(self):
+        """Stop the clock (work after this, e.g. sizing the result, is not timed)"""
+        if self.elapsed_ms is None:
+            self.elapsed_ms = (time.perf_counter() - self.started) * 1000
+
+    @property
+    def statement(self):
+        return normalize_sql(self.sql)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc is not None and self.error is None:
+            self.error = str(exc)
+        self.stop()
+        if self.instrumentation.enabled:
+            self.instrumentation.record(self)
+        return False
+
+
+class QueryInstrumentation:
+    """Thread-safe registry of statement and connection timings"""
+
+    def __init__(self, enabled=True, max_statements=500, deep_memory=True):
+        self.enabled = enabled
+        self.max_statements = max_statements
+        self.deep_memory = deep_memory
+        self.hooks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far (hooks stay registered)"""
+        with self._lock:
+            self.statements = {}
+            self.connections = {'open': LatencyHistogram(), 'close': LatencyHistogram()}
+            self.since = time.time()
+
+    def add_hook(self, hook):
+        """Call hook(event) with the QueryEvent of every completed statement"""
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Stop calling a hook"""
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def track(self, sql, operation, params=None, database=None):
+        """Context manager timing one statement; the caller may fill in rows, bytes and error"""
+        return QueryEvent(self, sql, operation, params, database)
+
+    def measure_dataframe(self, event, df):
+        """Record a fetched DataFrame's rows and memory on its event"""
+        event.stop()
+        event.rows = len(df)
+        event.bytes = dataframe_bytes(df, self.deep_memory)
+
+    def record(self, event):
+        """Add a completed statement to its statement's statistics"""
+        with self._lock:
+            statement = event.statement
+            stats = self.statements.get(statement)
+            if stats is None:
+                if len(self.statements) >= self.max_statements:
+                    statement = OTHER_STATEMENTS
+                stats = self.statements.setdefault(statement, StatementStats(statement))
+            stats.histogram.observe(event.elapsed_ms)
+            stats.operations.add(event.operation)
+            stats.rows += event.rows or 0
+            stats.bytes += event.bytes or 0
+            stats.last_seen = time.time()
+            if event.error is not None:
+                stats.errors += 1
+                stats.last_error = event.error
+
+        for hook in self.hooks[:] if self.hooks else ():
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Error in query instrumentation hook: {e}")
+
+    def record_connection(self, action, elapsed_ms):
+        """Record the cost of opening or closing (returning) a connection"""
+        if self.enabled:
+            with self._lock:
+                self.connections[action].observe(elapsed_ms)
+
+    def snapshot(self, sort_by='total_ms'):
+        """Per-statement statistics, most expensive first"""
+        with self._lock:
+            rows = [stats.to_dict() for stats in self.statements.values()]
+        return sorted(rows, key=lambda row: row[sort_by] or 0, reverse=True)
+
+    def connection_stats(self):
+        """Open and close timing summaries"""
+        with self._lock:
+            return {action: histogram.to_dict() for action, histogram in self.connections.items()}
+
+    def histogram(self, statement):
+        """[(bucket label, count)] for one normalized statement (empty if unknown)"""
+        with self._lock:
+            stats = self.statements.get(statement)
+            return stats.histogram.buckets() if stats else []
+
+
+_instrumentation = None
+_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation():
+    """Get (or lazily create) the process-wide instrumentation registry"""
+    global _instrumentation
+    with _instrumentation_lock:
+        if _instrumentation is None:
+            _instrumentation = QueryInstrumentation(
+                enabled=INSTRUMENTATION['enabled'],
+                max_statements=INSTRUMENTATION['max_statements'],
+                deep_memory=INSTRUMENTATION['deep_memory']
+            )
+        return _instrumentation
@@ -0,0 +1,206 @@
+"""
+SQLite connection pooling for Local Food Wastage Management System
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection that goes back to its pool when closed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.checked_out = False
+        self.last_used = time.monotonic()
+        self.applied_pragmas = {}
+
+    def close(self):
+        """Return connection to the pool (or really close it if unpooled)"""
+        if self.pool is None:
+            super().close()
+        elif self.checked_out:
+            self.pool.release(self)
+
+    def discard(self):
+        """Close the underlying SQLite connection for good"""
+        self.pool = None
+        self.checked_out = False
+        super().close()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable SQLite connections"""
+
+    def __init__(self, db_path, max_connections=8, checkout_timeout=10.0,
+                 health_check_interval=30.0, cached_statements=256, pragmas=None, read_only=False):
+        self.db_path = str(db_path)
+        self.read_only = read_only  # connections opened with mode=ro refuse every write
+        self.max_connections = max_connections
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.cached_statements = cached_statements
+        self.pragmas = dict(pragmas or {})
+
+        # LIFO so the most recently used (warmest page cache) connection is reused first
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._open_count = 0
+        self._closed = False
+
+    def _create_connection(self, pragmas):
+        """Open a new connection and apply per-connection PRAGMAs once"""
+        conn = sqlite3.connect(
+            read_only_uri(self.db_path) if self.read_only else self.db_path,
+            check_same_thread=False,  # the pool guarantees one user at a time
+            cached_statements=self.cached_statements,
+            factory=PooledConnection,
+            uri=self.read_only
+        )
+        try:
+            apply_pragmas(conn, pragmas)
+        except sqlite3.Error:
+            conn.discard()
+            raise
+        with self._lock:
+            self._open_count += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        """Validate a connection that has been idle for a while"""
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self._open_count -= 1
+        try:
+            conn.discard()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self, pragmas=None):
+        """Check a connection out of the pool, waiting if all are in use
+
+        ``pragmas`` overrides the pool default; only settings that differ
+        from what the connection already has are re-applied.
+        """
+        pragmas = self.pragmas if pragmas is None else pragmas
+        if self._closed:
+            raise sqlite3.OperationalError("Connection pool is closed")
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise sqlite3.OperationalError(
+                f"Connection pool exhausted ({self.max_connections} connections in use)"
+            )
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._create_connection(pragmas)
+                    break
+                if self._is_healthy(candidate):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+            apply_pragmas(conn, pragmas)
+        except Exception:
+            self._slots.release()
+            raise
+
+        conn.pool = self
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn):
+        """Return a checked-out connection to the pool"""
+        if not conn.checked_out:
+            return
+        conn.checked_out = False
+
+        try:
+            if self._closed:
+                raise sqlite3.OperationalError("Connection pool is closed")
+            # Never hand the next caller a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+        except sqlite3.Error:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection; in-use ones are closed on release"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        """Return a snapshot of pool usage"""
+        idle = self._idle.qsize()
+        return {
+            'read_only': self.read_only,
+            'max_connections': self.max_connections,
+            'open_connections': self._open_count,
+            'idle_connections': idle,
+            'in_use_connections': self._open_count - idle
+        }
+
+
+def read_only_uri(db_path):
+    """URI opening a database file read-only (for sqlite3.connect(..., uri=True))"""
+    return f"{Path(db_path).resolve().as_uri()}?mode=ro"
+
+
+def apply_pragmas(conn, pragmas):
+    """Apply a dict of PRAGMA settings, skipping ones the connection already has"""
+    applied = getattr(conn, 'applied_pragmas', None)
+    for name, value in pragmas.items():
+        if applied is not None and applied.get(name) == value:
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+        if applied is not None:
+            applied[name] = value
+
+
+# One pool per (process, database file) so forked workers never share handles
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, **pool_settings):
+    """Get (or lazily create) the process-wide pool for a database file"""
+    key = (os.getpid(), str(db_path), pool_settings.get('read_only', False))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(db_path, **pool_settings)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """Close every pool owned by this process"""
+    with _pools_lock:
+        for key, pool in list(_pools.items()):
+            if key[0] == os.getpid():
+                pool.close()
+        _pools.clear()
@@ -0,0 +1,262 @@
+"""
+Parameterized query builder for Local Food Wastage Management System
+
+Filters are bound as parameters rather than formatted into the SQL, so every
+search with the same set of active filters produces the same SQL text and is
+served from the connection's prepared-statement cache (see DATABASE_POOL
+'cached_statements'). Sort columns cannot be parameters, so they are only
+accepted from a per-query whitelist.
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input only ever matches literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class QueryBuilder:
+    """Composable SELECT with bound filters, whitelisted sort and pagination"""
+
+    def __init__(self, select_sql, group_by=None, sortable=None, default_sort=None):
+        self.select_sql = select_sql.strip()
+        self.group_by = group_by
+        self.sortable = sortable or {}
+        self.conditions = []         # (sql, params) for WHERE
+        self.having_conditions = []  # (sql, params) for HAVING
+        self.sort = list(default_sort or [])
+        self.limit = None
+        self.offset = None
+
+    def where(self, clause, *params):
+        """Add a raw WHERE condition using ? placeholders"""
+        self.conditions.append((clause, list(params)))
+        return self
+
+    def where_equals(self, column, value):
+        """Filter column = value; skipped when value is None"""
+        if value is not None:
+            self.where(f"{column} = ?", value)
+        return self
+
+    def where_in(self, column, values):
+        """Filter column IN values; the SQL text is the same for any list length"""
+        if values:
+            self.where(f"{column} IN (SELECT value FROM json_each(?))", json.dumps(list(values)))
+        return self
+
+    def where_like(self, column, term):
+        """Case-insensitive substring match; skipped for empty terms"""
+        if term:
+            self.where(f"{column} LIKE ? ESCAPE '\\'", f"%{escape_like(term)}%")
+        return self
+
+    def where_between(self, column, low=None, high=None):
+        """Filter column >= low and/or column <= high"""
+        if low is not None:
+            self.where(f"{column} >= ?", low)
+        if high is not None:
+            self.where(f"{column} <= ?", high)
+        return self
+
+    def having(self, clause, *params):
+        """Add a HAVING condition (aggregate queries only)"""
+        self.having_conditions.append((clause, list(params)))
+        return self
+
+    def order_by(self, key, descending=False):
+        """Sort by a whitelisted key, replacing the current order"""
+        if key not in self.sortable:
+            raise ValueError(f"Cannot sort by {key!r}; choose from {sorted(self.sortable)}")
+        self.sort = [(self.sortable[key], descending)]
+        return self
+
+    def then_by(self, key, descending=False):
+        """Add a secondary whitelisted sort key"""
+        if key not in self.sortable:
+            raise ValueError(f"Cannot sort by {key!r}; choose from {sorted(self.sortable)}")
+        self.sort.append((self.sortable[key], descending))
+        return self
+
+    def paginate(self, page=1, page_size=50):
+        """Return one page (1-based) of page_size rows"""
+        self.limit = page_size
+        self.offset = (max(page, 1) - 1) * page_size
+        return self
+
+    def build_filtered(self):
+        """Return (sql, params) with filters and grouping but no ORDER BY/LIMIT"""
+        sql = self.select_sql
+        params = []
+        if self.conditions:
+            sql += "\nWHERE " + " AND ".join(clause for clause, _ in self.conditions)
+            for _, clause_params in self.conditions:
+                params.extend(clause_params)
+        if self.group_by:
+            sql += f"\nGROUP BY {self.group_by}"
+        if self.having_conditions:
+            sql += "\nHAVING " + " AND ".join(clause for clause, _ in self.having_conditions)
+            for _, clause_params in self.having_conditions:
+                params.extend(clause_params)
+        return sql, params
+
+    def build(self):
+        """Return (sql, params) for the full query"""
+        sql, params = self.build_filtered()
+        if self.sort:
+            sql += "\nORDER BY " + ", ".join(
+                f"{column} {'DESC' if descending else 'ASC'}" for column, descending in self.sort
+            )
+        if self.limit is not None:
+            sql += "\nLIMIT ? OFFSET ?"
+            params += [self.limit, self.offset]
+        return sql, params
+
+    def build_count(self):
+        """Return (sql, params) counting all rows that match the filters"""
+        sql, params = self.build_filtered()
+        return f"SELECT COUNT(*) as total FROM ({sql})", params
+
+    def build_summary(self, select_list, group_by=None):
+        """Return (sql, params) aggregating over all matching rows"""
+        sql, params = self.build_filtered()
+        summary = f"SELECT {select_list} FROM ({sql}) AS matches"
+        if group_by:
+            summary += f" GROUP BY {group_by} ORDER BY {group_by}"
+        return summary, params
+
+
+def provider_query():
+    """Providers with their listing and claim totals"""
+    return QueryBuilder(
+        """
+        SELECT
+            p.provider_id,
+            p.name,
+            p.type,
+            p.city,
+            p.address,
+            p.contact,
+            COUNT(f.food_id) as total_food_items,
+            COALESCE(SUM(f.quantity), 0) as total_quantity,
+            COUNT(c.claim_id) as total_claims,
+            COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) as successful_claims
+        FROM providers p
+        LEFT JOIN food_listings f ON p.provider_id = f.provider_id
+        LEFT JOIN claims c ON f.food_id = c.food_id
+        """,
+        group_by="p.provider_id, p.name, p.type, p.city, p.address, p.contact",
+        sortable={
+            'name': 'p.name',
+            'city': 'p.city',
+            'total_food_items': 'total_food_items',
+            'total_quantity': 'total_quantity',
+            'total_claims': 'total_claims',
+            'successful_claims': 'successful_claims'
+        },
+        default_sort=[('total_quantity', True)]
+    )
+
+
+def receiver_query():
+    """Receivers with their claim totals (same columns as query 4)"""
+    return QueryBuilder(
+        """
+        SELECT
+            r.receiver_id,
+            r.name as receiver_name,
+            r.type as receiver_type,
+            r.city,
+            r.contact,
+            COUNT(c.claim_id) as total_claims,
+            COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) as completed_claims,
+            COUNT(CASE WHEN c.status = 'Pending' THEN 1 END) as pending_claims,
+            COUNT(CASE WHEN c.status = 'Cancelled' THEN 1 END) as cancelled_claims,
+            ROUND(
+                COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) * 100.0 /
+                NULLIF(COUNT(c.claim_id), 0), 2
+            ) as success_rate_percentage,
+            SUM(CASE WHEN c.status = 'Completed' THEN f.quantity ELSE 0 END) as total_food_received
+        FROM receivers r
+        LEFT JOIN claims c ON r.receiver_id = c.receiver_id
+        LEFT JOIN food_listings f ON c.food_id = f.food_id
+        """,
+        group_by="r.receiver_id, r.name, r.type, r.city, r.contact",
+        sortable={
+            'name': 'r.name',
+            'city': 'r.city',
+            'total_claims': 'total_claims',
+            'completed_claims': 'completed_claims',
+            'success_rate_percentage': 'success_rate_percentage',
+            'total_food_received': 'total_food_received'
+        },
+        default_sort=[('total_food_received', True), ('total_claims', True)]
+    )
+
+
+def food_listing_query():
+    """Food listings with their provider's details"""
+    return QueryBuilder(
+        """
+        SELECT
+            f.food_id,
+            f.food_name,
+            f.food_type,
+            f.meal_type,
+            f.quantity,
+            f.expiry_date,
+            f.location,
+            f.is_available,
+            f.version,
+            p.name as provider_name,
+            p.type as provider_type,
+            p.contact as provider_contact
+        FROM food_listings f
+        LEFT JOIN providers p ON f.provider_id = p.provider_id
+        """,
+        sortable={
+            'food_id': 'f.food_id',
+            'food_name': 'f.food_name',
+            'quantity': 'f.quantity',
+            'expiry_date': 'f.expiry_date',
+            'location': 'f.location'
+        },
+        default_sort=[('f.expiry_date', False), ('f.food_id', False)]
+    )
+
+
+def claim_query():
+    """Claims with the claimed food and the receiver"""
+    return QueryBuilder(
+        """
+        SELECT
+            c.claim_id,
+            c.food_id,
+            f.food_name,
+            f.quantity,
+            f.location,
+            c.receiver_id,
+            r.name as receiver_name,
+            p.name as provider_name,
+            c.status,
+            c.timestamp
+        FROM claims c
+        LEFT JOIN food_listings f ON c.food_id = f.food_id
+        LEFT JOIN receivers r ON c.receiver_id = r.receiver_id
+        LEFT JOIN providers p ON f.provider_id = p.provider_id
+        """,
+        sortable={
+            'claim_id': 'c.claim_id',
+            'timestamp': 'c.timestamp',
+            'status': 'c.status',
+            'food_name': 'f.food_name',
+            'receiver_name': 'r.name'
+        },
+        default_sort=[('c.timestamp', True), ('c.claim_id', True)]
+    )
@@ -0,0 +1,208 @@
+"""
+Full-text search for Local Food Wastage Management System
+
+External-content FTS5 indexes over the searchable text columns of providers,
+receivers and food listings, kept in sync by triggers. Every word of a search
+matches as a prefix ("gre sup" finds "Green Supermarket"), so lookups stay
+index-only however large the tables grow.
+
+Matches are ranked inside the FTS query by bm25, weighted towards the main
+column, so the candidates kept are the best matches in the whole index; those
+are then ordered by how well the main column matches the first search word.
+"""
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+from src.database.query_builder import escape_like
+
+# Best bm25 matches kept for the final ordering by the main column
+RANK_CANDIDATES = 200
+
+# bm25 weight of the main (first) column; the other columns weigh 1
+MAIN_COLUMN_WEIGHT = 10.0
+
+# Base table -> FTS table, rowid column and indexed columns (first = ranked column)
+SEARCH_INDEXES = {
+    'providers': {
+        'fts_table': 'providers_fts',
+        'key': 'provider_id',
+        'columns': ['name', 'address', 'city']
+    },
+    'receivers': {
+        'fts_table': 'receivers_fts',
+        'key': 'receiver_id',
+        'columns': ['name', 'city']
+    },
+    'food_listings': {
+        'fts_table': 'food_listings_fts',
+        'key': 'food_id',
+        'columns': ['food_name', 'location']
+    }
+}
+
+
+def build_match_query(text, column=None):
+    """Turn free text into a safe FTS5 query of quoted terms (None if empty)
+
+    Words of two or more characters match as prefixes; single characters only
+    match whole tokens, since a one-letter prefix would touch most of the index.
+    With column, every term must match in that column.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    terms = " ".join(f'"{word}"*' if len(word) > 1 else f'"{word}"' for word in words)
+    return f"{column} : ({terms})" if column else terms
+
+
+class SearchIndex:
+    """Creates, maintains and queries the FTS5 search indexes"""
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def is_installed(self):
+        """Check whether the search indexes have been created"""
+        return self.db.table_exists('providers_fts')
+
+    def install(self):
+        """Create the FTS5 tables and triggers, then index existing rows"""
+        try:
+            with self.db.transaction() as conn:
+                for table, index in SEARCH_INDEXES.items():
+                    conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {index['fts_table']} USING fts5(
+                        {', '.join(index['columns'])},
+                        content='{table}',
+                        content_rowid='{index['key']}',
+                        tokenize='unicode61 remove_diacritics 2',
+                        prefix='2 3'
+                    )
+                    """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Full-text search unavailable (SQLite built without FTS5?): {e}")
+            return False
+        self.create_triggers()
+        self.rebuild()
+        return True
+
+    def create_triggers(self):
+        """Create the triggers that mirror base-table changes into the indexes"""
+        with self.db.transaction() as conn:
+            for table, index in SEARCH_INDEXES.items():
+                fts, key, columns = index['fts_table'], index['key'], index['columns']
+                column_list = ', '.join(columns)
+                new_values = ', '.join(f"NEW.{column}" for column in columns)
+                old_values = ', '.join(f"OLD.{column}" for column in columns)
+                insert_new = f"INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.{key}, {new_values});"
+                delete_old = (
+                    f"INSERT INTO {fts} ({fts}, rowid, {column_list}) "
+                    f"VALUES ('delete', OLD.{key}, {old_values});"
+                )
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table}
+                BEGIN {insert_new} END
+                """)
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table}
+                BEGIN {delete_old} END
+                """)
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS search_{table}_update AFTER UPDATE OF {key}, {column_list} ON {table}
+                BEGIN {delete_old} {insert_new} END
+                """)
+
+    def drop_triggers(self):
+        """Drop the sync triggers (e.g. around a full reload)"""
+        with self.db.transaction() as conn:
+            triggers = conn.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type = 'trigger' AND name LIKE 'search!_%' ESCAPE '!'
+            """).fetchall()
+            for trigger in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger['name']}")
+
+    def rebuild(self):
+        """Re-index every row from the base tables"""
+        with self.db.transaction("IMMEDIATE") as conn:
+            for index in SEARCH_INDEXES.values():
+                conn.execute(f"INSERT INTO {index['fts_table']} ({index['fts_table']}) VALUES ('rebuild')")
+
+    def optimize(self):
+        """Merge index segments for the fastest lookups (after large loads)"""
+        with self.db.transaction("IMMEDIATE") as conn:
+            for index in SEARCH_INDEXES.values():
+                conn.execute(f"INSERT INTO {index['fts_table']} ({index['fts_table']}) VALUES ('optimize')")
+
+    def uninstall(self):
+        """Drop the triggers and the FTS tables"""
+        self.drop_triggers()
+        for index in SEARCH_INDEXES.values():
+            self.db.drop_table(index['fts_table'])
+
+    def search(self, table, text, limit=50):
+        """Ranked search returning matching ids, best match first
+
+        The best RANK_CANDIDATES matches by bm25 are ordered so that rows
+        whose main column starts with the first search word come first, then
+        rows where a later word of it does, then by bm25 and shorter values.
+        """
+        match = build_match_query(text)
+        if match is None:
+            return []
+        index = SEARCH_INDEXES[table]
+        fts, key, column = index['fts_table'], index['key'], index['columns'][0]
+        weights = ', '.join([str(MAIN_COLUMN_WEIGHT)] + ['1.0'] * (len(index['columns']) - 1))
+        first_word = escape_like(re.findall(r"\w+", text)[0])
+        result = self.db.execute_query(f"""
+            SELECT t.{key}
+            FROM (
+                SELECT rowid, bm25({fts}, {weights}) as score
+                FROM {fts}
+                WHERE {fts} MATCH ?
+                ORDER BY score
+                LIMIT ?
+            ) m
+            JOIN {table} t ON t.{key} = m.rowid
+            ORDER BY
+                CASE
+                    WHEN t.{column} LIKE ? ESCAPE '\\' THEN 0
+                    WHEN t.{column} LIKE ? ESCAPE '\\' THEN 1
+                    ELSE 2
+                END,
+                m.score,
+                length(t.{column}),
+                t.{key}
+            LIMIT ?
+        """, (match, max(RANK_CANDIDATES, limit), f"{first_word}%", f"% {first_word}%", limit))
+        return [row[0] for row in result] if result else []
+
+    def filter_query(self, builder, table, key_column, text, fallback_column):
+        """Restrict a QueryBuilder to rows whose main (name) column matches text
+
+        Uses the FTS index when installed and falls back to a LIKE scan of
+        fallback_column (the same column) otherwise.
+        """
+        index = SEARCH_INDEXES[table]
+        match = build_match_query(text, index['columns'][0])
+        if match is None:
+            return builder
+        if not self.is_installed():
+            return builder.where_like(fallback_column, text)
+        fts = index['fts_table']
+        return builder.where(f"{key_column} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)", match)
+
+if __name__ == "__main__":
+    search_index = SearchIndex()
+
+    print("Building full-text search indexes...")
+    if search_index.install():
+        for table, index in SEARCH_INDEXES.items():
+            print(f"✅ {index['fts_table']}: {', '.join(index['columns'])}")
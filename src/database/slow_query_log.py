@@ -0,0 +1,173 @@
+"""
+Slow-query log for Local Food Wastage Management System
+
+Registered as a hook on the query instrumentation, it writes every statement
+slower than SLOW_QUERY_LOG['threshold_ms'] to a rotating log file with its
+parameters, its EXPLAIN QUERY PLAN and the render_* page or query_N analysis
+that issued it, so a slow rerun can be traced to the statement responsible.
+"""
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import SLOW_QUERY_LOG
+from src.database.instrumentation import get_instrumentation
+
+# Functions worth naming as the origin of a query
+_CALLER_NAME = re.compile(r"^(render_\w+|query_\d+\w*)$")
+_DATABASE_PACKAGE = str(Path(__file__).parent)
+
+# Plans are re-captured for a statement at most this often
+PLAN_CACHE_SECONDS = 300
+PLAN_CACHE_ENTRIES = 256
+
+MAX_PARAMS_LENGTH = 500
+
+
+def find_caller():
+    """Name the render_* or query_N function on the stack (else the first frame outside the database package)"""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        location = f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+        if _CALLER_NAME.match(code.co_name):
+            return location
+        if fallback is None and not code.co_filename.startswith(_DATABASE_PACKAGE):
+            fallback = location
+        frame = frame.f_back
+    return fallback or "unknown"
+
+
+class SlowQueryLog:
+    """Instrumentation hook logging statements over the threshold"""
+
+    def __init__(self, threshold_ms=250, path=None, max_megabytes=5, backup_count=3, explain=True):
+        self.threshold_ms = threshold_ms
+        self.path = Path(path) if path else SLOW_QUERY_LOG['path']
+        self.explain = explain
+        self.recent = deque(maxlen=100)  # newest entries, for the admin page
+        self._plans = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(f"food_wastage.slow_queries.{self.path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(
+                self.path, maxBytes=max_megabytes * 1024 * 1024, backupCount=backup_count,
+                encoding='utf-8', delay=True
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+
+    def __call__(self, event):
+        """Instrumentation hook: log the event if it was slow"""
+        if event.elapsed_ms < self.threshold_ms:
+            return
+
+        params = event.params
+        if event.operation == 'execute_many':
+            # Only the first parameter set is bound for the plan
+            params = next(iter(params), None) if params else None
+        entry = {
+            'time': time.time(),
+            'elapsed_ms': round(event.elapsed_ms, 2),
+            'operation': event.operation,
+            'caller': find_caller(),
+            'statement': event.statement,
+            'sql': " ".join(event.sql.split()),
+            'params': repr(params)[:MAX_PARAMS_LENGTH] if params else None,
+            'rows': event.rows,
+            'error': event.error,
+            'plan': self.get_plan(event.database, event.sql, event.statement, params) if self.explain else []
+        }
+        self.recent.appendleft(entry)
+        self.logger.info(self.format_entry(entry))
+
+    def get_plan(self, database, sql, statement, params):
+        """EXPLAIN QUERY PLAN lines, cached per statement for a few minutes"""
+        if database is None:
+            return []
+        key = (str(database), statement)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._plans.get(key)
+            if cached and now - cached[0] < PLAN_CACHE_SECONDS:
+                return cached[1]
+
+        try:
+            # A separate read-only connection: the statement's own has gone back to the pool
+            conn = sqlite3.connect(f"{Path(database).resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or []).fetchall()
+            finally:
+                conn.close()
+            plan = [f"{'  ' * self._depth(rows, row)}{row[3]}" for row in rows]
+        except sqlite3.Error as e:
+            plan = [f"(plan unavailable: {e})"]
+
+        with self._lock:
+            if len(self._plans) >= PLAN_CACHE_ENTRIES:
+                self._plans.clear()
+            self._plans[key] = (now, plan)
+        return plan
+
+    @staticmethod
+    def _depth(rows, row):
+        """Nesting level of a plan row (its chain of parent ids)"""
+        parents = {r[0]: r[1] for r in rows}
+        depth, parent = 0, row[1]
+        while parent:
+            depth += 1
+            parent = parents.get(parent, 0)
+        return depth
+
+    @staticmethod
+    def format_entry(entry):
+        """Render one entry as the multi-line log record"""
+        lines = [
+            f"{entry['elapsed_ms']:.1f} ms | {entry['operation']} | {entry['caller']}"
+            + (f" | rows={entry['rows']}" if entry['rows'] is not None else "")
+            + (f" | error={entry['error']}" if entry['error'] else ""),
+            f"    SQL: {entry['sql']}"
+        ]
+        if entry['params']:
+            lines.append(f"    Params: {entry['params']}")
+        if entry['plan']:
+            lines.append("    Plan:")
+            lines.extend(f"      {line}" for line in entry['plan'])
+        return "\n".join(lines)
+
+
+_slow_query_log = None
+_slow_query_log_lock = threading.Lock()
+
+
+def get_slow_query_log():
+    """Get (or lazily create and register) the process-wide slow-query log; None when disabled"""
+    global _slow_query_log
+    if not SLOW_QUERY_LOG['enabled']:
+        return None
+    with _slow_query_log_lock:
+        if _slow_query_log is None:
+            _slow_query_log = SlowQueryLog(
+                threshold_ms=SLOW_QUERY_LOG['threshold_ms'],
+                path=SLOW_QUERY_LOG['path'],
+                max_megabytes=SLOW_QUERY_LOG['max_megabytes'],
+                backup_count=SLOW_QUERY_LOG['backup_count'],
+                explain=SLOW_QUERY_LOG['explain']
+            )
+            get_instrumentation().add_hook(_slow_query_log)
+        return _slow_query_log
@@ -0,0 +1,395 @@
+"""
+Materialized summary tables for Local Food Wastage Management System
+
+Per-provider, per-receiver, per-city and per-food-type aggregates behind the
+heavier analytical queries. Triggers on the base tables record which groups
+changed in summary_dirty; refresh() recomputes only those groups with the
+same SQL the analyzer would run, so answers match the live queries exactly.
+Writers refresh after committing (the write queue after each batch, the
+expiry sweeper on every tick), so reads never take the write lock.
+"""
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+
+# Each summary: its table, the column keying it, and the aggregate SQL with a
+# {where} slot used to restrict a refresh to the dirty keys of that kind
+SUMMARIES = {
+    'provider': {
+        'table': 'summary_provider',
+        'key_column': 'provider_id',
+        'source_key': 'p.provider_id',
+        'schema': """
+        CREATE TABLE IF NOT EXISTS summary_provider (
+            provider_id INTEGER PRIMARY KEY,
+            provider_name TEXT,
+            provider_type TEXT,
+            city TEXT,
+            contact TEXT,
+            total_food_items_listed INTEGER,
+            total_food_items INTEGER,
+            total_quantity_donated INTEGER,
+            avg_quantity_per_item REAL,
+            food_type_variety INTEGER,
+            meal_type_variety INTEGER,
+            total_claims_received INTEGER,
+            successful_claims INTEGER,
+            pending_claims INTEGER,
+            cancelled_claims INTEGER,
+            success_rate_percentage REAL,
+            total_food_distributed INTEGER,
+            distribution_efficiency_percentage REAL
+        )
+        """,
+        'source': """
+        SELECT
+            p.provider_id,
+            p.name as provider_name,
+            p.type as provider_type,
+            p.city,
+            p.contact,
+            COUNT(DISTINCT f.food_id) as total_food_items_listed,
+            COUNT(f.food_id) as total_food_items,
+            SUM(f.quantity) as total_quantity_donated,
+            ROUND(AVG(f.quantity), 2) as avg_quantity_per_item,
+            COUNT(DISTINCT f.food_type) as food_type_variety,
+            COUNT(DISTINCT f.meal_type) as meal_type_variety,
+            COUNT(c.claim_id) as total_claims_received,
+            COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) as successful_claims,
+            COUNT(CASE WHEN c.status = 'Pending' THEN 1 END) as pending_claims,
+            COUNT(CASE WHEN c.status = 'Cancelled' THEN 1 END) as cancelled_claims,
+            ROUND(
+                COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) * 100.0 /
+                NULLIF(COUNT(c.claim_id), 0), 2
+            ) as success_rate_percentage,
+            SUM(CASE WHEN c.status = 'Completed' THEN f.quantity ELSE 0 END) as total_food_distributed,
+            ROUND(
+                SUM(CASE WHEN c.status = 'Completed' THEN f.quantity ELSE 0 END) * 100.0 /
+                NULLIF(SUM(f.quantity), 0), 2
+            ) as distribution_efficiency_percentage
+        FROM providers p
+        LEFT JOIN food_listings f ON p.provider_id = f.provider_id
+        LEFT JOIN claims c ON f.food_id = c.food_id
+        {where}
+        GROUP BY p.provider_id, p.name, p.type, p.city, p.contact
+        """
+    },
+    'receiver': {
+        'table': 'summary_receiver',
+        'key_column': 'receiver_id',
+        'source_key': 'r.receiver_id',
+        'schema': """
+        CREATE TABLE IF NOT EXISTS summary_receiver (
+            receiver_id INTEGER PRIMARY KEY,
+            receiver_name TEXT,
+            receiver_type TEXT,
+            city TEXT,
+            contact TEXT,
+            total_claims INTEGER,
+            completed_claims INTEGER,
+            pending_claims INTEGER,
+            cancelled_claims INTEGER,
+            success_rate_percentage REAL,
+            total_food_received INTEGER
+        )
+        """,
+        'source': """
+        SELECT
+            r.receiver_id,
+            r.name as receiver_name,
+            r.type as receiver_type,
+            r.city,
+            r.contact,
+            COUNT(c.claim_id) as total_claims,
+            COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) as completed_claims,
+            COUNT(CASE WHEN c.status = 'Pending' THEN 1 END) as pending_claims,
+            COUNT(CASE WHEN c.status = 'Cancelled' THEN 1 END) as cancelled_claims,
+            ROUND(
+                COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) * 100.0 /
+                COUNT(c.claim_id), 2
+            ) as success_rate_percentage,
+            SUM(CASE WHEN c.status = 'Completed' THEN f.quantity ELSE 0 END) as total_food_received
+        FROM receivers r
+        LEFT JOIN claims c ON r.receiver_id = c.receiver_id
+        LEFT JOIN food_listings f ON c.food_id = f.food_id
+        {where}
+        GROUP BY r.receiver_id, r.name, r.type, r.city, r.contact
+        """
+    },
+    'city': {
+        'table': 'summary_city',
+        'key_column': 'city',
+        'source_key': 'f.location',
+        'schema': """
+        CREATE TABLE IF NOT EXISTS summary_city (
+            city TEXT PRIMARY KEY,
+            total_providers INTEGER,
+            total_food_listings INTEGER,
+            total_food_available INTEGER,
+            total_claims INTEGER,
+            completed_claims INTEGER,
+            food_distributed INTEGER,
+            unique_receivers_served INTEGER,
+            avg_claims_per_food_item REAL,
+            claim_success_rate REAL,
+            food_utilization_rate REAL
+        ) WITHOUT ROWID
+        """,
+        'source': """
+        SELECT
+            f.location as city,
+            COUNT(DISTINCT p.provider_id) as total_providers,
+            COUNT(DISTINCT f.food_id) as total_food_listings,
+            SUM(f.quantity) as total_food_available,
+            COUNT(c.claim_id) as total_claims,
+            COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) as completed_claims,
+            SUM(CASE WHEN c.status = 'Completed' THEN f.quantity ELSE 0 END) as food_distributed,
+            COUNT(DISTINCT c.receiver_id) as unique_receivers_served,
+            ROUND(
+                COUNT(c.claim_id) * 1.0 / NULLIF(COUNT(DISTINCT f.food_id), 0), 2
+            ) as avg_claims_per_food_item,
+            ROUND(
+                COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) * 100.0 /
+                NULLIF(COUNT(c.claim_id), 0), 2
+            ) as claim_success_rate,
+            ROUND(
+                SUM(CASE WHEN c.status = 'Completed' THEN f.quantity ELSE 0 END) * 100.0 /
+                NULLIF(SUM(f.quantity), 0), 2
+            ) as food_utilization_rate
+        FROM food_listings f
+        LEFT JOIN providers p ON f.provider_id = p.provider_id
+        LEFT JOIN claims c ON f.food_id = c.food_id
+        {where}
+        GROUP BY f.location
+        """
+    },
+    'food_type': {
+        'table': 'summary_food_type',
+        'key_column': 'food_type',
+        'source_key': 'food_type',
+        'schema': """
+        CREATE TABLE IF NOT EXISTS summary_food_type (
+            food_type TEXT PRIMARY KEY,
+            number_of_listings INTEGER,
+            total_quantity INTEGER,
+            avg_quantity_per_listing REAL,
+            providers_offering INTEGER,
+            cities_available INTEGER
+        ) WITHOUT ROWID
+        """,
+        'source': """
+        SELECT
+            food_type,
+            COUNT(food_id) as number_of_listings,
+            SUM(quantity) as total_quantity,
+            ROUND(AVG(quantity), 2) as avg_quantity_per_listing,
+            COUNT(DISTINCT provider_id) as providers_offering,
+            COUNT(DISTINCT location) as cities_available
+        FROM food_listings
+        {where}
+        GROUP BY food_type
+        """
+    }
+}
+
+# Analyzer queries answered from the summaries (same columns and ordering)
+SUMMARY_QUERIES = {
+    'query_4_top_food_claimers': """
+        SELECT receiver_id, receiver_name, receiver_type, city, contact,
+               total_claims, completed_claims, pending_claims, cancelled_claims,
+               success_rate_percentage, total_food_received
+        FROM summary_receiver
+        WHERE total_claims > 0
+        ORDER BY total_food_received DESC, total_claims DESC
+        LIMIT 20
+    """,
+    'query_7_common_food_types': """
+        SELECT food_type, number_of_listings, total_quantity, avg_quantity_per_listing,
+               providers_offering, cities_available,
+               ROUND(number_of_listings * 100.0 / SUM(number_of_listings) OVER (), 2) as percentage_of_listings,
+               ROUND(total_quantity * 100.0 / SUM(total_quantity) OVER (), 2) as percentage_of_total_quantity
+        FROM summary_food_type
+        ORDER BY total_quantity DESC
+    """,
+    'query_9_successful_providers': """
+        SELECT provider_id, provider_name, provider_type, city, contact,
+               total_food_items_listed, total_claims_received, successful_claims,
+               pending_claims, cancelled_claims, success_rate_percentage, total_food_distributed
+        FROM summary_provider
+        WHERE total_claims_received > 0
+        ORDER BY successful_claims DESC, total_food_distributed DESC
+        LIMIT 15
+    """,
+    'query_13_provider_food_donations': """
+        SELECT provider_id, provider_name, provider_type, city,
+               total_food_items, total_quantity_donated, avg_quantity_per_item,
+               food_type_variety, meal_type_variety, total_claims_received,
+               successful_claims as successful_distributions,
+               total_food_distributed as quantity_successfully_distributed,
+               distribution_efficiency_percentage
+        FROM summary_provider
+        WHERE total_food_items > 0
+        ORDER BY total_quantity_donated DESC
+    """,
+    'query_14_geographic_food_distribution': """
+        SELECT city, total_providers, total_food_listings, total_food_available,
+               total_claims, completed_claims, food_distributed, unique_receivers_served,
+               avg_claims_per_food_item, claim_success_rate, food_utilization_rate
+        FROM summary_city
+        ORDER BY food_distributed DESC, total_food_available DESC
+    """
+}
+
+# Groups touched by a row of each base table; {row} is NEW or OLD
+_MARK_DIRTY = {
+    'food_listings': """
+        INSERT OR IGNORE INTO summary_dirty (kind, key)
+        VALUES ('provider', {row}.provider_id), ('city', {row}.location), ('food_type', {row}.food_type);
+        INSERT OR IGNORE INTO summary_dirty (kind, key)
+        SELECT 'receiver', receiver_id FROM claims WHERE food_id = {row}.food_id;
+    """,
+    'claims': """
+        INSERT OR IGNORE INTO summary_dirty (kind, key) VALUES ('receiver', {row}.receiver_id);
+        INSERT OR IGNORE INTO summary_dirty (kind, key)
+        SELECT 'provider', provider_id FROM food_listings WHERE food_id = {row}.food_id;
+        INSERT OR IGNORE INTO summary_dirty (kind, key)
+        SELECT 'city', location FROM food_listings WHERE food_id = {row}.food_id;
+    """,
+    'providers': """
+        INSERT OR IGNORE INTO summary_dirty (kind, key) VALUES ('provider', {row}.provider_id);
+        INSERT OR IGNORE INTO summary_dirty (kind, key)
+        SELECT 'city', location FROM food_listings WHERE provider_id = {row}.provider_id;
+    """,
+    'receivers': """
+        INSERT OR IGNORE INTO summary_dirty (kind, key) VALUES ('receiver', {row}.receiver_id);
+    """
+}
+
+# Only updates to these columns can change a summary (e.g. is_available cannot)
+_TRACKED_COLUMNS = {
+    'food_listings': 'food_id, quantity, provider_id, location, food_type, meal_type',
+    'claims': 'claim_id, food_id, receiver_id, status',
+    'providers': 'provider_id, name, type, city, contact',
+    'receivers': 'receiver_id, name, type, city, contact'
+}
+
+# Indexes the per-key refresh and the trigger lookups rely on
+_SUPPORTING_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_food_provider ON food_listings(provider_id)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(food_id)",
+    "CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(receiver_id)"
+]
+
+_refresh_lock = threading.Lock()
+
+
+class SummaryTableManager:
+    """Creates, maintains and reads the materialized summary tables"""
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def is_installed(self):
+        """Check whether the summary tables have been created"""
+        return self.db.table_exists('summary_dirty')
+
+    def install(self):
+        """Create summary tables, triggers and supporting indexes, then populate them"""
+        with self.db.transaction() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS summary_dirty (
+                kind TEXT NOT NULL,
+                key NOT NULL,
+                PRIMARY KEY (kind, key)
+            ) WITHOUT ROWID
+            """)
+            for summary in SUMMARIES.values():
+                conn.execute(summary['schema'])
+            for index_query in _SUPPORTING_INDEXES:
+                conn.execute(index_query)
+        self.create_triggers()
+        self.rebuild()
+
+    def create_triggers(self):
+        """Create the change-tracking triggers on the base tables"""
+        with self.db.transaction() as conn:
+            for table, body in _MARK_DIRTY.items():
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS summary_{table}_insert AFTER INSERT ON {table}
+                BEGIN {body.format(row='NEW')} END
+                """)
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS summary_{table}_delete AFTER DELETE ON {table}
+                BEGIN {body.format(row='OLD')} END
+                """)
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS summary_{table}_update
+                AFTER UPDATE OF {_TRACKED_COLUMNS[table]} ON {table}
+                BEGIN {body.format(row='OLD')} {body.format(row='NEW')} END
+                """)
+
+    def drop_triggers(self):
+        """Drop the change-tracking triggers (e.g. around a full reload)"""
+        with self.db.transaction() as conn:
+            triggers = conn.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type = 'trigger' AND name LIKE 'summary!_%' ESCAPE '!'
+            """).fetchall()
+            for trigger in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger['name']}")
+
+    def rebuild(self):
+        """Recompute every summary table from scratch"""
+        with _refresh_lock, self.db.transaction("IMMEDIATE") as conn:
+            for summary in SUMMARIES.values():
+                conn.execute(f"DELETE FROM {summary['table']}")
+                conn.execute(f"INSERT INTO {summary['table']} {summary['source'].format(where='')}")
+            conn.execute("DELETE FROM summary_dirty")
+
+    def refresh(self):
+        """Recompute only the groups whose source rows changed; returns groups refreshed"""
+        # Cheap read first so clean summaries never take the write lock
+        pending = self.db.execute_query("SELECT COUNT(*) FROM summary_dirty")
+        if not pending or pending[0][0] == 0:
+            return 0
+
+        with _refresh_lock, self.db.transaction("IMMEDIATE") as conn:
+            refreshed = conn.execute("SELECT COUNT(*) FROM summary_dirty").fetchone()[0]
+            for kind, summary in SUMMARIES.items():
+                dirty_keys = "SELECT key FROM summary_dirty WHERE kind = ?"
+                conn.execute(
+                    f"DELETE FROM {summary['table']} WHERE {summary['key_column']} IN ({dirty_keys})",
+                    (kind,)
+                )
+                where = f"WHERE {summary['source_key']} IN ({dirty_keys})"
+                conn.execute(
+                    f"INSERT INTO {summary['table']} {summary['source'].format(where=where)}",
+                    (kind,)
+                )
+            conn.execute("DELETE FROM summary_dirty")
+            return refreshed
+
+    def uninstall(self):
+        """Drop the triggers and every summary table"""
+        self.drop_triggers()
+        for summary in SUMMARIES.values():
+            self.db.drop_table(summary['table'])
+        self.db.drop_table('summary_dirty')
+
+    def fetch(self, query_name):
+        """Answer an analyzer query from the summary tables (read-only)"""
+        return self.db.fetch_dataframe(SUMMARY_QUERIES[query_name])
+
+if __name__ == "__main__":
+    manager = SummaryTableManager()
+
+    print("Installing summary tables...")
+    manager.install()
+    for summary in SUMMARIES.values():
+        print(f"✅ {summary['table']}: {manager.db.get_row_count(summary['table'])} rows")
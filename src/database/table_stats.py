@@ -0,0 +1,127 @@
+"""
+Maintained row counters for Local Food Wastage Management System
+
+Triggers keep per-table row counts (and claims per status) in stat_counters,
+so the sidebar statistics are a single small read however large the tables
+grow.
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+
+COUNTED_TABLES = ['providers', 'receivers', 'food_listings', 'claims']
+CLAIM_STATUSES = ['Completed', 'Pending', 'Cancelled']
+
+
+def _bump(name_sql, delta):
+    """Statement adding delta to a counter, creating it if needed"""
+    return f"""
+        INSERT INTO stat_counters (name, value) VALUES ({name_sql}, {delta})
+        ON CONFLICT(name) DO UPDATE SET value = value + {delta};
+    """
+
+
+class TableStatsService:
+    """Creates the counter triggers and serves sidebar statistics in one query"""
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def is_installed(self):
+        """Check whether the counters have been created"""
+        return self.db.table_exists('stat_counters')
+
+    def install(self):
+        """Create the counter table and triggers, then populate the counters"""
+        self.db.execute_query("""
+        CREATE TABLE IF NOT EXISTS stat_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """)
+        self.create_triggers()
+        self.rebuild()
+
+    def create_triggers(self):
+        """Create the triggers that keep the counters current"""
+        with self.db.transaction() as conn:
+            for table in COUNTED_TABLES:
+                insert_body = _bump(f"'{table}'", 1)
+                delete_body = _bump(f"'{table}'", -1)
+                if table == 'claims':
+                    insert_body += _bump("'claims.' || NEW.status", 1)
+                    delete_body += _bump("'claims.' || OLD.status", -1)
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS stats_{table}_insert AFTER INSERT ON {table}
+                BEGIN {insert_body} END
+                """)
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS stats_{table}_delete AFTER DELETE ON {table}
+                BEGIN {delete_body} END
+                """)
+            conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS stats_claims_status AFTER UPDATE OF status ON claims
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN {_bump("'claims.' || OLD.status", -1)} {_bump("'claims.' || NEW.status", 1)} END
+            """)
+
+    def drop_triggers(self):
+        """Drop the counter triggers (e.g. around a full reload)"""
+        with self.db.transaction() as conn:
+            triggers = conn.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type = 'trigger' AND name LIKE 'stats!_%' ESCAPE '!'
+            """).fetchall()
+            for trigger in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger['name']}")
+
+    def rebuild(self):
+        """Recount every table from scratch"""
+        with self.db.transaction("IMMEDIATE") as conn:
+            conn.execute("DELETE FROM stat_counters")
+            for table in COUNTED_TABLES:
+                conn.execute(
+                    f"INSERT INTO stat_counters (name, value) SELECT '{table}', COUNT(*) FROM {table}"
+                )
+            conn.execute("""
+            INSERT INTO stat_counters (name, value)
+            SELECT 'claims.' || status, COUNT(*) FROM claims GROUP BY status
+            """)
+
+    def uninstall(self):
+        """Drop the triggers and the counter table"""
+        self.drop_triggers()
+        self.db.drop_table('stat_counters')
+
+    def get_sidebar_stats(self):
+        """Return table row counts and claim status counts in one round-trip"""
+        if self.is_installed():
+            query = "SELECT name, value FROM stat_counters"
+        else:
+            # Not installed yet: same shape from one statement, but counted live
+            query = " UNION ALL ".join(
+                f"SELECT '{table}' as name, COUNT(*) as value FROM {table}" for table in COUNTED_TABLES
+            ) + " UNION ALL SELECT 'claims.' || status, COUNT(*) FROM claims GROUP BY status"
+
+        rows = self.db.execute_query(query)
+        if rows is None:
+            return None
+        counters = {row['name']: row['value'] for row in rows}
+
+        stats = {table: counters.get(table, 0) for table in COUNTED_TABLES}
+        for status in CLAIM_STATUSES:
+            stats[f'{status.lower()}_claims'] = counters.get(f'claims.{status}', 0)
+        return stats
+
+if __name__ == "__main__":
+    service = TableStatsService()
+
+    print("Installing row counters...")
+    service.install()
+    for name, value in service.get_sidebar_stats().items():
+        print(f"✅ {name}: {value}")
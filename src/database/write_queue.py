@@ -0,0 +1,271 @@
+"""
+Single-writer write queue for Local Food Wastage Management System
+
+Streamlit runs every session in its own thread, and SQLite allows one writer
+at a time, so sessions committing through their own connections queue on the
+write lock and fail with "database is locked" under load. WriteQueue owns the
+process's only write connection: sessions submit writes and get a Future back,
+and one worker thread runs whatever has queued up, up to a batch, in a single
+BEGIN IMMEDIATE transaction (group commit). Each write runs in its own
+SAVEPOINT, so one failing write is rolled back alone and reported on its
+Future while the rest of the batch commits. Futures resolve only after the
+batch has committed and the summary tables it dirtied have been refreshed.
+"""
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import PRAGMA_PROFILES, WRITE_QUEUE
+from src.database.connection import DatabaseManager
+from src.database.pool import apply_pragmas
+from src.database.summary_tables import SummaryTableManager
+
+# Tables insert() may write to
+INSERTABLE_TABLES = ('providers', 'receivers', 'food_listings', 'claims')
+
+# provider_type and location are the provider's; nothing is inserted for an unknown provider
+ADD_LISTING_QUERY = """
+INSERT INTO food_listings (food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type)
+SELECT ?, ?, ?, provider_id, type, city, ?, ?
+FROM providers
+WHERE provider_id = ?
+"""
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class WriteQueue:
+    """Group-committing queue of writes, run by one worker on one connection"""
+
+    def __init__(self, db=None, batch_size=None, max_wait_ms=None):
+        self.db = db or DatabaseManager()
+        self.batch_size = batch_size or WRITE_QUEUE['batch_size']
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else WRITE_QUEUE['max_wait_ms']
+        self.summaries = SummaryTableManager(self.db)
+        self.stats = {'submitted': 0, 'committed': 0, 'failed': 0, 'batches': 0,
+                      'largest_batch': 0, 'busy_retries': 0, 'last_error': None}
+        self._jobs = queue.Queue()
+        self._conn = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    # Submitting writes
+
+    def submit(self, work, name="write"):
+        """Queue work(conn), run inside the next batch's transaction
+
+        Returns a Future with work's return value once the batch has
+        committed, or the exception work raised (its changes rolled back).
+        """
+        self.start()
+        future = Future()
+        with self._lock:
+            self.stats['submitted'] += 1
+        self._jobs.put((future, work, name))
+        return future
+
+    def execute(self, query, params=()):
+        """Queue one statement; the Future gives {'lastrowid', 'rowcount'}"""
+        def work(conn):
+            cursor = conn.execute(query, params)
+            return {'lastrowid': cursor.lastrowid, 'rowcount': cursor.rowcount}
+        return self.submit(work, query)
+
+    def execute_many(self, query, data_list):
+        """Queue a statement with several parameter sets; the Future gives the row count"""
+        return self.submit(lambda conn: conn.executemany(query, data_list).rowcount, query)
+
+    def insert(self, table, values):
+        """Queue an INSERT of a dict of column values; the Future gives the new row id"""
+        if table not in INSERTABLE_TABLES:
+            raise ValueError(f"Cannot insert into table: {table}")
+        columns = ', '.join(values)
+        placeholders = ', '.join('?' * len(values))
+        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+        return self.submit(lambda conn: conn.execute(query, tuple(values.values())).lastrowid, query)
+
+    def add_food_listing(self, food_name, quantity, expiry_date, provider_id, food_type, meal_type):
+        """Queue a new listing for a provider; the Future gives the food_id (ValueError for an unknown provider)"""
+        params = (food_name, int(quantity), str(expiry_date), food_type, meal_type, int(provider_id))
+
+        def work(conn):
+            cursor = conn.execute(ADD_LISTING_QUERY, params)
+            if not cursor.rowcount:
+                raise ValueError(f"Provider #{provider_id} does not exist")
+            return cursor.lastrowid
+        return self.submit(work, ADD_LISTING_QUERY)
+
+    def register_provider(self, name, provider_type, address, city, contact):
+        """Queue a provider registration; the Future gives the provider_id"""
+        return self.insert('providers', {
+            'name': name, 'type': provider_type, 'address': address, 'city': city, 'contact': contact
+        })
+
+    def register_receiver(self, name, receiver_type, city, contact):
+        """Queue a receiver registration; the Future gives the receiver_id"""
+        return self.insert('receivers', {'name': name, 'type': receiver_type, 'city': city, 'contact': contact})
+
+    # The worker
+
+    def _connect(self):
+        # Autocommit mode: the worker issues BEGIN, SAVEPOINT and COMMIT itself
+        conn = sqlite3.connect(self.db.db_path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, PRAGMA_PROFILES[self.db.pragma_profile])
+        return conn
+
+    def _collect(self, first):
+        """The first job plus whatever else arrives within max_wait_ms, up to batch_size"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.batch_size:
+            try:
+                # Anything already queued joins without waiting; otherwise wait until the deadline
+                batch.append(self._jobs.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        # Jobs whose caller cancelled the Future are dropped
+        return [job for job in batch if job[0].set_running_or_notify_cancel()]
+
+    def _run_batch(self, batch):
+        """Run a batch in one transaction; returns [(future, result, error)] once committed"""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            outcomes = []
+            for index, (future, work, name) in enumerate(batch):
+                conn.execute(f"SAVEPOINT write_{index}")
+                try:
+                    result = work(conn)
+                    conn.execute(f"RELEASE write_{index}")
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    if isinstance(e, sqlite3.OperationalError) and _is_busy(e):
+                        raise
+                    conn.execute(f"ROLLBACK TO write_{index}")
+                    conn.execute(f"RELEASE write_{index}")
+                    outcomes.append((future, None, e))
+            conn.execute("COMMIT")
+            return outcomes
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def _refresh_summaries(self):
+        """Bring the summary tables up to date with what the last batch committed"""
+        try:
+            if self.summaries.is_installed():
+                self.summaries.refresh()
+        except sqlite3.Error as e:
+            # The batch is committed; the dirty groups are picked up by the next refresh
+            print(f"Error refreshing summary tables: {e}")
+
+    def _process(self, batch):
+        with self.db.instrumentation.track("write_queue.batch", 'transaction', None, self.db.db_path) as event:
+            retries = WRITE_QUEUE['busy_retries']
+            for attempt in range(retries + 1):
+                try:
+                    if self._conn is None:
+                        self._conn = self._connect()
+                    outcomes = self._run_batch(batch)
+                    break
+                except sqlite3.Error as e:
+                    if _is_busy(e) and attempt < retries:
+                        # Another process holds the lock past busy_timeout; the whole batch is retried
+                        self.stats['busy_retries'] += 1
+                        time.sleep(WRITE_QUEUE['retry_backoff_ms'] / 1000 * (2 ** attempt) * random.uniform(0.5, 1.5))
+                        continue
+                    event.error = str(e)
+                    self.stats['last_error'] = str(e)
+                    print(f"Error committing write batch: {e}")
+                    if not _is_busy(e) and self._conn is not None:
+                        # Reconnect for the next batch in case the connection itself is broken
+                        self._conn.close()
+                        self._conn = None
+                    outcomes = [(future, None, e) for future, _, _ in batch]
+                    break
+            event.rows = len(batch)
+
+        failed = sum(1 for _, _, error in outcomes if error is not None)
+        if failed < len(batch):
+            self._refresh_summaries()
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+            self.stats['committed'] += len(batch) - failed
+            self.stats['failed'] += failed
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _loop(self):
+        # After stop() the worker still drains what is queued
+        while not (self._stop.is_set() and self._jobs.empty()):
+            try:
+                first = self._jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = self._collect(first)
+            if not batch:
+                continue
+            try:
+                self._process(batch)
+            except Exception as e:
+                print(f"Error in write queue: {e}")
+                for future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def start(self):
+        """Start the worker thread (once per queue)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the worker once the queued writes are done, and close the connection"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def pending(self):
+        """Writes waiting for the worker"""
+        return self._jobs.qsize()
+
+
+_write_queues = {}
+_write_queues_lock = threading.Lock()
+
+
+def get_write_queue(db=None):
+    """Get (or lazily create) the process-wide write queue for a database"""
+    db = db or DatabaseManager()
+    key = str(db.db_path)
+    with _write_queues_lock:
+        write_queue = _write_queues.get(key)
+        if write_queue is None:
+            write_queue = _write_queues[key] = WriteQueue(db)
+        return write_queue
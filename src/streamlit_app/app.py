@@ -9,18 +9,35 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, date, timedelta
+from functools import partial
 import sys
 from pathlib import Path
 import time
 import random
+import uuid
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
-from src.database.connection import DatabaseManager
-from src.analysis.sql_queries import FoodWastageAnalyzer
-from config.settings import STREAMLIT_CONFIG
+from src.database.query_builder import provider_query, receiver_query, food_listing_query, claim_query
+from src.database.search_index import SearchIndex
+from src.database.inspector import DatabaseInspector
+from src.database.backup import get_backup_manager, BACKUP_FREQUENCIES, format_age
+from src.database.expiry import get_expiry_sweeper
+from src.database.write_queue import get_write_queue
+from src.streamlit_app.utils.data_cache import CachedDataAccess, get_claims_service
+from config.settings import STREAMLIT_CONFIG, WRITE_QUEUE
+
+HEADER_QUERY = 'query_15_comprehensive_system_metrics'
+
+# Analyzer queries each page runs besides the header's, fetched together before rendering
+PAGE_QUERIES = {
+    'dashboard': ['query_9_successful_providers', 'query_10_claim_status_distribution',
+                  'query_7_common_food_types', 'query_14_geographic_food_distribution'],
+    'analytics': ['query_7_common_food_types', 'query_9_successful_providers', 'query_14_geographic_food_distribution'],
+    'geographic': ['query_14_geographic_food_distribution']
+}
 
 # Page configuration
 st.set_page_config(
@@ -406,8 +423,15 @@ class FoodManagementApp:
     """Enhanced Streamlit Application Class with Full Functionality"""
     
     def __init__(self):
-        self.db = DatabaseManager()
-        self.analyzer = FoodWastageAnalyzer()
+        # Shared across sessions; render methods read through the cached facade
+        self.data = CachedDataAccess()
+        self.db = self.data.db
+        self.analyzer = self.data.analyzer
+        self.search_index = SearchIndex(self.db)
+        # Marks expired listings unavailable in the background and tracks those expiring soon
+        self.expiry_sweeper = get_expiry_sweeper(self.db)
+        self.writer = get_write_queue(self.db)
+        self.claims = get_claims_service()
         self.initialize_session_state()
         self.setup_animations()
     
@@ -429,6 +453,8 @@ class FoodManagementApp:
             st.session_state.selected_claim_id = None
         if 'show_add_form' not in st.session_state:
             st.session_state.show_add_form = False
+        if 'page_cursors' not in st.session_state:
+            st.session_state.page_cursors = {}
     
     def setup_animations(self):
         """Setup page animations and transitions"""
@@ -457,6 +483,60 @@ class FoodManagementApp:
                 st.error(f"❌ Database error: {e}")
                 st.stop()
     
+    def current_page_cursor(self, page_key, signature):
+        """Keyset cursor of the page being viewed; back to page 1 when the filters change"""
+        pages = st.session_state.page_cursors.get(page_key)
+        if pages is None or pages['signature'] != signature:
+            pages = {'signature': signature, 'cursors': [None]}
+            st.session_state.page_cursors[page_key] = pages
+        return pages['cursors'][-1]
+    
+    def render_page_controls(self, page_key, next_cursor):
+        """Previous/next buttons walking the keyset cursors kept in session state"""
+        pages = st.session_state.page_cursors[page_key]
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("⬅️ Previous", key=f"{page_key}_prev", disabled=len(pages['cursors']) == 1, use_container_width=True):
+                pages['cursors'].pop()
+                st.rerun()
+        with col2:
+            st.markdown(f"<p style='text-align: center; color: #6c757d;'>Page {len(pages['cursors'])}</p>", unsafe_allow_html=True)
+        with col3:
+            if st.button("Next ➡️", key=f"{page_key}_next", disabled=next_cursor is None, use_container_width=True):
+                pages['cursors'].append(next_cursor)
+                st.rerun()
+    
+    def request_key(self, form_name):
+        """Idempotency key for one submission of a form (stable across reruns until reset)"""
+        return st.session_state.setdefault(f'{form_name}_request_key', uuid.uuid4().hex)
+    
+    def reset_request_key(self, form_name):
+        """Start a new submission for a form (after the previous one went through)"""
+        st.session_state.pop(f'{form_name}_request_key', None)
+    
+    def wait_for_write(self, future):
+        """Wait for a queued write to commit; returns its result, or None after showing the error"""
+        try:
+            return future.result(WRITE_QUEUE['result_timeout'])
+        except TimeoutError:
+            st.error("❌ The database is busy; please try again")
+        except Exception as e:
+            st.error(f"❌ Could not save: {e}")
+        return None
+    
+    def select_claim_food(self, food_id, food_name, version):
+        """Open the claim form for a listing card (on_click, so version is the one the card showed)"""
+        st.session_state.claim_food = {'food_id': food_id, 'food_name': food_name, 'version': version}
+        self.reset_request_key('claim_food')
+    
+    def show_claim_result(self, result, message):
+        """Report the outcome of a ClaimsService call"""
+        if result['success']:
+            st.success(f"✅ {message}" + (" (already done)" if result['replayed'] else ""))
+        else:
+            st.error(f"❌ {result['error']}")
+        return result['success']
+    
     def render_sidebar(self):
         """Render enhanced sidebar with better navigation"""
         # Logo and branding
@@ -506,10 +586,12 @@ class FoodManagementApp:
             # Animated metrics
             col1, col2 = st.sidebar.columns(2)
             
-            total_providers = self.db.get_row_count('providers')
-            total_receivers = self.db.get_row_count('receivers')
-            total_food_items = self.db.get_row_count('food_listings')
-            total_claims = self.db.get_row_count('claims')
+            # All counts from one cached read of the maintained counters
+            stats = self.data.sidebar_stats()
+            total_providers = stats['providers']
+            total_receivers = stats['receivers']
+            total_food_items = stats['food_listings']
+            total_claims = stats['claims']
             
             with col1:
                 st.metric("Providers", f"{total_providers:,}", "↑ 12%")
@@ -540,6 +622,7 @@ class FoodManagementApp:
         with col1:
             if st.button("🔄 Refresh", use_container_width=True):
                 st.session_state.last_refresh = datetime.now()
+                self.data.clear()
                 st.balloons()
                 st.rerun()
         
@@ -568,7 +651,7 @@ class FoodManagementApp:
         col1, col2, col3, col4, col5 = st.columns(5)
         
         try:
-            system_metrics = self.analyzer.query_15_comprehensive_system_metrics()
+            system_metrics = self.data.run_query(HEADER_QUERY)
             
             if system_metrics is not None and not system_metrics.empty:
                 metrics_dict = {}
@@ -681,7 +764,7 @@ class FoodManagementApp:
                     # Enhanced provider performance chart
                     st.markdown('<h3 class="section-header">🏆 Top Performing Providers</h3>', unsafe_allow_html=True)
                     
-                    top_providers = self.analyzer.query_9_successful_providers()
+                    top_providers = self.data.run_query('query_9_successful_providers')
                     if top_providers is not None and not top_providers.empty:
                         top_5 = top_providers.head(5)
                         
@@ -722,7 +805,7 @@ class FoodManagementApp:
                     # Enhanced claim status pie chart
                     st.markdown('<h3 class="section-header">📋 Claim Status Distribution</h3>', unsafe_allow_html=True)
                     
-                    claim_status = self.analyzer.query_10_claim_status_distribution()
+                    claim_status = self.data.run_query('query_10_claim_status_distribution')
                     if claim_status is not None and not claim_status.empty:
                         status_data = claim_status[claim_status['status'] != 'TOTAL']
                         
@@ -766,7 +849,7 @@ class FoodManagementApp:
                 # Food type distribution with enhanced visualization
                 st.markdown('<h3 class="section-header">🥗 Food Distribution by Type</h3>', unsafe_allow_html=True)
                 
-                food_types = self.analyzer.query_7_common_food_types()
+                food_types = self.data.run_query('query_7_common_food_types')
                 if food_types is not None and not food_types.empty:
                     # Create sunburst chart for better visualization
                     fig = go.Figure(go.Sunburst(
@@ -830,7 +913,7 @@ class FoodManagementApp:
             # Geographic visualization placeholder
             st.markdown('<h3 class="section-header">🗺️ Geographic Distribution</h3>', unsafe_allow_html=True)
             
-            geo_data = self.analyzer.query_14_geographic_food_distribution()
+            geo_data = self.data.run_query('query_14_geographic_food_distribution')
             if geo_data is not None and not geo_data.empty:
                 # Create map visualization
                 fig = px.scatter_mapbox(
@@ -912,12 +995,23 @@ class FoodManagementApp:
         """Render enhanced providers management page"""
         st.markdown('<h2 class="section-header">🏢 Food Providers Management</h2>', unsafe_allow_html=True)
         
+        # The page's independent lookups run at once
+        try:
+            lookups = self.data.gather(
+                total_providers=partial(self.data.row_count, 'providers'),
+                cities=partial(self.data.fetch_dataframe, "SELECT DISTINCT city FROM providers ORDER BY city"),
+                provider_types=partial(self.data.fetch_dataframe, "SELECT DISTINCT type FROM providers ORDER BY type")
+            )
+        except Exception as e:
+            st.error(f"Error loading providers: {e}")
+            lookups = {}
+        
         # Quick stats
         col1, col2, col3, col4 = st.columns(4)
         
         try:
             # Get provider statistics
-            total_providers = self.db.get_row_count('providers')
+            total_providers = lookups['total_providers']
             
             with col1:
                 st.info(f"**Total Providers:** {total_providers}")
@@ -930,6 +1024,27 @@ class FoodManagementApp:
         except:
             pass
         
+        with st.expander("➕ Register Provider"):
+            with st.form("register_provider_form", clear_on_submit=True):
+                col1, col2 = st.columns(2)
+                with col1:
+                    name = st.text_input("Name*")
+                    provider_type = st.selectbox("Type*", ["Restaurant", "Grocery Store", "Supermarket", "Catering Service"])
+                    contact = st.text_input("Contact*")
+                with col2:
+                    city = st.text_input("City*")
+                    address = st.text_area("Address*")
+                
+                if st.form_submit_button("✅ Register Provider", use_container_width=True):
+                    if not all(value.strip() for value in [name, contact, city, address]):
+                        st.error("❌ Please fill in all required fields")
+                    else:
+                        provider_id = self.wait_for_write(self.writer.register_provider(
+                            name.strip(), provider_type, address.strip(), city.strip(), contact.strip()
+                        ))
+                        if provider_id:
+                            st.success(f"✅ Provider #{provider_id} registered")
+        
         # Enhanced filters
         st.markdown('<div class="filter-container">', unsafe_allow_html=True)
         st.markdown("### 🔍 Search & Filter Providers")
@@ -937,8 +1052,8 @@ class FoodManagementApp:
         col1, col2, col3, col4 = st.columns(4)
         
         try:
-            cities = self.db.fetch_dataframe("SELECT DISTINCT city FROM providers ORDER BY city")
-            provider_types = self.db.fetch_dataframe("SELECT DISTINCT type FROM providers ORDER BY type")
+            cities = lookups.get('cities')
+            provider_types = lookups.get('provider_types')
             
             with col1:
                 search_term = st.text_input("🔎 Search by name", placeholder="Enter provider name...")
@@ -963,45 +1078,30 @@ class FoodManagementApp:
         
             st.markdown('</div>', unsafe_allow_html=True)
             
-            # Build and execute query
-            base_query = """
-            SELECT 
-                p.provider_id,
-                p.name,
-                p.type,
-                p.city,
-                p.address,
-                p.contact,
-                COUNT(f.food_id) as total_food_items,
-                COALESCE(SUM(f.quantity), 0) as total_quantity,
-                COUNT(c.claim_id) as total_claims,
-                COUNT(CASE WHEN c.status = 'Completed' THEN 1 END) as successful_claims
-            FROM providers p
-            LEFT JOIN food_listings f ON p.provider_id = f.provider_id
-            LEFT JOIN claims c ON f.food_id = c.food_id
-            """
-            
-            conditions = []
-            if search_term:
-                conditions.append(f"p.name LIKE '%{search_term}%'")
-            if selected_city != "All Cities":
-                conditions.append(f"p.city = '{selected_city}'")
-            if selected_type != "All Types":
-                conditions.append(f"p.type = '{selected_type}'")
-            
-            if conditions:
-                base_query += " WHERE " + " AND ".join(conditions)
-            
-            base_query += """
-            GROUP BY p.provider_id, p.name, p.type, p.city, p.address, p.contact
-            ORDER BY total_quantity DESC
-            """
-            
-            providers_data = self.db.fetch_dataframe(base_query)
+            # Build and execute a parameterized query (same SQL text for every search term)
+            query = (
+                provider_query()
+                .where_equals("p.city", None if selected_city == "All Cities" else selected_city)
+                .where_equals("p.type", None if selected_type == "All Types" else selected_type)
+            )
+            # Prefix search over name, address and city through the FTS index
+            self.search_index.filter_query(query, 'providers', "p.provider_id", search_term, "p.name")
+            filtered_sql, filtered_params = query.build_filtered()
+            cursor = self.current_page_cursor('providers', (filtered_sql, tuple(filtered_params)))
+            # The count and the visible page (ordered by total quantity) are fetched at once
+            results = self.data.gather(
+                total_found=partial(self.data.fetch_dataframe, *query.build_count()),
+                page=partial(
+                    self.data.fetch_page, filtered_sql, ('total_quantity', 'provider_id'), filtered_params,
+                    after=cursor, page_size=12, descending=True
+                )
+            )
+            total_found = results['total_found']
+            providers_data, next_cursor = results['page']
             
             if providers_data is not None and not providers_data.empty:
                 # Display providers in cards
-                st.markdown(f'<h3 class="section-header">Found {len(providers_data)} Providers</h3>', unsafe_allow_html=True)
+                st.markdown(f'<h3 class="section-header">Found {int(total_found["total"].iloc[0])} Providers</h3>', unsafe_allow_html=True)
                 
                 # Toggle view mode
                 view_mode = st.radio("View Mode", ["Card View", "Table View"], horizontal=True)
@@ -1060,6 +1160,8 @@ class FoodManagementApp:
                             ),
                         }
                     )
+                
+                self.render_page_controls('providers', next_cursor)
             else:
                 st.info("No providers found with the selected filters.")
                 
@@ -1070,11 +1172,22 @@ class FoodManagementApp:
         """Render enhanced receivers management page"""
         st.markdown('<h2 class="section-header">👥 Food Receivers Management</h2>', unsafe_allow_html=True)
         
+        # The page's independent lookups run at once
+        try:
+            lookups = self.data.gather(
+                total_receivers=partial(self.data.row_count, 'receivers'),
+                cities=partial(self.data.fetch_dataframe, "SELECT DISTINCT city FROM receivers ORDER BY city"),
+                receiver_types=partial(self.data.fetch_dataframe, "SELECT DISTINCT type FROM receivers ORDER BY type")
+            )
+        except Exception as e:
+            st.error(f"Error loading receivers: {e}")
+            lookups = {}
+        
         # Interactive metrics
         col1, col2, col3, col4 = st.columns(4)
         
         try:
-            total_receivers = self.db.get_row_count('receivers')
+            total_receivers = lookups['total_receivers']
             
             with col1:
                 st.info(f"**Total Receivers:** {total_receivers}")
@@ -1087,6 +1200,26 @@ class FoodManagementApp:
         except:
             pass
         
+        with st.expander("👤 Register Receiver"):
+            with st.form("register_receiver_form", clear_on_submit=True):
+                col1, col2 = st.columns(2)
+                with col1:
+                    name = st.text_input("Name*")
+                    receiver_type = st.selectbox("Type*", ["Ngo", "Charity", "Shelter", "Individual"])
+                with col2:
+                    city = st.text_input("City*")
+                    contact = st.text_input("Contact*")
+                
+                if st.form_submit_button("✅ Register Receiver", use_container_width=True):
+                    if not all(value.strip() for value in [name, city, contact]):
+                        st.error("❌ Please fill in all required fields")
+                    else:
+                        receiver_id = self.wait_for_write(self.writer.register_receiver(
+                            name.strip(), receiver_type, city.strip(), contact.strip()
+                        ))
+                        if receiver_id:
+                            st.success(f"✅ Receiver #{receiver_id} registered")
+        
         # Enhanced filters with search
         st.markdown('<div class="filter-container">', unsafe_allow_html=True)
         st.markdown("### 🔍 Find Receivers")
@@ -1094,8 +1227,8 @@ class FoodManagementApp:
         col1, col2, col3, col4 = st.columns(4)
         
         try:
-            cities = self.db.fetch_dataframe("SELECT DISTINCT city FROM receivers ORDER BY city")
-            receiver_types = self.db.fetch_dataframe("SELECT DISTINCT type FROM receivers ORDER BY type")
+            cities = lookups.get('cities')
+            receiver_types = lookups.get('receiver_types')
             
             with col1:
                 search_receiver = st.text_input("🔎 Search", placeholder="Enter receiver name...")
@@ -1117,27 +1250,23 @@ class FoodManagementApp:
         
             st.markdown('</div>', unsafe_allow_html=True)
             
-            # Get and display receiver data
-            top_receivers = self.analyzer.query_4_top_food_claimers()
+            # Get and display receiver data, filtered in SQL before taking the top 20
+            query = (
+                receiver_query()
+                .where_equals("r.city", None if selected_city == "All Cities" else selected_city)
+                .where_equals("r.type", None if selected_type == "All Types" else selected_type)
+                .having("total_claims >= ?", max(min_claims, 1))
+                .paginate(page=1, page_size=20)
+            )
+            self.search_index.filter_query(query, 'receivers', "r.receiver_id", search_receiver, "r.name")
+            filtered_data = self.data.fetch_dataframe(*query.build())
             
-            if top_receivers is not None and not top_receivers.empty:
-                # Apply filters
-                filtered_data = top_receivers.copy()
-                
-                if search_receiver:
-                    filtered_data = filtered_data[filtered_data['receiver_name'].str.contains(search_receiver, case=False)]
-                if selected_city != "All Cities":
-                    filtered_data = filtered_data[filtered_data['city'] == selected_city]
-                if selected_type != "All Types":
-                    filtered_data = filtered_data[filtered_data['receiver_type'] == selected_type]
-                if min_claims > 0:
-                    filtered_data = filtered_data[filtered_data['total_claims'] >= min_claims]
-                
+            if filtered_data is not None:
                 if not filtered_data.empty:
                     st.markdown(f'<h3 class="section-header">Active Receivers ({len(filtered_data)} found)</h3>', unsafe_allow_html=True)
                     
                     # Interactive visualization
-                    tab1, tab2, tab3 = st.tabs(["📊 Grid View", "📈 Analytics", "🗺️ Map View"])
+                    tab1, tab2, tab3, tab4 = st.tabs(["📊 Grid View", "📈 Analytics", "🗺️ Map View", "🎯 Matched Food"])
                     
                     with tab1:
                         # Grid view with cards
@@ -1212,6 +1341,9 @@ class FoodManagementApp:
                     with tab3:
                         # Map placeholder
                         st.info("🗺️ Interactive map view coming soon! This will show receiver locations and distribution networks.")
+                    
+                    with tab4:
+                        self.render_receiver_matches(filtered_data)
                 else:
                     st.info("No receivers found with the selected filters.")
             else:
@@ -1220,6 +1352,42 @@ class FoodManagementApp:
         except Exception as e:
             st.error(f"Error loading receivers: {e}")
     
+    def render_receiver_matches(self, receivers):
+        """Best open listings for the receivers shown, ranked by the matching engine"""
+        names = dict(zip(receivers['receiver_id'], receivers['receiver_name']))
+        selected = st.selectbox(
+            "Receiver",
+            list(names),
+            format_func=lambda receiver_id: f"{names[receiver_id]} (#{receiver_id})"
+        )
+        matches = self.data.recommendations([selected])
+        
+        if matches is None:
+            st.error("❌ Could not load food matches")
+        elif matches.empty:
+            st.info("No open food listings to match right now.")
+        else:
+            if not matches['city_match'].any():
+                st.caption("No open listings in this receiver's city; showing the soonest-expiring listings elsewhere.")
+            st.dataframe(
+                matches[['rank', 'food_name', 'food_type', 'meal_type', 'quantity', 'days_to_expiry', 'location', 'provider_name', 'provider_contact', 'score']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "days_to_expiry": st.column_config.NumberColumn(
+                        "Days to Expiry",
+                        format="%d days",
+                    ),
+                    "score": st.column_config.ProgressColumn(
+                        "Match",
+                        help="City, preference, quantity and urgency combined",
+                        format="%.2f",
+                        min_value=0,
+                        max_value=1,
+                    ),
+                }
+            )
+    
     def render_food_listings_page(self):
         """Fully functional food listings page"""
         st.markdown('<h2 class="section-header">🍽️ Food Listings Management</h2>', unsafe_allow_html=True)
@@ -1245,12 +1413,12 @@ class FoodManagementApp:
                     
                     with col1:
                         food_name = st.text_input("Food Name*")
-                        food_type = st.selectbox("Food Type*", ["Vegetables", "Fruits", "Grains", "Dairy", "Meat", "Prepared Food", "Beverages", "Other"])
+                        food_type = st.selectbox("Food Type*", ["Vegetarian", "Non-Vegetarian", "Vegan"])
+                        meal_type = st.selectbox("Meal Type*", ["Breakfast", "Lunch", "Dinner", "Snacks"])
                         quantity = st.number_input("Quantity*", min_value=1)
-                        unit = st.selectbox("Unit", ["kg", "liters", "portions", "boxes", "units"])
                     
                     with col2:
-                        provider_id = st.selectbox("Provider*", [1, 2, 3, 4, 5])  # Replace with actual provider list
+                        provider_id = st.number_input("Provider ID*", min_value=1, step=1)
                         expiry_date = st.date_input("Expiry Date*", min_value=date.today())
                         pickup_time = st.time_input("Pickup Time")
                         special_notes = st.text_area("Special Notes")
@@ -1258,8 +1426,39 @@ class FoodManagementApp:
                     submitted = st.form_submit_button("✅ Add Food Listing", use_container_width=True)
                     
                     if submitted:
-                        st.success("✅ Food listing added successfully!")
-                        st.session_state.show_add_form = False
+                        if not food_name.strip():
+                            st.error("❌ Food name is required")
+                        else:
+                            # Location and provider type are taken from the provider
+                            food_id = self.wait_for_write(self.writer.add_food_listing(
+                                food_name.strip(), quantity, expiry_date, provider_id, food_type, meal_type
+                            ))
+                            if food_id:
+                                self.expiry_sweeper.add(food_id, expiry_date)
+                                st.success(f"✅ Food listing #{food_id} added successfully!")
+                                st.session_state.show_add_form = False
+        
+        # Claim form for the listing picked from a card
+        claim_food = st.session_state.get('claim_food')
+        if claim_food:
+            with st.expander(f"🙋 Claim {claim_food['food_name']} (#{claim_food['food_id']})", expanded=True):
+                with st.form("claim_food_form"):
+                    receiver_id = st.number_input("Receiver ID*", min_value=1, step=1)
+                    submit_col, cancel_col = st.columns(2)
+                    submitted = submit_col.form_submit_button("✅ Submit Claim", use_container_width=True)
+                    dismissed = cancel_col.form_submit_button("Close", use_container_width=True)
+                    
+                    if submitted:
+                        result = self.claims.submit_claim(
+                            claim_food['food_id'], receiver_id,
+                            idempotency_key=self.request_key('claim_food'),
+                            expected_version=claim_food['version']
+                        )
+                        if self.show_claim_result(result, f"Claim #{result.get('claim_id')} submitted"):
+                            self.reset_request_key('claim_food')
+                            st.session_state.claim_food = None
+                    elif dismissed:
+                        st.session_state.claim_food = None
                         st.rerun()
         
         # Search and filter section
@@ -1272,7 +1471,7 @@ class FoodManagementApp:
             search_food = st.text_input("🔎 Search", placeholder="Search food items...")
         
         with col2:
-            food_type_filter = st.selectbox("🍽️ Food Type", ["All Types", "Vegetables", "Fruits", "Grains", "Dairy", "Meat", "Prepared Food"])
+            food_type_filter = st.selectbox("🍽️ Food Type", ["All Types", "Vegetarian", "Non-Vegetarian", "Vegan"])
         
         with col3:
             status_filter = st.selectbox("📊 Status", ["All", "Available", "Reserved", "Claimed", "Expired"])
@@ -1282,47 +1481,43 @@ class FoodManagementApp:
         
         st.markdown('</div>', unsafe_allow_html=True)
         
-        # Get food listings data
+        # Get food listings data: filters run in SQL and only the visible page is fetched
         try:
-            food_query = """
-            SELECT 
-                f.food_id,
-                f.name as food_name,
-                f.type as food_type,
-                f.quantity,
-                f.unit,
-                f.expiry_date,
-                f.status,
-                p.name as provider_name,
-                p.city,
-                p.contact as provider_contact
-            FROM food_listings f
-            JOIN providers p ON f.provider_id = p.provider_id
-            ORDER BY f.expiry_date ASC
-            """
-            
-            food_data = self.db.fetch_dataframe(food_query)
-            
-            if food_data is not None and not food_data.empty:
-                # Apply filters
-                if search_food:
-                    food_data = food_data[food_data['food_name'].str.contains(search_food, case=False)]
-                if food_type_filter != "All Types":
-                    food_data = food_data[food_data['food_type'] == food_type_filter]
-                
+            query = food_listing_query()
+            if food_type_filter != "All Types":
+                query.where_equals("f.food_type", food_type_filter)
+            if status_filter == "Available":
+                query.where("f.is_available = 1 AND f.expiry_date > date('now')")
+            elif status_filter == "Expired":
+                query.where("f.expiry_date <= date('now')")
+            elif status_filter == "Reserved":
+                query.where("EXISTS (SELECT 1 FROM claims c WHERE c.food_id = f.food_id AND c.status = 'Pending')")
+            elif status_filter == "Claimed":
+                query.where("EXISTS (SELECT 1 FROM claims c WHERE c.food_id = f.food_id AND c.status = 'Completed')")
+            self.search_index.filter_query(query, 'food_listings', "f.food_id", search_food, "f.food_name")
+            filtered_sql, filtered_params = query.build_filtered()
+            
+            overview = self.data.fetch_dataframe(*query.build_summary("""
+                COUNT(*) as total_items,
+                COUNT(CASE WHEN is_available AND expiry_date > date('now') THEN 1 END) as available_items,
+                COALESCE(SUM(quantity), 0) as total_quantity
+            """))
+            
+            if overview is not None and overview['total_items'].iloc[0] > 0:
                 # Statistics
                 st.markdown('<h3 class="section-header">📊 Food Inventory Overview</h3>', unsafe_allow_html=True)
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
-                total_items = len(food_data)
-                available_items = len(food_data[food_data['status'] == 'Available']) if 'status' in food_data.columns else 0
-                expiring_soon = len(food_data[food_data['expiry_date'] <= pd.Timestamp.now() + pd.Timedelta(days=2)]) if 'expiry_date' in food_data.columns else 0
-                total_quantity = food_data['quantity'].sum() if 'quantity' in food_data.columns else 0
+                total_items = int(overview['total_items'].iloc[0])
+                available_items = int(overview['available_items'].iloc[0])
+                # Published by the expiry sweeper, so no scan of food_listings
+                expiring_soon = len(self.expiry_sweeper.expiring_soon)
+                total_quantity = int(overview['total_quantity'].iloc[0])
                 
                 col1.metric("Total Listings", f"{total_items:,}")
                 col2.metric("Available Now", f"{available_items:,}")
-                col3.metric("Expiring Soon", f"{expiring_soon:,}", delta="Urgent")
+                col3.metric("Expiring Soon", f"{expiring_soon:,}", delta=f"within {self.expiry_sweeper.soon_days} days", delta_color="off")
                 col4.metric("Total Quantity", f"{total_quantity:,}")
                 
                 # Display food items
@@ -1331,10 +1526,18 @@ class FoodManagementApp:
                 # View toggle
                 view_mode = st.radio("Select View", ["Card View", "Table View", "Calendar View"], horizontal=True)
                 
+                if view_mode != "Calendar View":
+                    cursor = self.current_page_cursor('food_listings', (filtered_sql, tuple(filtered_params)))
+                    food_data, next_cursor = self.data.fetch_page(
+                        filtered_sql, ('expiry_date', 'food_id'), filtered_params, after=cursor, page_size=12
+                    )
+                    if food_data is None:
+                        food_data = pd.DataFrame()
+                
                 if view_mode == "Card View":
                     # Food cards
                     cols = st.columns(3)
-                    for idx, food in food_data.head(12).iterrows():
+                    for idx, food in food_data.iterrows():
                         with cols[idx % 3]:
                             # Determine expiry status
                             if pd.notna(food.get('expiry_date')):
@@ -1354,6 +1557,9 @@ class FoodManagementApp:
                             
                             # Get food icon based on type
                             food_icons = {
+                                "Vegetarian": "🥗",
+                                "Non-Vegetarian": "🍗",
+                                "Vegan": "🌱",
                                 "Vegetables": "🥬",
                                 "Fruits": "🍎",
                                 "Grains": "🌾",
@@ -1377,7 +1583,7 @@ class FoodManagementApp:
                                 <div style='font-size: 0.85rem;'>
                                     <div style='display: flex; justify-content: space-between; margin: 0.25rem 0;'>
                                         <span>📍 Location:</span>
-                                        <strong>{food.get('city', 'Unknown')}</strong>
+                                        <strong>{food.get('location', 'Unknown')}</strong>
                                     </div>
                                     <div style='display: flex; justify-content: space-between; margin: 0.25rem 0;'>
                                         <span>🏢 Provider:</span>
@@ -1389,11 +1595,18 @@ class FoodManagementApp:
                                     </div>
                                 </div>
                                 <div style='margin-top: 1rem; display: flex; gap: 0.5rem;'>
-                                    <a href='#claim-{food.get('food_id', 0)}' class='action-button' style='flex: 1; text-align: center;'>Claim</a>
                                     <a href='#details-{food.get('food_id', 0)}' class='action-button' style='flex: 1; text-align: center;'>Details</a>
                                 </div>
                             </div>
                             """, unsafe_allow_html=True)
+                            
+                            # The version on this card (read with the page) is checked when the claim is submitted
+                            st.button(
+                                "🙋 Claim", key=f"claim_{food['food_id']}", use_container_width=True,
+                                disabled=not food.get('is_available'),
+                                on_click=self.select_claim_food,
+                                args=(int(food['food_id']), food.get('food_name', 'Unknown'), int(food['version']))
+                            )
                 
                 elif view_mode == "Table View":
                     # Enhanced table view
@@ -1401,7 +1614,7 @@ class FoodManagementApp:
                     display_df['Days to Expiry'] = (pd.to_datetime(display_df['expiry_date']) - pd.Timestamp.now()).dt.days
                     
                     st.dataframe(
-                        display_df[['food_name', 'food_type', 'quantity', 'unit', 'Days to Expiry', 'provider_name', 'city', 'status']],
+                        display_df[['food_name', 'food_type', 'meal_type', 'quantity', 'Days to Expiry', 'provider_name', 'location', 'is_available']],
                         use_container_width=True,
                         column_config={
                             "Days to Expiry": st.column_config.NumberColumn(
@@ -1419,9 +1632,14 @@ class FoodManagementApp:
                 else:  # Calendar View
                     st.info("📅 Calendar view showing food availability by date")
                     # Simple calendar representation
-                    calendar_data = food_data.groupby('expiry_date').size().reset_index(name='count')
+                    calendar_data = self.data.fetch_dataframe(
+                        *query.build_summary("expiry_date, COUNT(*) as count", group_by="expiry_date")
+                    )
                     fig = px.bar(calendar_data, x='expiry_date', y='count', title="Food Items by Expiry Date")
                     st.plotly_chart(fig, use_container_width=True)
+                
+                if view_mode != "Calendar View":
+                    self.render_page_controls('food_listings', next_cursor)
             
             else:
                 st.info("No food listings available. Click 'Add New Listing' to get started!")
@@ -1452,7 +1670,7 @@ class FoodManagementApp:
             
             try:
                 # Get comprehensive metrics
-                metrics = self.analyzer.query_15_comprehensive_system_metrics()
+                metrics = self.data.run_query('query_15_comprehensive_system_metrics')
                 
                 if metrics is not None and not metrics.empty:
                     # Display key metrics in cards
@@ -1500,7 +1718,7 @@ class FoodManagementApp:
             
             with col1:
                 # Food type distribution
-                food_types = self.analyzer.query_7_common_food_types()
+                food_types = self.data.run_query('query_7_common_food_types')
                 if food_types is not None and not food_types.empty:
                     fig = px.treemap(
                         food_types,
@@ -1575,7 +1793,7 @@ class FoodManagementApp:
             
             with col1:
                 # Top performers
-                top_providers = self.analyzer.query_9_successful_providers()
+                top_providers = self.data.run_query('query_9_successful_providers')
                 if top_providers is not None and not top_providers.empty:
                     fig = px.funnel(
                         top_providers.head(8),
@@ -1648,7 +1866,7 @@ class FoodManagementApp:
                 """, unsafe_allow_html=True)
             
             # Success rate by city
-            geo_data = self.analyzer.query_14_geographic_food_distribution()
+            geo_data = self.data.run_query('query_14_geographic_food_distribution')
             if geo_data is not None and not geo_data.empty:
                 fig = px.bar(
                     geo_data.head(10),
@@ -1735,7 +1953,7 @@ class FoodManagementApp:
         col1, col2, col3, col4 = st.columns(4)
         
         try:
-            total_claims = self.db.get_row_count('claims')
+            total_claims = self.data.row_count('claims')
             
             col1.metric("Total Claims", f"{total_claims:,}")
             col2.metric("Pending", f"{int(total_claims * 0.2):,}", delta="5 new")
@@ -1766,9 +1984,8 @@ class FoodManagementApp:
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        receiver_id = st.selectbox("Receiver", [1, 2, 3, 4, 5])
-                        food_id = st.selectbox("Food Item", [1, 2, 3, 4, 5])
-                        quantity_claimed = st.number_input("Quantity", min_value=1)
+                        receiver_id = st.number_input("Receiver ID*", min_value=1, step=1)
+                        food_id = st.number_input("Food ID*", min_value=1, step=1)
                     
                     with col2:
                         pickup_date = st.date_input("Pickup Date", min_value=date.today())
@@ -1776,9 +1993,12 @@ class FoodManagementApp:
                         notes = st.text_area("Additional Notes")
                     
                     if st.form_submit_button("Submit Claim", use_container_width=True):
-                        st.success("✅ Claim submitted successfully!")
-                        st.session_state.show_claim_form = False
-                        st.rerun()
+                        result = self.claims.submit_claim(
+                            food_id, receiver_id, idempotency_key=self.request_key('new_claim')
+                        )
+                        if self.show_claim_result(result, f"Claim #{result.get('claim_id')} submitted"):
+                            self.reset_request_key('new_claim')
+                            st.session_state.show_claim_form = False
         
         # Claims table with filters
         st.markdown('<div class="filter-container">', unsafe_allow_html=True)
@@ -1802,30 +2022,24 @@ class FoodManagementApp:
         
         # Display claims
         try:
-            claims_query = """
-            SELECT 
-                c.claim_id,
-                c.claim_date,
-                c.status,
-                r.name as receiver_name,
-                f.name as food_name,
-                f.quantity as quantity_available,
-                c.quantity_claimed,
-                p.name as provider_name
-            FROM claims c
-            JOIN receivers r ON c.receiver_id = r.receiver_id
-            JOIN food_listings f ON c.food_id = f.food_id
-            JOIN providers p ON f.provider_id = p.provider_id
-            ORDER BY c.claim_date DESC
-            """
-            
-            claims_data = self.db.fetch_dataframe(claims_query)
+            query = claim_query()
+            if claim_status != "All":
+                query.where_equals("c.status", claim_status)
+            query.where_like("r.name", receiver_filter)
+            query.where_like("p.name", provider_filter)
+            filtered_sql, filtered_params = query.build_filtered()
+            cursor = self.current_page_cursor('claims', (filtered_sql, tuple(filtered_params)))
+            # Newest first; only the visible page is fetched
+            claims_data, next_cursor = self.data.fetch_page(
+                filtered_sql, ('timestamp', 'claim_id'), filtered_params,
+                after=cursor, page_size=10, descending=True
+            )
             
             if claims_data is not None and not claims_data.empty:
                 st.markdown('<h3 class="section-header">📋 Recent Claims</h3>', unsafe_allow_html=True)
                 
                 # Display claims as cards
-                for _, claim in claims_data.head(10).iterrows():
+                for _, claim in claims_data.iterrows():
                     status_class = {
                         'Pending': 'status-pending',
                         'Approved': 'status-approved',
@@ -1852,19 +2066,39 @@ class FoodManagementApp:
                             </div>
                             <div>
                                 <p style='color: #6c757d; margin: 0; font-size: 0.85rem;'>Quantity</p>
-                                <p style='font-weight: 600; margin: 0;'>{claim.get('quantity_claimed', 0)} units</p>
+                                <p style='font-weight: 600; margin: 0;'>{claim.get('quantity', 0)} units</p>
                             </div>
                             <div>
                                 <p style='color: #6c757d; margin: 0; font-size: 0.85rem;'>Date</p>
-                                <p style='font-weight: 600; margin: 0;'>{claim.get('claim_date', 'N/A')}</p>
+                                <p style='font-weight: 600; margin: 0;'>{claim.get('timestamp', 'N/A')}</p>
                             </div>
                         </div>
                         <div style='margin-top: 1rem; display: flex; gap: 0.5rem;'>
-                            <a href='#approve-{claim.get('claim_id', 0)}' class='action-button' style='flex: 1; text-align: center;'>Approve</a>
                             <a href='#details-{claim.get('claim_id', 0)}' class='action-button' style='flex: 1; text-align: center;'>View Details</a>
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
+                    
+                    if claim.get('status') == 'Pending':
+                        claim_id = int(claim['claim_id'])
+                        complete_col, cancel_col = st.columns(2)
+                        # One key per submission: a retry after an error replays, the next click gets a new key
+                        if complete_col.button("✅ Mark Collected", key=f"complete_{claim_id}", use_container_width=True):
+                            if self.show_claim_result(
+                                self.claims.complete_claim(claim_id, idempotency_key=self.request_key(f"complete_{claim_id}")),
+                                f"Claim #{claim_id} completed"
+                            ):
+                                self.reset_request_key(f"complete_{claim_id}")
+                                st.rerun()
+                        if cancel_col.button("✖️ Cancel Claim", key=f"cancel_{claim_id}", use_container_width=True):
+                            if self.show_claim_result(
+                                self.claims.cancel_claim(claim_id, idempotency_key=self.request_key(f"cancel_{claim_id}")),
+                                f"Claim #{claim_id} cancelled"
+                            ):
+                                self.reset_request_key(f"cancel_{claim_id}")
+                                st.rerun()
+                
+                self.render_page_controls('claims', next_cursor)
             else:
                 st.info("No claims found. Claims will appear here once food items are claimed.")
                 
@@ -1900,7 +2134,7 @@ class FoodManagementApp:
         
         # Main map
         try:
-            geo_data = self.analyzer.query_14_geographic_food_distribution()
+            geo_data = self.data.run_query('query_14_geographic_food_distribution')
             
             if geo_data is not None and not geo_data.empty:
                 # Create interactive map
@@ -2043,9 +2277,9 @@ class FoodManagementApp:
             return
         
         # Admin tabs
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
             "🏠 Overview", "👥 User Management", "⚙️ Settings", 
-            "📊 Reports", "🔒 Security", "🗄️ Database"
+            "📊 Reports", "🔒 Security", "🗄️ Database", "⏱️ Performance"
         ])
         
         with tab1:
@@ -2328,12 +2562,31 @@ class FoodManagementApp:
             st.markdown('<h3 class="section-header">Database Management</h3>', unsafe_allow_html=True)
             
             # Database stats
+            db_stats = self.data.database_stats()
+            backups = get_backup_manager(self.db)
+            last_backup = backups.last_backup()
+            overview = db_stats['overview'] if db_stats else None
+            objects = pd.DataFrame(db_stats['objects']) if db_stats else pd.DataFrame()
+            
             db_col1, db_col2, db_col3, db_col4 = st.columns(4)
             
-            db_col1.metric("Database Size", "2.4 GB")
-            db_col2.metric("Tables", "12")
-            db_col3.metric("Total Records", "145,678")
-            db_col4.metric("Last Backup", "2 hours ago")
+            if overview:
+                db_col1.metric("Database Size", f"{(overview['file_bytes'] + overview['wal_bytes']) / 1024 / 1024:.1f} MB")
+                db_col2.metric("Tables", f"{overview['tables']} ({overview['indexes']} indexes)")
+                total_records = int(objects.loc[objects['type'] == 'table', 'rows'].fillna(0).sum()) if not objects.empty else 0
+                db_col3.metric("Total Records", f"{total_records:,}")
+                st.caption(
+                    f"{overview['page_count']:,} pages of {overview['page_size']:,} bytes · "
+                    f"{overview['freelist_count']:,} free ({overview['free_bytes'] / 1024 / 1024:.1f} MB, {overview['free_percentage']:.1f}%) · "
+                    f"WAL {overview['wal_bytes'] / 1024 / 1024:.1f} MB · auto_vacuum {overview['auto_vacuum']} · "
+                    f"{'analyzed' if overview['analyzed'] else 'not analyzed'} · SQLite {overview['sqlite_version']}"
+                )
+            else:
+                st.error("❌ Could not read database statistics")
+            db_col4.metric(
+                "Last Backup",
+                format_age((datetime.now() - last_backup['created']).total_seconds()) if last_backup else "Never"
+            )
             
             # Database actions
             st.markdown("#### Database Operations")
@@ -2342,15 +2595,15 @@ class FoodManagementApp:
             
             with ops_col1:
                 if st.button("🔄 Backup Now", use_container_width=True):
-                    with st.spinner("Creating backup..."):
-                        time.sleep(2)
-                        st.success("✅ Backup completed successfully!")
+                    if backups.start_backup():
+                        st.success("✅ Backup started in the background")
+                    else:
+                        st.warning("A backup is already running")
             
             with ops_col2:
                 if st.button("🔧 Optimize", use_container_width=True):
                     with st.spinner("Optimizing database..."):
-                        time.sleep(2)
-                        st.success("✅ Database optimized!")
+                        st.session_state.last_optimize = DatabaseInspector(self.db).optimize()
             
             with ops_col3:
                 if st.button("🗑️ Clean Up", use_container_width=True):
@@ -2358,56 +2611,251 @@ class FoodManagementApp:
             
             with ops_col4:
                 if st.button("📊 Statistics", use_container_width=True):
-                    st.info("Generating database statistics...")
+                    # Re-read the statistics now rather than at the next data change
+                    self.data.clear()
+                    st.rerun()
+            
+            if backups.status['running'] and hasattr(st, 'fragment'):
+                st.fragment(run_every=1)(self.render_backup_status)(backups)
+            else:
+                self.render_backup_status(backups)
+            
+            if st.session_state.get('last_optimize'):
+                self.render_optimize_report(st.session_state.last_optimize)
             
             # Table information
             st.markdown("#### Table Information")
             
-            table_data = pd.DataFrame({
-                'Table Name': ['providers', 'receivers', 'food_listings', 'claims', 'users'],
-                'Records': [234, 567, 1234, 3456, 145],
-                'Size (MB)': [12.5, 34.2, 156.8, 234.5, 8.9],
-                'Last Modified': pd.date_range(end=datetime.now(), periods=5, freq='H')
-            })
-            
-            st.dataframe(
-                table_data,
-                use_container_width=True,
-                column_config={
-                    "Records": st.column_config.NumberColumn(
-                        "Records",
-                        format="%d",
-                    ),
-                    "Size (MB)": st.column_config.ProgressColumn(
-                        "Size (MB)",
-                        help="Table size in MB",
-                        min_value=0,
-                        max_value=500,
-                    ),
-                }
-            )
+            if objects.empty:
+                st.info("Per-table statistics are unavailable (this SQLite build has no dbstat).")
+            else:
+                table_data = objects.assign(
+                    size_mb=objects['bytes'] / 1024 / 1024
+                )[['name', 'type', 'table', 'rows', 'pages', 'size_mb', 'fill_percentage', 'fragmentation_percentage']]
+                table_data.columns = ['Name', 'Type', 'Table', 'Records', 'Pages', 'Size (MB)', 'Fill %', 'Fragmentation %']
+                
+                st.dataframe(
+                    table_data,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Records": st.column_config.NumberColumn(
+                            "Records",
+                            format="%d",
+                        ),
+                        "Size (MB)": st.column_config.ProgressColumn(
+                            "Size (MB)",
+                            help="Table or index size in MB",
+                            format="%.2f",
+                            min_value=0,
+                            max_value=float(table_data['Size (MB)'].max()),
+                        ),
+                        "Fill %": st.column_config.NumberColumn(
+                            "Fill %",
+                            help="Share of the object's pages holding data",
+                            format="%.1f",
+                        ),
+                        "Fragmentation %": st.column_config.NumberColumn(
+                            "Fragmentation %",
+                            help="Pages not stored right after the previous page of the same table or index",
+                            format="%.1f",
+                        ),
+                    }
+                )
             
             # Backup schedule
             st.markdown("#### Backup Schedule")
             
+            backup_settings = backups.load_settings()
+            frequencies = list(BACKUP_FREQUENCIES)
+            
             backup_schedule = st.selectbox(
                 "Automatic Backup Frequency",
-                ["Every 6 hours", "Daily", "Weekly", "Monthly"]
+                frequencies,
+                index=frequencies.index(backup_settings['frequency']) if backup_settings['frequency'] in frequencies else 1
             )
             
             backup_retention = st.slider(
                 "Backup Retention (days)",
-                7, 90, 30
+                7, 90, int(backup_settings['retention_days'])
             )
             
             if st.button("💾 Save Backup Settings", use_container_width=True):
-                st.success("✅ Backup settings updated!")
+                if backups.save_settings(backup_schedule, backup_retention):
+                    deleted = backups.apply_retention(backup_retention)
+                    st.success(f"✅ Backup settings updated!{f' {len(deleted)} expired backups deleted.' if deleted else ''}")
+                else:
+                    st.error("❌ Could not save backup settings")
+            
+            backup_list = backups.list_backups()
+            if backup_list:
+                st.dataframe(
+                    pd.DataFrame([
+                        {'Backup': backup['name'], 'Created': backup['created'], 'Size (MB)': round(backup['bytes'] / 1024 / 1024, 2)}
+                        for backup in backup_list
+                    ]),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("No backups yet.")
+        
+        with tab7:
+            st.markdown('<h3 class="section-header">Query Performance</h3>', unsafe_allow_html=True)
+            
+            live = st.checkbox("Live refresh (every 5 seconds)", value=False)
+            if live and hasattr(st, 'fragment'):
+                st.fragment(run_every=5)(self.render_performance_panel)()
+            else:
+                self.render_performance_panel()
+    
+    def render_backup_status(self, backups):
+        """Progress of a running backup, or the outcome of the last one"""
+        status = backups.status
+        if status['running']:
+            total = status['total_pages'] or 1
+            label = f"Backup {status['phase'] or 'starting'}: {status['copied_pages']:,} of {status['total_pages']:,} pages copied"
+            st.progress(min(status['copied_pages'] / total, 1.0), text=label)
+        elif status['last_error']:
+            st.error(f"❌ Last backup failed: {status['last_error']}")
+        elif status['last_result']:
+            result = status['last_result']
+            st.caption(
+                f"Last backup {result['name']}: {result['database_bytes'] / 1024 / 1024:.1f} MB compressed to "
+                f"{result['bytes'] / 1024 / 1024:.1f} MB in {result['total_seconds']:.1f}s "
+                f"(copy {result['copy_seconds']:.1f}s, check {result['verify_seconds']:.1f}s, compress {result['compress_seconds']:.1f}s)"
+            )
+    
+    def render_optimize_report(self, report):
+        """Step timings and before/after figures of the last Optimize run"""
+        if report is None:
+            st.error("❌ Optimization failed")
+            return
+        
+        before, after = report['before'], report['after']
+        st.success(f"✅ Database optimized in {sum(step['ms'] or 0 for step in report['steps']):,.0f} ms")
+        
+        opt_col1, opt_col2, opt_col3 = st.columns(3)
+        opt_col1.metric(
+            "File Size", f"{after['file_bytes'] / 1024 / 1024:.1f} MB",
+            f"{(after['file_bytes'] - before['file_bytes']) / 1024 / 1024:+.1f} MB", delta_color="inverse"
+        )
+        opt_col2.metric(
+            "Free Pages", f"{after['freelist_count']:,}",
+            f"{after['freelist_count'] - before['freelist_count']:+,}", delta_color="inverse"
+        )
+        opt_col3.metric(
+            "WAL Size", f"{after['wal_bytes'] / 1024 / 1024:.1f} MB",
+            f"{(after['wal_bytes'] - before['wal_bytes']) / 1024 / 1024:+.1f} MB", delta_color="inverse"
+        )
+        
+        steps_df = pd.DataFrame(report['steps']).rename(columns={'step': 'Step', 'ms': 'Time (ms)', 'note': 'Note'})
+        st.dataframe(steps_df, use_container_width=True, hide_index=True)
+        
+        if report['probes_before']:
+            probes_df = pd.DataFrame({
+                'Query': list(report['probes_before']),
+                'Before (ms)': list(report['probes_before'].values()),
+                'After (ms)': [report['probes_after'].get(name) for name in report['probes_before']]
+            })
+            st.markdown("##### Listing queries (first page)")
+            st.dataframe(probes_df, use_container_width=True, hide_index=True)
+        
+        if after['auto_vacuum'] != 'incremental':
+            st.info("ℹ️ This database was created without incremental auto-vacuum, so free pages stay in the file. "
+                    "Enabling it rewrites the whole file once.")
+            if st.button("Enable incremental vacuum"):
+                with st.spinner("Rebuilding database file..."):
+                    elapsed = DatabaseInspector(self.db).enable_incremental_vacuum()
+                if elapsed is None:
+                    st.error("❌ Could not enable incremental vacuum")
+                else:
+                    st.success(f"✅ Incremental vacuum enabled ({elapsed:,.0f} ms)")
+    
+    def render_performance_panel(self):
+        """Statement timings, rows and memory recorded by the database instrumentation"""
+        instrumentation = self.db.instrumentation
+        statements = pd.DataFrame(instrumentation.snapshot())
+        connections = instrumentation.connection_stats()
+        pool = self.db.get_pool_stats()
+        
+        perf_col1, perf_col2, perf_col3, perf_col4 = st.columns(4)
+        perf_col1.metric("Queries Recorded", f"{int(statements['calls'].sum()) if not statements.empty else 0:,}")
+        perf_col2.metric("Distinct Statements", f"{len(statements):,}")
+        perf_col3.metric("Connection Open p95", f"{connections['open']['p95_ms'] or 0:.2f} ms")
+        if pool:
+            perf_col4.metric("Pool In Use", f"{pool['in_use_connections']}/{pool['max_connections']}")
+        else:
+            perf_col4.metric("Connection Close p95", f"{connections['close']['p95_ms'] or 0:.2f} ms")
+        
+        st.caption(f"Recording since {datetime.fromtimestamp(instrumentation.since):%Y-%m-%d %H:%M:%S}")
+        
+        if statements.empty:
+            st.info("No queries recorded yet.")
+            return
+        
+        # Slowest statements by total time spent
+        display_df = statements[[
+            'statement', 'operations', 'calls', 'errors', 'total_ms', 'p50_ms', 'p95_ms', 'p99_ms',
+            'max_ms', 'avg_rows', 'avg_bytes'
+        ]].copy()
+        display_df['avg_kb'] = (display_df.pop('avg_bytes').fillna(0) / 1024).round(1)
+        st.dataframe(
+            display_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "statement": st.column_config.TextColumn("Statement", width="large"),
+                "total_ms": st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+                "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.2f"),
+                "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.2f"),
+                "p99_ms": st.column_config.NumberColumn("p99 (ms)", format="%.2f"),
+                "max_ms": st.column_config.NumberColumn("Max (ms)", format="%.2f"),
+                "avg_kb": st.column_config.NumberColumn("Avg DataFrame (KB)", format="%.1f"),
+            }
+        )
+        
+        # Latency distribution of one statement
+        selected = st.selectbox(
+            "Latency histogram for",
+            statements['statement'].tolist(),
+            format_func=lambda statement: statement[:120]
+        )
+        histogram = pd.DataFrame(instrumentation.histogram(selected), columns=['bucket', 'count'])
+        fig = px.bar(histogram, x='bucket', y='count', title="Executions by latency bucket")
+        fig.update_layout(height=300, xaxis_title="", yaxis_title="Executions")
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Statements over the slow-query threshold, with the page or query that ran them
+        slow_log = self.db.slow_query_log
+        if slow_log is not None and slow_log.recent:
+            st.markdown(f"#### 🐢 Recent Slow Queries (over {slow_log.threshold_ms:g} ms)")
+            for entry in list(slow_log.recent)[:20]:
+                with st.expander(f"{entry['elapsed_ms']:.0f} ms · {entry['caller']} · {datetime.fromtimestamp(entry['time']):%H:%M:%S}"):
+                    st.code(entry['sql'], language='sql')
+                    if entry['params']:
+                        st.caption(f"Params: {entry['params']}")
+                    if entry['plan']:
+                        st.code("\n".join(entry['plan']), language='text')
+            st.caption(f"Full log: {slow_log.path}")
+        
+        if st.button("🧹 Reset Statistics", key="reset_query_stats"):
+            instrumentation.reset()
+            st.rerun()
     
     def run(self):
         """Main application runner"""
         # Check database connection
         self.check_database_connection()
         
+        # Sidebar counts, header metrics and the page's analytics are fetched at once;
+        # rendering below then reads them from the cache
+        self.data.prefetch(
+            self.data.sidebar_stats,
+            *[partial(self.data.run_query, name)
+              for name in [HEADER_QUERY] + PAGE_QUERIES.get(st.session_state.current_page, [])]
+        )
+        
         # Render sidebar
         self.render_sidebar()
         
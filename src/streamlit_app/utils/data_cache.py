@@ -0,0 +1,204 @@
+"""
+Streamlit caching facade for FoodManagementApp data access
+
+The DatabaseManager and FoodWastageAnalyzer are shared across sessions with
+st.cache_resource. Query results are memoized with st.cache_data, keyed by the
+database's data version so any commit makes older entries unreachable, and
+bounded by a TTL. A rerun with unchanged data only reads PRAGMA data_version.
+Ad hoc page queries run on read-only pooled connections, and a page's
+independent queries can be fanned out over a shared thread pool with gather()
+or prefetch(), so the page waits for its slowest query rather than the sum.
+"""
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.database.connection import DatabaseManager
+from src.database.table_stats import TableStatsService
+from src.database.inspector import DatabaseInspector
+from src.analysis.sql_queries import FoodWastageAnalyzer
+from src.analysis.matching import FoodMatchingEngine
+from src.database.claims import ClaimsService
+from src.database.expiry import get_expiry_sweeper
+from src.database.write_queue import get_write_queue
+from src.analysis.query_cache import DataVersionWatcher
+from config.settings import STREAMLIT_CACHE
+
+
+@st.cache_resource
+def get_database_manager():
+    """DatabaseManager shared by every session"""
+    return DatabaseManager()
+
+
+@st.cache_resource
+def get_read_only_database_manager():
+    """DatabaseManager on read-only pooled connections, for page queries"""
+    return DatabaseManager(read_only=True)
+
+
+@st.cache_resource
+def get_query_executor():
+    """Thread pool shared by every session for fanning out page queries"""
+    return ThreadPoolExecutor(max_workers=STREAMLIT_CACHE['fan_out_workers'], thread_name_prefix="page-query")
+
+
+@st.cache_resource
+def get_analyzer():
+    """FoodWastageAnalyzer shared by every session"""
+    return FoodWastageAnalyzer()
+
+
+@st.cache_resource(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=2, show_spinner=False)
+def get_matching_engine(data_version, as_of):
+    """Loaded FoodMatchingEngine (city inventory index) per data version and day"""
+    return FoodMatchingEngine(get_database_manager()).load(as_of)
+
+
+@st.cache_resource
+def get_claims_service():
+    """ClaimsService shared by every session (its schema is added on first use)"""
+    db = get_database_manager()
+    service = ClaimsService(db, get_expiry_sweeper(db), get_write_queue(db))
+    if not service.is_installed():
+        service.install()
+    return service
+
+
+@st.cache_resource
+def get_version_watcher(db_path):
+    """Watcher reporting when any connection commits to the database file"""
+    return DataVersionWatcher(db_path)
+
+
+@st.cache_data(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=STREAMLIT_CACHE['max_entries'], show_spinner=False)
+def cached_fetch_dataframe(query, params, data_version):
+    """Run a SELECT once per (query, params, data version)"""
+    return get_read_only_database_manager().fetch_dataframe(query, params)
+
+
+@st.cache_data(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=STREAMLIT_CACHE['max_entries'], show_spinner=False)
+def cached_fetch_page(query, order_by, params, after, page_size, descending, data_version):
+    """Fetch one keyset page once per (query, cursor, data version)"""
+    return get_read_only_database_manager().fetch_page(
+        query, order_by, params=params, after=after, page_size=page_size, descending=descending
+    )
+
+
+@st.cache_data(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=STREAMLIT_CACHE['max_entries'], show_spinner=False)
+def cached_analyzer_query(query_name, data_version):
+    """Run one of the analyzer's query_* methods once per data version"""
+    return getattr(get_analyzer(), query_name)()
+
+
+@st.cache_data(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=STREAMLIT_CACHE['max_entries'], show_spinner=False)
+def cached_row_count(table_name, data_version):
+    """Count a table's rows once per data version"""
+    return get_read_only_database_manager().get_row_count(table_name)
+
+
+@st.cache_data(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=STREAMLIT_CACHE['max_entries'], show_spinner=False)
+def cached_sidebar_stats(data_version):
+    """Table and claim status counts once per data version"""
+    return TableStatsService(get_database_manager()).get_sidebar_stats()
+
+
+@st.cache_data(ttl=STREAMLIT_CACHE['ttl_seconds'], max_entries=STREAMLIT_CACHE['max_entries'], show_spinner=False)
+def cached_database_stats(data_version):
+    """Storage overview and per-object statistics once per data version"""
+    return DatabaseInspector(get_database_manager()).get_stats()
+
+
+class CachedDataAccess:
+    """Cached, version-aware data fetches for the render_* methods"""
+
+    def __init__(self):
+        self.db = get_database_manager()
+        self.analyzer = get_analyzer()
+        self.version_watcher = get_version_watcher(str(self.db.db_path))
+
+    def data_version(self):
+        """Current database version; changes whenever another connection commits"""
+        return self.version_watcher.current()
+
+    def fetch_dataframe(self, query, params=None):
+        """Cached equivalent of DatabaseManager.fetch_dataframe"""
+        return cached_fetch_dataframe(query, tuple(params) if params else None, self.data_version())
+
+    def fetch_page(self, query, order_by, params=None, after=None, page_size=20, descending=False):
+        """Cached equivalent of DatabaseManager.fetch_page; returns (DataFrame, next_cursor)"""
+        return cached_fetch_page(
+            query, tuple(order_by), tuple(params) if params else None,
+            tuple(after) if after is not None else None, page_size, descending, self.data_version()
+        )
+
+    def run_query(self, query_name):
+        """Cached result of FoodWastageAnalyzer.<query_name>()"""
+        return cached_analyzer_query(query_name, self.data_version())
+
+    def row_count(self, table_name):
+        """Cached equivalent of DatabaseManager.get_row_count"""
+        return cached_row_count(table_name, self.data_version())
+
+    def sidebar_stats(self):
+        """Cached row counts of every table plus claims per status"""
+        return cached_sidebar_stats(self.data_version())
+
+    def recommendations(self, receiver_ids=None, limit=None):
+        """Ranked open listings for receivers, from an engine shared until the data changes"""
+        engine = get_matching_engine(self.data_version(), date.today())
+        return engine.recommend(receiver_ids, limit) if engine else None
+
+    def database_stats(self):
+        """Cached DatabaseInspector.get_stats (reads every page, so worth caching)"""
+        return cached_database_stats(self.data_version())
+
+    def _submit(self, fetch):
+        """Run fetch() on the shared executor, inside this session's script context"""
+        ctx = get_script_run_ctx()
+
+        def run():
+            # st.cache_data and st.* calls need the session's context on the worker thread
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+            return fetch()
+        return get_query_executor().submit(run)
+
+    def gather(self, **fetches):
+        """Run independent fetches at once and return their results by name
+
+        Each value is a zero-argument callable, usually a functools.partial of
+        one of this class's methods; each runs on its own pooled connection.
+        Raises the first fetch's error (in argument order) once all are done.
+        """
+        futures = {name: self._submit(fetch) for name, fetch in fetches.items()}
+        wait(futures.values())
+        return {name: future.result() for name, future in futures.items()}
+
+    def prefetch(self, *fetches):
+        """Run cached fetches at once so the page's own calls hit the cache
+
+        Errors are ignored here; the page's call runs the fetch again and
+        handles the error as usual.
+        """
+        wait([self._submit(fetch) for fetch in fetches])
+
+    def clear(self):
+        """Forget every cached result (e.g. for an explicit refresh)"""
+        cached_fetch_dataframe.clear()
+        cached_fetch_page.clear()
+        cached_analyzer_query.clear()
+        cached_row_count.clear()
+        cached_sidebar_stats.clear()
+        cached_database_stats.clear()
+        get_matching_engine.clear()
+        self.analyzer.clear_cache()
@@ -0,0 +1,97 @@
+"""
+Tests for online backups (src/database/backup.py)
+"""
+import gzip
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from config.settings import BACKUP_SETTINGS, SLOW_QUERY_LOG
+from src.database.connection import DatabaseManager
+from src.database.backup import BackupManager
+
+
+class BackupManagerTest(unittest.TestCase):
+    """Stepwise backups of a WAL database, with and without concurrent writes"""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.work_dir / "source.db"
+        self.slow_log = mock.patch.dict(SLOW_QUERY_LOG, {'path': self.work_dir / "slow.log"})
+        self.slow_log.start()
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.executemany("INSERT INTO items (payload) VALUES (?)", [('x' * 500,)] * 1500)
+        conn.commit()
+        conn.close()
+
+        self.manager = BackupManager(DatabaseManager(self.db_path, use_pool=False), self.work_dir / "backups")
+
+    def tearDown(self):
+        self.slow_log.stop()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def run_backup(self, timeout=30):
+        """run_backup() in a thread; fails the test if it has not returned within timeout"""
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(backup=self.manager.run_backup()), daemon=True)
+        thread.start()
+        thread.join(timeout)
+        self.assertFalse(thread.is_alive(), "backup did not finish")
+        self.assertFalse(self.manager.status['running'])
+        return result['backup']
+
+    def restore(self, backup):
+        """Decompress a backup and return its number of items"""
+        restored = self.work_dir / "restored.db"
+        with gzip.open(backup['path'], 'rb') as packed, open(restored, 'wb') as raw:
+            shutil.copyfileobj(packed, raw)
+        conn = sqlite3.connect(restored)
+        try:
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], 'ok')
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        finally:
+            conn.close()
+
+    @mock.patch.dict(BACKUP_SETTINGS, {'pages_per_step': 5, 'max_restarts': 3})
+    def test_backup_without_writes_copies_stepwise(self):
+        backup = self.run_backup()
+        self.assertIsNotNone(backup)
+        self.assertEqual(backup['restarts'], 0)
+        self.assertEqual(self.restore(backup), 1500)
+
+    @mock.patch.dict(BACKUP_SETTINGS, {'pages_per_step': 5, 'max_restarts': 3})
+    def test_backup_finishes_while_another_connection_writes(self):
+        writer = sqlite3.connect(self.db_path, check_same_thread=False)
+        pause = time.sleep
+
+        def write_between_steps(seconds):
+            # Another connection commits after every step, so each step starts the copy over
+            writer.execute("UPDATE items SET payload = ? WHERE id = 1", (str(time.perf_counter()),))
+            writer.commit()
+            pause(seconds)
+
+        try:
+            with mock.patch('src.database.backup.time.sleep', write_between_steps):
+                backup = self.run_backup()
+        finally:
+            writer.close()
+
+        self.assertIsNotNone(backup)
+        self.assertGreater(backup['restarts'], BACKUP_SETTINGS['max_restarts'])
+        self.assertEqual(self.restore(backup), 1500)
+
+if __name__ == "__main__":
+    unittest.main()